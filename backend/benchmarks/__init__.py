@@ -0,0 +1,4 @@
+"""
+ベンチマークスクリプト
+backendディレクトリから `python -m benchmarks.<モジュール名>` で実行する
+"""
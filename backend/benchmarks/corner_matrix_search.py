@@ -0,0 +1,113 @@
+"""
+プロセス内のコーナー行列検索（VECTOR_SEARCH_ENGINE=memory）のスループットを計測
+
+合成データでコーナー数ごとの1クエリあたりの処理時間を計測する。
+--user-id を指定した場合は、DBに登録済みのそのユーザーのコーナーについて
+SQLによる検索（search_corners_by_embedding）と結果が一致することを確認し、レイテンシを比較する。
+
+実行方法:
+    cd backend && python -m benchmarks.corner_matrix_search --corners 50 200 1000
+    cd backend && python -m benchmarks.corner_matrix_search --user-id 1
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from config import settings
+from cruds import analyze as analyze_crud
+from services.corner_matrix import CornerMatrixIndex, _UserCorners
+
+
+def _synthetic_throughput(corners: int, dimension: int, queries: int, limit: int) -> float:
+    rng = np.random.default_rng(0)
+    rows = [
+        SimpleNamespace(
+            id=i,
+            program_id=i % 10,
+            title=f"corner{i}",
+            description_for_llm="",
+            description_snippet=None,
+            program_title="program",
+            embedded_description=rng.standard_normal(dimension).astype(np.float32),
+        )
+        for i in range(corners)
+    ]
+    index = CornerMatrixIndex(max_users=1, ttl_seconds=float("inf"))
+    index._entries[1] = _UserCorners(rows, frozenset(range(10)))
+    query_vectors = rng.standard_normal((queries, dimension)).astype(np.float32)
+
+    started = time.perf_counter()
+    for vector in query_vectors:
+        index.search(None, 1, vector, -1.0, limit)
+    return queries / (time.perf_counter() - started)
+
+
+def _compare_with_sql(user_id: int, queries: int, limit: int) -> None:
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rows, _ = analyze_crud.get_user_corner_vectors(db, user_id)
+        if not rows:
+            print(f"ユーザー{user_id}のコーナーが登録されていません")
+            return
+        rng = np.random.default_rng(0)
+        # 既存コーナーの近傍をクエリにする
+        query_vectors = [
+            np.asarray(rows[i % len(rows)].embedded_description, dtype=np.float32)
+            + rng.normal(0, 0.02, settings.embedding_dimension).astype(np.float32)
+            for i in range(queries)
+        ]
+        index = CornerMatrixIndex(max_users=1, ttl_seconds=float("inf"))
+        index.search(db, user_id, query_vectors[0].tolist(), -1.0, limit)  # 読み込み
+
+        sql_seconds = memory_seconds = 0.0
+        mismatches = 0
+        for vector in query_vectors:
+            embedding = vector.tolist()
+            started = time.perf_counter()
+            expected = analyze_crud.search_corners_by_embedding(
+                db, user_id, embedding, settings.vector_similarity_threshold, limit
+            )
+            sql_seconds += time.perf_counter() - started
+
+            started = time.perf_counter()
+            actual = index.search(db, user_id, embedding, settings.vector_similarity_threshold, limit)
+            memory_seconds += time.perf_counter() - started
+
+            if [row.id for row in expected] != [row.id for row in actual] or not np.allclose(
+                [row.similarity for row in expected], [row.similarity for row in actual], atol=1e-5
+            ):
+                mismatches += 1
+
+        print(
+            f"ユーザー{user_id} コーナー{len(rows)}件: "
+            f"SQL {sql_seconds / queries * 1000:.2f}ms/件 メモリ {memory_seconds / queries * 1000:.3f}ms/件 "
+            f"不一致 {mismatches}/{queries}"
+        )
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corners", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--user-id", type=int)
+    args = parser.parse_args()
+
+    if args.user_id is not None:
+        _compare_with_sql(args.user_id, min(args.queries, 200), args.limit)
+        return
+
+    for corners in args.corners:
+        qps = _synthetic_throughput(corners, settings.embedding_dimension, args.queries, args.limit)
+        print(f"コーナー{corners:5d}件: {qps:10.0f} クエリ/秒 ({1e6 / qps:.1f}µs/件)")
+
+
+if __name__ == "__main__":
+    main()
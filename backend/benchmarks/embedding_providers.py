@@ -0,0 +1,86 @@
+"""
+ローカル埋め込みプロバイダー（float32 / int8量子化）のレイテンシとスループットを計測
+
+1件ずつの埋め込み（メモ分析時のクエリ）と、まとめての埋め込み（コーナー登録・シード時）を計測する。
+量子化による精度劣化の目安として、float32との平均コサイン類似度も出力する。
+OpenAI APIの計測はネットワーク条件に左右されるため対象外とする。
+
+実行方法:
+    cd backend && python -m benchmarks.embedding_providers --model-dir models/multilingual-e5-large
+"""
+
+import argparse
+import statistics
+import time
+from typing import List
+
+import numpy as np
+
+from services.local_embeddings import LocalOnnxEmbeddings
+
+_SAMPLE_TEXTS = [
+    "昨日の帰り道、駅前の商店街で見かけた猫がずっと自動ドアの前で待っていた話",
+    "子どもの頃に信じていた勘違いを大人になってから知って衝撃を受けたエピソード",
+    "最近ハマっている料理で、冷蔵庫の残り物だけで作った謎の炒め物がおいしかった",
+    "通勤電車で隣の人のイヤホンから漏れていた曲がどうしても気になって調べた",
+    "職場の先輩が言った一言がずっと心に残っていて、今でも励みになっている",
+    "旅行先の旅館で出された朝ごはんが豪華すぎて食べきれなかった",
+    "ラジオを聴きながら勉強していた受験生時代の思い出",
+    "初めて一人暮らしを始めた日に鍵を部屋の中に置いたまま閉めてしまった",
+]
+
+
+def _measure(embeddings: LocalOnnxEmbeddings, texts: List[str], iterations: int) -> dict:
+    embeddings.embed_documents(texts[:2])  # ウォームアップ
+
+    single = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        embeddings.embed_query(texts[i % len(texts)])
+        single.append(time.perf_counter() - started)
+
+    batch = texts * 8
+    started = time.perf_counter()
+    embeddings.embed_documents(batch)
+    batch_elapsed = time.perf_counter() - started
+
+    return {
+        "single_p50_ms": statistics.median(single) * 1000,
+        "single_p95_ms": sorted(single)[int(len(single) * 0.95) - 1] * 1000,
+        "batch_texts_per_second": len(batch) / batch_elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", default="models/multilingual-e5-large")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--dimension", type=int, default=1024)
+    args = parser.parse_args()
+
+    vectors = {}
+    for quantized in (False, True):
+        label = "int8" if quantized else "float32"
+        try:
+            embeddings = LocalOnnxEmbeddings(
+                args.model_dir, quantized=quantized, workers=args.workers, dimension=args.dimension
+            )
+        except FileNotFoundError as e:
+            print(f"{label:8s} スキップ: {e}")
+            continue
+        result = _measure(embeddings, _SAMPLE_TEXTS, args.iterations)
+        vectors[label] = np.array(embeddings.embed_documents(_SAMPLE_TEXTS))
+        print(
+            f"{label:8s} 1件 p50={result['single_p50_ms']:.1f}ms p95={result['single_p95_ms']:.1f}ms "
+            f"バッチ {result['batch_texts_per_second']:.1f}件/秒"
+        )
+
+    if len(vectors) == 2:
+        # どちらも正規化済みなので内積がコサイン類似度
+        agreement = (vectors["float32"] * vectors["int8"]).sum(axis=1).mean()
+        print(f"float32とint8の平均コサイン類似度: {agreement:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+genai.Clientの再利用有無による1呼び出しあたりのオーバーヘッドを計測
+
+ネットワークを使わずSDK側のコストだけを比較するため、リクエストはhttpx.MockTransportで応答する。
+「再利用なし」は呼び出しごとにgenai.Client()を生成する従来の実装に相当し、
+既定トランスポート（SSLコンテキスト等）の構築コストを含む。
+実環境ではこれに加えてTCP/TLSハンドシェイク（数十〜数百ms）が毎回発生する。
+
+実行方法:
+    cd backend && python -m benchmarks.genai_client_reuse --iterations 200
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import httpx
+from google import genai
+from google.genai import types as genai_types
+
+_RESPONSE_BODY = json.dumps(
+    {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": "[]"}]},
+                "finishReason": "STOP",
+            }
+        ]
+    }
+).encode()
+
+
+def _mock_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, content=_RESPONSE_BODY, headers={"content-type": "application/json"})
+
+
+def _call(client: genai.Client) -> None:
+    client.models.generate_content(model="gemini-2.0-flash", contents="ベンチマーク")
+
+
+def _mock_client() -> genai.Client:
+    return genai.Client(
+        api_key="benchmark",
+        http_options=genai_types.HttpOptions(
+            httpx_client=httpx.Client(transport=httpx.MockTransport(_mock_handler))
+        ),
+    )
+
+
+def _measure(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<32} median={statistics.median(samples):7.3f}ms  p95={p95:7.3f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    shared = _mock_client()
+    _call(shared)  # ウォームアップ
+
+    construct = _measure(lambda: genai.Client(api_key="benchmark"), args.iterations)
+    reuse = _measure(lambda: _call(shared), args.iterations)
+    # 呼び出しごとに生成する場合（生成の時間は計測範囲に含まれる）
+    no_reuse = _measure(lambda: _call(_mock_client()), args.iterations)
+
+    _report("genai.Client() 生成のみ", construct)
+    _report("再利用あり (1呼び出し)", reuse)
+    _report("再利用なし (生成 + 1呼び出し)", no_reuse)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+番組一覧レスポンスのシリアライズ時間を比較
+
+コーナー・パーソナリティを含む番組一覧について、次の方式でJSONのバイト列を作るまでのCPU時間を計測する。
+  - model+json   : from_attributesでPydanticモデルに変換 → dict → 標準ライブラリのjson
+  - model+rust   : from_attributesでPydanticモデルに変換 → Pydanticで直接JSON（FastAPIのresponse_modelの既定）
+  - rows+orjson  : SQLの行から組み立てた辞書 → orjson（一覧APIの方式）
+ORMオブジェクトの代わりに属性アクセスのみの軽量オブジェクトを使うため、
+実際のORMでの属性の読み込みや遅延読み込みのクエリの時間は含まない。
+model+rustとrows+orjsonの出力が一致することも確認する。
+
+実行方法:
+    cd backend && python -m benchmarks.json_serialization --programs 500 --corners 10 --personalities 3
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+
+from pydantic import TypeAdapter
+
+from responses import dumps
+from schemas import ProgramResponse
+
+
+def _make_data(programs: int, corners: int, personalities: int) -> tuple:
+    objects, rows = [], []
+    for p in range(programs):
+        corner_rows = [
+            {
+                "title": f"コーナー{c}",
+                "description_for_llm": f"番組{p}のコーナー{c}。リスナーの日常のちょっとした出来事を募集します。" * 3,
+                "id": p * corners + c,
+                "program_id": p,
+            }
+            for c in range(corners)
+        ]
+        personality_rows = [
+            {"name": f"パーソナリティ{i}", "nickname": None if i % 2 else f"愛称{i}", "id": i, "user_id": 1}
+            for i in range(personalities)
+        ]
+        program = {
+            "title": f"番組{p}",
+            "email_address": f"program{p}@example.com",
+            "broadcast_schedule": "毎週月曜 25:00-27:00",
+            "id": p,
+            "user_id": 1,
+        }
+        rows.append({**program, "corners": corner_rows, "personalities": personality_rows})
+        objects.append(SimpleNamespace(
+            **program,
+            corners=[SimpleNamespace(**c) for c in corner_rows],
+            personalities=[SimpleNamespace(**i) for i in personality_rows],
+            created_at=datetime(2026, 1, 1),
+        ))
+    return objects, rows
+
+
+def _time(func, repeat: int) -> tuple:
+    started = time.process_time()
+    for _ in range(repeat):
+        result = func()
+    return (time.process_time() - started) / repeat, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--programs", type=int, default=500)
+    parser.add_argument("--corners", type=int, default=10)
+    parser.add_argument("--personalities", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    objects, rows = _make_data(args.programs, args.corners, args.personalities)
+    adapter = TypeAdapter(List[ProgramResponse])
+
+    def model_json() -> bytes:
+        models = adapter.validate_python(objects, from_attributes=True)
+        return json.dumps(adapter.dump_python(models, mode="json"), ensure_ascii=False).encode("utf-8")
+
+    def model_rust() -> bytes:
+        return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+    model_json_seconds, _ = _time(model_json, args.repeat)
+    model_rust_seconds, expected = _time(model_rust, args.repeat)
+    rows_seconds, actual = _time(lambda: dumps(rows), args.repeat)
+
+    print(f"番組{args.programs}件（コーナー{args.corners}件・パーソナリティ{args.personalities}人ずつ）"
+          f" {len(actual) / 1024:.0f}KB")
+    print(f"  model+json : {model_json_seconds * 1000:8.2f}ms")
+    print(f"  model+rust : {model_rust_seconds * 1000:8.2f}ms")
+    print(f"  rows+orjson: {rows_seconds * 1000:8.2f}ms")
+    print(f"  出力の一致: {'OK' if json.loads(expected) == json.loads(actual) else 'NG'}"
+          f"（バイト列{'も一致' if expected == actual else 'は不一致'}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+起動中のAPIサーバーに一定時間リクエストを送り続け、スループットとレイテンシを計測
+
+開発モード（--reload・1プロセス）と本番モード（SERVER_MODE=production）の比較に使う。
+AI解析のような外部APIに依存するエンドポイントではなく、DB読み込みのみのエンドポイントを対象にする。
+
+実行方法:
+    cd backend && python -m benchmarks.load_test --url http://localhost:8000/api/programs?user_id=1 \
+        --concurrency 64 --duration 30
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _worker(client: httpx.AsyncClient, url: str, deadline: float, latencies: list, errors: list) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(url)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run(url: str, concurrency: int, duration: float, warmup: float) -> None:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        if warmup > 0:
+            await asyncio.gather(
+                *(_worker(client, url, time.perf_counter() + warmup, [], []) for _ in range(concurrency))
+            )
+
+        latencies: list = []
+        errors: list = []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(_worker(client, url, deadline, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print(f"成功したリクエストがありません（エラー {len(errors)}件）")
+        return
+    latencies.sort()
+    print(f"{url} 同時接続{concurrency} {elapsed:.1f}秒")
+    print(f"  スループット: {len(latencies) / elapsed:.1f} req/s（エラー {len(errors)}件）")
+    print(
+        f"  レイテンシ: p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/api/programs?user_id=1")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(_run(args.url, args.concurrency, args.duration, args.warmup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+推奨スコアの統合・ランキングの処理時間を比較（メモごとの辞書処理 / 行列の一括処理）
+
+M件のメモ × N件のコーナーについて、ベクトル類似度とLLMスコアから統合スコアと
+信頼度ラベルを求め、メモごとの上位を取り出すまでのCPU時間を計測する。
+両方式の結果が一致することも確認する。
+
+実行方法:
+    cd backend && python -m benchmarks.recommendation_scoring --memos 5000 --corners 100
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from domain.services.corner_recommendation_service import CornerRecommendationService
+
+
+def _per_memo(similarities: np.ndarray, llm_scores: np.ndarray, max_results: int) -> list:
+    results = []
+    for sims, llms in zip(similarities.tolist(), llm_scores.tolist()):
+        vector_results = [{"id": i, "similarity": s} for i, s in enumerate(sims)]
+        llm_evaluations = [{"id": i, "llm_score": s} for i, s in enumerate(llms)]
+        enriched = CornerRecommendationService.enrich_recommendations_with_combined_scores(
+            vector_results, llm_evaluations
+        )
+        ranked = CornerRecommendationService.rank_recommendations(enriched, max_results)
+        results.append([rec["id"] for rec in ranked])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memos", type=int, default=5000)
+    parser.add_argument("--corners", type=int, default=100)
+    parser.add_argument("--max-results", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    similarities = rng.random((args.memos, args.corners))
+    llm_scores = rng.random((args.memos, args.corners))
+
+    started = time.process_time()
+    expected = _per_memo(similarities, llm_scores, args.max_results)
+    per_memo_seconds = time.process_time() - started
+
+    started = time.process_time()
+    result = CornerRecommendationService.score_memo_batch(similarities, llm_scores, args.max_results)
+    matrix_seconds = time.process_time() - started
+
+    matches = sum(
+        expected_ids == actual_ids
+        for expected_ids, actual_ids in zip(expected, result.corner_indices.tolist())
+    )
+    print(f"メモ{args.memos}件 × コーナー{args.corners}件")
+    print(f"  メモごとの辞書処理: {per_memo_seconds * 1000:9.1f}ms")
+    print(f"  行列の一括処理    : {matrix_seconds * 1000:9.1f}ms")
+    print(f"  上位{args.max_results}件の一致: {matches}/{args.memos}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+一覧レスポンスの圧縮方式ごとの転送量とCPU時間を比較
+
+GET /api/programs と GET /api/mails の本文について、gzip（レベル1/6/9）と
+brotli（品質1/4/11、brotliパッケージがある場合）の圧縮後サイズと圧縮にかかるCPU時間を計測する。
+--base-url を指定すると起動中のサーバーから実際のレスポンスを取得し、省略時は合成データを使う。
+
+実行方法:
+    cd backend && python -m benchmarks.response_compression --base-url http://localhost:8000 --user-id 1
+"""
+
+import argparse
+import gzip
+import random
+import time
+from datetime import datetime
+
+import httpx
+
+from responses import dumps
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_WORDS = (
+    "リスナー", "日常", "ちょっとした", "出来事", "募集", "します", "ネタ", "メール", "お便り", "番組",
+    "パーソナリティ", "コーナー", "失敗談", "休日", "学校", "職場", "家族", "思い出", "最近", "あった",
+    "面白い", "話", "を", "の", "に", "が", "は", "で", "、", "。",
+)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return "".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _synthetic_bodies(programs: int, corners: int, mails: int) -> dict:
+    rng = random.Random(0)
+    program_rows = [
+        {
+            "title": f"番組{p}",
+            "email_address": f"program{p}@example.com",
+            "broadcast_schedule": "毎週月曜 25:00-27:00",
+            "id": p,
+            "user_id": 1,
+            "corners": [
+                {"title": f"コーナー{c}", "description_for_llm": _sentence(rng, 120), "id": p * corners + c,
+                 "program_id": p}
+                for c in range(corners)
+            ],
+            "personalities": [{"name": f"パーソナリティ{p}", "nickname": None, "id": p, "user_id": 1}],
+        }
+        for p in range(programs)
+    ]
+    mail_rows = [
+        {
+            "subject": _sentence(rng, 6),
+            "body": _sentence(rng, 200),
+            "status": rng.choice(["下書き", "送信済み", "採用", "不採用"]),
+            "id": m,
+            "user_id": 1,
+            "corner_id": m % (programs * corners),
+            "memo_id": m,
+            "sent_at": None,
+            "created_at": datetime(2026, 1, 1, 12, 0, m % 60),
+            "updated_at": datetime(2026, 1, 1, 12, 0, m % 60),
+        }
+        for m in range(mails)
+    ]
+    return {"programs": dumps(program_rows), "mails": dumps(mail_rows)}
+
+
+def _fetch_bodies(base_url: str, user_id: int) -> dict:
+    with httpx.Client(base_url=base_url, headers={"Accept-Encoding": "identity"}) as client:
+        return {
+            name: client.get(f"/api/{name}", params={"user_id": user_id}).raise_for_status().content
+            for name in ("programs", "mails")
+        }
+
+
+def _codecs() -> list:
+    codecs = [(f"gzip-{level}", lambda body, level=level: gzip.compress(body, compresslevel=level)) for level in (1, 6, 9)]
+    if brotli is not None:
+        codecs += [(f"br-{q}", lambda body, q=q: brotli.compress(body, quality=q)) for q in (1, 4, 11)]
+    return codecs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--programs", type=int, default=20)
+    parser.add_argument("--corners", type=int, default=5)
+    parser.add_argument("--mails", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.base_url:
+        bodies = _fetch_bodies(args.base_url, args.user_id)
+    else:
+        bodies = _synthetic_bodies(args.programs, args.corners, args.mails)
+    if brotli is None:
+        print("brotliパッケージがないため、gzipのみ計測します")
+
+    for name, body in bodies.items():
+        print(f"GET /api/{name}: 非圧縮 {len(body) / 1024:8.1f}KB")
+        for codec, compress in _codecs():
+            started = time.process_time()
+            for _ in range(args.repeat):
+                compressed = compress(body)
+            elapsed = (time.process_time() - started) / args.repeat
+            print(
+                f"  {codec:8s} {len(compressed) / 1024:8.1f}KB（{len(compressed) / len(body):6.1%}）"
+                f" CPU {elapsed * 1000:7.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
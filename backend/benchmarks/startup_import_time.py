@@ -0,0 +1,102 @@
+"""
+APIサーバー起動時（`import main`）のimport時間を計測し、予算を超えたら失敗する
+
+`python -X importtime` の出力から、mainの累積import時間と時間のかかったパッケージを集計する。
+AI SDK（LangChain・OpenAI・google-genai）は初回利用時に読み込む設計のため、
+起動時に読み込まれていれば予算内でも失敗とする。失敗時は終了コード1を返す。
+同じ検査を tests/test_startup_import_time.py でも行う。
+
+実行方法:
+    cd backend && python -m benchmarks.startup_import_time --budget-ms 1500
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_LINE_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+# 起動時に読み込まれてはならないモジュール（先頭一致）
+_DEFERRED_MODULES = ("langchain", "langchain_core", "langchain_openai", "langchain_google_genai", "openai", "google.genai")
+BUDGET_MS = 1500.0
+
+
+def _measure() -> List[Tuple[str, int, int, int]]:
+    """`import main` を新しいプロセスで実行し、(モジュール名, 自身の時間µs, 累積時間µs, 深さ) を返す"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=_BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit("`import main` に失敗しました")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def _is_deferred(name: str) -> bool:
+    return any(name == prefix or name.startswith(prefix + ".") for prefix in _DEFERRED_MODULES)
+
+
+def measure(runs: int) -> Tuple[int, List[Tuple[str, int, int, int]]]:
+    """runs回計測し、mainの累積import時間（µs）が最小だった回の (累積時間, 行) を返す"""
+    best_total = None
+    best_rows = []
+    for _ in range(runs):
+        rows = _measure()
+        total = next(cumulative for name, _, cumulative, _ in rows if name == "main")
+        if best_total is None or total < best_total:
+            best_total, best_rows = total, rows
+    return best_total, best_rows
+
+
+def deferred_imports(rows: List[Tuple[str, int, int, int]]) -> List[str]:
+    """起動時に読み込まれたAI SDKのモジュール名"""
+    return sorted({name for name, _, _, _ in rows if _is_deferred(name)})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="計測回数（最小値を採用）")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    best_total, best_rows = measure(args.runs)
+
+    # トップレベルパッケージごとに自身の時間を合計する
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in best_rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"import main: {best_total / 1000:.1f}ms（予算 {args.budget_ms:.0f}ms）")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {package:30s} {self_us / 1000:8.1f}ms")
+
+    deferred = deferred_imports(best_rows)
+    failed = False
+    if deferred:
+        print(f"❌ 起動時に読み込まれたAI SDK: {', '.join(deferred[:10])}")
+        failed = True
+    if best_total / 1000 > args.budget_ms:
+        print("❌ import時間が予算を超えています")
+        failed = True
+    if failed:
+        raise SystemExit(1)
+    print("✅ 予算内です")
+
+
+if __name__ == "__main__":
+    main()
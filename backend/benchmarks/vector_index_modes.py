@@ -0,0 +1,99 @@
+"""
+ベクトル検索インデックス（float32厳密検索 / reduced / halfvec / binary）の比較
+
+各方式について、インデックスのサイズと作成時間、検索のスループット（QPS）、
+float32厳密検索の上位k件に対する再現率（recall@k）を計測する。
+インデックスはトランザクション内で作成して計測後にロールバックするため、DBの状態は変わらない。
+
+実行方法:
+    cd backend && python -m benchmarks.vector_index_modes --k 5 --candidates 50
+"""
+
+import argparse
+import time
+
+from sqlalchemy import text
+
+from cruds import analyze as analyze_crud
+from database import SessionLocal
+from models import Memo
+from services.langchain_service import get_embedding_service
+
+# migrationsで作成するインデックスと同じ定義
+_INDEX_DDL = {
+    "reduced": "USING hnsw (embedded_description_reduced vector_cosine_ops)",
+    "halfvec": "USING hnsw ((embedded_description::halfvec(1024)) halfvec_cosine_ops)",
+    "binary": "USING hnsw ((binary_quantize(embedded_description)::bit(1024)) bit_hamming_ops)",
+}
+
+
+def _exact_ids(db, memos, embeddings, k: int) -> list:
+    return [
+        {row.id for row in analyze_crud.search_corners_by_embedding(db, memo.user_id, embedding, -1.0, k)}
+        for memo, embedding in zip(memos, embeddings)
+    ]
+
+
+def _measure(db, mode: str, memos, embeddings, exact: list, k: int, candidates: int) -> dict:
+    name = f"bench_corners_{mode}_idx"
+    db.execute(text(f"DROP INDEX IF EXISTS ix_corners_embedded_description_{mode}_hnsw"))
+    started = time.perf_counter()
+    db.execute(text(f"CREATE INDEX {name} ON corners {_INDEX_DDL[mode]}"))
+    build_seconds = time.perf_counter() - started
+    size = db.execute(text("SELECT pg_relation_size(:name)"), {"name": name}).scalar()
+
+    hits = 0
+    started = time.perf_counter()
+    for memo, embedding, expected in zip(memos, embeddings, exact):
+        rows = analyze_crud.search_corners_with_rerank(
+            db, memo.user_id, embedding, mode, -1.0, candidates, k
+        )
+        hits += len({row.id for row in rows} & expected)
+    elapsed = time.perf_counter() - started
+    db.rollback()
+
+    return {
+        "size_kb": size / 1024,
+        "build_ms": build_seconds * 1000,
+        "qps": len(memos) / elapsed,
+        "recall": hits / max(1, sum(len(ids) for ids in exact)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--max-memos", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        memos = db.query(Memo).limit(args.max_memos).all()
+        if not memos:
+            print("メモが登録されていません（seed_data.pyを実行してください）")
+            return
+        embedding_service = get_embedding_service()
+        embeddings = [embedding_service.embed_text(memo.content) for memo in memos]
+
+        started = time.perf_counter()
+        exact = _exact_ids(db, memos, embeddings, args.k)
+        exact_qps = len(memos) / (time.perf_counter() - started)
+        column_bytes = db.execute(
+            text("SELECT COALESCE(SUM(pg_column_size(embedded_description)), 0) FROM corners")
+        ).scalar()
+        db.rollback()
+        print(f"{'exact':8s} ベクトル列 {column_bytes / 1024:8.1f}KB                 QPS {exact_qps:8.1f} recall 1.000")
+
+        for mode in _INDEX_DDL:
+            result = _measure(db, mode, memos, embeddings, exact, args.k, args.candidates)
+            print(
+                f"{mode:8s} インデックス {result['size_kb']:8.1f}KB 作成 {result['build_ms']:7.1f}ms "
+                f"QPS {result['qps']:8.1f} recall {result['recall']:.3f}"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
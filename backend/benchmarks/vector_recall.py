@@ -0,0 +1,103 @@
+"""
+二段階ベクトル検索（縮約ベクトルで候補生成 → 全次元で再ランキング）の再現率とレイテンシを計測
+
+DBに登録済みのコーナーとメモを使用する。メモを埋め込みモデルでベクトル化してクエリとし、
+全次元ベクトルの厳密検索の上位k件に対する再現率（recall@k）を、縮約次元・候補数ごとに求める。
+あわせて、各メモの所有ユーザーについてSQLの単段検索・二段階検索のレイテンシを計測する。
+
+実行方法:
+    cd backend && python -m benchmarks.vector_recall --k 5 --dimensions 128 256 512 --candidates 10 20 50
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from config import settings
+from cruds import analyze as analyze_crud
+from database import SessionLocal
+from models import Corner, Memo, Program
+from services.langchain_service import get_embedding_service
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+
+def _recall_at_k(
+    corners: np.ndarray, queries: np.ndarray, k: int, dimension: int, candidates: int
+) -> float:
+    exact = np.argsort(-(queries @ corners.T), axis=1)[:, :k]
+
+    reduced_corners = _normalize(corners[:, :dimension])
+    reduced_queries = _normalize(queries[:, :dimension])
+    candidate_ids = np.argsort(-(reduced_queries @ reduced_corners.T), axis=1)[:, :candidates]
+
+    hits = 0
+    for row, ids in enumerate(candidate_ids):
+        reranked = ids[np.argsort(-(corners[ids] @ queries[row]))][:k]
+        hits += len(set(reranked) & set(exact[row]))
+    return hits / exact.size
+
+
+def _sql_latency(db, memos, vectors, k: int, candidates: int) -> dict:
+    single, two_stage = [], []
+    for memo, vector in zip(memos, vectors):
+        embedding = vector.tolist()
+        started = time.perf_counter()
+        analyze_crud.search_corners_by_embedding(db, memo.user_id, embedding, -1.0, k)
+        single.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        analyze_crud.search_corners_with_rerank(db, memo.user_id, embedding, "reduced", -1.0, candidates, k)
+        two_stage.append(time.perf_counter() - started)
+        db.rollback()  # SET LOCALを破棄
+    return {
+        "single_ms": statistics.median(single) * 1000,
+        "two_stage_ms": statistics.median(two_stage) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[128, 256, 512])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10, 20, 50])
+    parser.add_argument("--max-memos", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Corner.embedded_description).join(Program).all()
+        memos = db.query(Memo).limit(args.max_memos).all()
+        if not rows or not memos:
+            print("コーナーとメモが登録されていません（seed_data.pyを実行してください）")
+            return
+
+        corners = _normalize(np.array([row.embedded_description for row in rows], dtype=np.float32))
+        embedding_service = get_embedding_service()
+        queries = _normalize(
+            np.array([embedding_service.embed_text(memo.content) for memo in memos], dtype=np.float32)
+        )
+        print(f"コーナー {len(corners)}件 / クエリ {len(queries)}件 / 全次元 {corners.shape[1]}")
+
+        for dimension in args.dimensions:
+            results = [
+                f"候補{candidates}件={_recall_at_k(corners, queries, args.k, dimension, candidates):.3f}"
+                for candidates in args.candidates
+            ]
+            print(f"{dimension:4d}次元 recall@{args.k}: " + " ".join(results))
+
+        latency = _sql_latency(db, memos, queries, args.k, settings.vector_rerank_candidates)
+        print(
+            f"SQL p50 単段={latency['single_ms']:.2f}ms "
+            f"二段階(候補{settings.vector_rerank_candidates}件)={latency['two_stage_ms']:.2f}ms"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+レスポンスの圧縮
+Accept-Encodingに応じてbrotli（brotliパッケージがインストールされている場合）またはgzipで本文を圧縮する
+"""
+
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # 任意の依存。ない場合はgzipのみ
+    brotli = None
+
+# 圧縮済みの形式や、逐次送信が必要な形式は圧縮しない
+_EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "audio/",
+    "video/",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/octet-stream",
+)
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """Accept-Encodingから受け入れ可能な（q=0でない）エンコーディングを取得"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip())
+    return accepted
+
+
+class _ContentTypeExclusionMixin:
+    """圧縮済みの形式のContent-Typeを圧縮対象から除外する"""
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            await super().send_with_compression(message)
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith(_EXCLUDED_CONTENT_TYPES):
+                self.content_type_is_excluded = True
+            return
+        await super().send_with_compression(message)
+
+
+class _GZipResponder(_ContentTypeExclusionMixin, GZipResponder):
+    pass
+
+
+class _BrotliResponder(_ContentTypeExclusionMixin, IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self.compressor.process(body)
+        if not more_body:
+            return compressed + self.compressor.finish()
+        return compressed + self.compressor.flush()
+
+
+class _IdentityResponder(_ContentTypeExclusionMixin, IdentityResponder):
+    pass
+
+
+class CompressionMiddleware:
+    """
+    レスポンス本文を圧縮するミドルウェア
+
+    minimum_size未満の本文、Content-Encoding設定済みの本文、圧縮済みの形式は圧縮しない。
+    brotliとgzipの両方を受け入れるクライアントにはbrotliを優先する。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: Optional[int] = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality if brotli is not None else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if self.brotli_quality is not None and "br" in accepted:
+            responder = _BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif "gzip" in accepted:
+            responder = _GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = _IdentityResponder(self.app, self.minimum_size)
+
+        await responder(scope, receive, send)
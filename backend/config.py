@@ -2,8 +2,8 @@
 環境変数と設定管理
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field, field_validator
-from typing import Union
+from pydantic import Field, field_validator, model_validator
+from typing import Literal, Union
 
 class Settings(BaseSettings):
     """アプリケーション設定"""
@@ -15,16 +15,127 @@ class Settings(BaseSettings):
     
     # データベース
     database_url: str = "postgresql://radio_user:radio_password@db:5432/radio_corner_selector"
+
+    # データベース接続プール（ワーカープロセスごとの値）
+    db_pool_size: int = Field(default=5, gt=0)
+    db_max_overflow: int = Field(default=10, ge=0)
+    db_pool_timeout_seconds: float = Field(default=30.0, gt=0)  # 空き接続を待つ上限
+    db_pool_recycle_seconds: int = 1800  # この秒数を超えた接続は再接続する（-1で無効）
+    # Trueはチェックアウトごとに接続を確認（1往復増える）。Falseはrecycleと切断時のプール破棄で対応する
+    db_pool_pre_ping: bool = True
+    db_connection_budget: int = Field(default=0, ge=0)  # 全ワーカー合計の接続数の上限（0で無制限）
+    web_concurrency: int = Field(default=1, gt=0)  # ワーカー数（entrypoint.shが設定する）
+    db_pgbouncer_mode: bool = False  # PgBouncer経由で接続（アプリ側のプールとプリペアドステートメントを無効化）
+
+    # 読み取りレプリカ（環境変数からはカンマ区切りで受け取る。空ならすべてプライマリから読む）
+    # 一覧・検索・統計の読み取りのみレプリカに振り分ける
+    database_replica_urls: Union[str, list[str]] = []
+    replica_sticky_seconds: float = Field(default=5.0, ge=0)  # 書き込んだユーザーの読み取りをプライマリに固定する時間
     
     # Google Gemini API
     gemini_api_key: str = ""
     gemini_model: str = "gemini-2.0-flash"
     gemini_temperature: float = 0.7
+    gemini_structured_output: bool = True  # response_schemaによるJSONモードを使用
+
+    # Gemini呼び出しの耐障害性
+    gemini_timeout_seconds: float = Field(default=10.0, gt=0)  # リトライを含む1回の呼び出し全体の期限
+    gemini_max_retries: int = Field(default=2, ge=0)  # 429・5xx・タイムアウト時のリトライ回数
+    gemini_retry_base_delay: float = 0.5
+    gemini_retry_max_delay: float = 4.0
+    gemini_hedge_enabled: bool = False  # p95レイテンシ超過時に同じリクエストを追加送信
+    gemini_hedge_min_delay: float = 1.5  # ヘッジ開始までの最小待ち時間（秒）
+    gemini_breaker_failure_threshold: int = Field(default=5, gt=0)
+    gemini_breaker_reset_seconds: float = 30.0
+
+    # Gemini接続プール（プロセス内で1つのクライアントを共有）
+    gemini_http2: bool = True  # h2パッケージがインストールされている場合のみ有効
+    gemini_max_connections: int = Field(default=20, gt=0)
+    gemini_max_keepalive_connections: int = Field(default=10, ge=0)
+    gemini_keepalive_expiry_seconds: float = 60.0
+
+    # プロバイダー呼び出しのレート制限（RPM・TPM・同時実行数の上限）
+    provider_queue_timeout_seconds: float = 5.0  # 実行枠を待つ最大時間
+    openai_embedding_rpm: int = Field(default=3000, gt=0)
+    openai_embedding_tpm: int = Field(default=1_000_000, gt=0)
+    openai_embedding_max_concurrency: int = Field(default=16, gt=0)
+    openai_embedding_latency_target_seconds: float = 2.0
+    gemini_rpm: int = Field(default=1000, gt=0)
+    gemini_tpm: int = Field(default=1_000_000, gt=0)
+    gemini_max_concurrency: int = Field(default=8, gt=0)
+    gemini_latency_target_seconds: float = 8.0
+
+    # 埋め込みプロバイダー（openai: OpenAI API / local: ONNXモデルをCPUで実行）
+    embedding_provider: Literal["openai", "local"] = "openai"
+    local_embedding_model_dir: str = "models/multilingual-e5-large"
+    local_embedding_quantized: bool = False  # int8量子化モデル（model_quantized.onnx）を使用
+    local_embedding_batch_size: int = Field(default=32, gt=0)
+    local_embedding_workers: int = Field(default=2, gt=0)
 
     # OpenAI API
     openai_api_key: str = ""
     openai_embedding_model: str = "text-embedding-3-small"
     embedding_dimension: int = Field(default=1024, le=1536)
+    embedding_batch_enabled: bool = True  # 同時に届いた埋め込み要求をまとめて1回で処理
+    embedding_batch_max_size: int = Field(default=64, gt=0)
+    embedding_batch_max_wait_ms: float = Field(default=5.0, ge=0)
+    embedding_batch_timeout_seconds: float = Field(default=30.0, gt=0)  # まとめた要求の結果を待つ上限
+
+    # コーナー候補検索
+    # hybrid: pg_trgmによる語彙一致とベクトル検索をReciprocal Rank Fusionで統合
+    # vector: ベクトル類似度のみ
+    retrieval_mode: Literal["hybrid", "vector"] = "hybrid"
+    vector_similarity_threshold: float = 0.08
+    lexical_similarity_threshold: float = 0.1
+    hybrid_rrf_k: int = Field(default=60, gt=0)
+    hybrid_candidate_pool: int = Field(default=20, gt=0)  # 各検索で融合前に取得する件数
+    llm_max_candidates: int = Field(default=5, gt=0)  # LLMに渡す候補数
+
+    # ベクトル検索のインデックス（retrieval_mode=vectorの場合）
+    # exact: 全次元のfloat32ベクトルで厳密に検索
+    # reduced: 先頭256次元の縮約ベクトルのHNSWインデックスで候補を絞り、全次元で再ランキング
+    # halfvec: float16に変換したベクトルのHNSWインデックスで候補を絞り、全次元で再ランキング
+    # binary: 二値量子化したベクトルのハミング距離で候補を絞り、全次元で再ランキング
+    # halfvec / binary のインデックスはマイグレーションで常に作成される
+    vector_search_index: Literal["exact", "reduced", "halfvec", "binary"] = "exact"
+    vector_rerank_candidates: int = Field(default=50, gt=0)  # 再ランキング対象の候補数
+
+    # ベクトル検索の実行場所（retrieval_mode=vector かつ vector_search_index=exact の場合）
+    # postgres: SQLで検索 / memory: ユーザーごとのコーナー行列をプロセス内にキャッシュして検索
+    vector_search_engine: Literal["postgres", "memory"] = "postgres"
+    corner_matrix_max_users: int = Field(default=1000, gt=0)
+    corner_matrix_ttl_seconds: float = Field(default=60.0, gt=0)  # 他ワーカーでの更新を反映するまでの最大時間
+
+    # LLMスキップ判定
+    # 1位の類似度が閾値以上かつ2位との差が閾値以上ならGeminiを呼ばずにベクトル検索結果を返す
+    llm_skip_enabled: bool = True
+    llm_skip_min_similarity: float = Field(default=0.6, ge=0.0, le=1.0)
+    llm_skip_min_margin: float = Field(default=0.15, ge=0.0, le=1.0)
+
+    # 類似度スコアの較正（train_score_calibration.pyでメールの採否から学習）
+    # 較正器があるユーザーは、LLMスキップ判定とベクトルのみの推奨スコアに採用確率を使う
+    score_calibration_enabled: bool = True
+    score_calibration_cache_seconds: float = Field(default=300.0, ge=0)
+    score_calibration_min_samples: int = Field(default=20, gt=0)
+    llm_skip_min_probability: float = Field(default=0.7, ge=0.0, le=1.0)
+    llm_skip_min_probability_margin: float = Field(default=0.2, ge=0.0, le=1.0)
+
+    # プロンプト構築（トークン数は推定値）
+    llm_prompt_token_budget: int = Field(default=1500, gt=0)
+    llm_corner_snippet_max_tokens: int = Field(default=150, gt=0)  # コーナー説明1件あたりの上限
+    llm_memo_max_tokens: int = Field(default=500, gt=0)
+
+    # 起動時のウォームアップ（Trueなら外部APIクライアントも /ready の前に初期化する）
+    # AI SDKは初回利用時に読み込むため、Falseなら解析を扱わないワーカーはSDKのメモリを消費しない
+    warmup_ai_clients: bool = False
+    # 終了時にウォームアップの完了を待つ上限（超えたら残りの準備を打ち切って終了する）
+    warmup_shutdown_timeout_seconds: float = Field(default=5.0, ge=0)
+
+    # レスポンスの圧縮（Accept-Encodingに応じてbrotli / gzip）
+    response_compression_enabled: bool = True
+    response_compression_min_size: int = Field(default=1024, ge=0)  # これより小さい本文は圧縮しない（バイト）
+    response_gzip_level: int = Field(default=6, ge=1, le=9)
+    response_brotli_quality: int = Field(default=4, ge=0, le=11)  # brotliパッケージがインストールされている場合のみ
 
     # アプリケーション
     app_name: str = "Radio Corner Selector API"
@@ -41,5 +152,23 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in v.split(',')]
         return v
 
+    @field_validator('database_replica_urls', mode='before')
+    @classmethod
+    def parse_database_replica_urls(cls, v):
+        """環境変数からカンマ区切りの文字列をリストに変換"""
+        if isinstance(v, str):
+            return [url.strip() for url in v.split(',') if url.strip()]
+        return v
+
+    @model_validator(mode='after')
+    def check_db_connection_budget(self):
+        """接続数の予算がワーカー数より少ないと、1ワーカー1接続でも予算を超えるため起動時に失敗させる"""
+        if not self.db_pgbouncer_mode and 0 < self.db_connection_budget < self.web_concurrency:
+            raise ValueError(
+                f"DB_CONNECTION_BUDGET ({self.db_connection_budget}) は "
+                f"WEB_CONCURRENCY ({self.web_concurrency}) 以上にしてください"
+            )
+        return self
+
 
 settings = Settings()
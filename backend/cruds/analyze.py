@@ -5,7 +5,7 @@ from typing import List, Tuple
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from models import Memo, Program, Corner
+from models import REDUCED_EMBEDDING_DIMENSION, Memo, Program, Corner
 
 
 
@@ -24,14 +24,35 @@ def get_user_corners(db: Session, user_id: int) -> List[Tuple[Corner, Program]]:
     )
 
 
+def get_user_corner_vectors(db: Session, user_id: int) -> Tuple[list, List[int]]:
+    """ユーザーの全コーナーを埋め込みベクトル付きで取得（プロセス内検索用）"""
+    rows = (
+        db.query(
+            Corner.id,
+            Corner.program_id,
+            Corner.title,
+            Corner.description_for_llm,
+            Corner.description_snippet,
+            Corner.embedded_description,
+            Program.title.label("program_title"),
+        )
+        .join(Program, Corner.program_id == Program.id)
+        .filter(Program.user_id == user_id)
+        .order_by(Corner.id)
+        .all()
+    )
+    program_ids = [program_id for (program_id,) in db.query(Program.id).filter(Program.user_id == user_id)]
+    return rows, program_ids
+
+
 def search_corners_by_embedding(
     db: Session, user_id: int, embedding: List[float], threshold: float, limit: int
 ) -> list:
     """ベクトル検索でコーナーを取得（user_idでフィルタ、program_titleをJOINで取得）"""
     SQL = text("""
-    SELECT id, program_id, title, description_for_llm, program_title, similarity
+    SELECT id, program_id, title, description_for_llm, description_snippet, program_title, similarity
     FROM (
-        SELECT c.id, c.program_id, c.title, c.description_for_llm, p.title AS program_title,
+        SELECT c.id, c.program_id, c.title, c.description_for_llm, c.description_snippet, p.title AS program_title,
                (1 - (c.embedded_description <=> :embedding)) AS similarity
         FROM corners c
         JOIN programs p ON c.program_id = p.id
@@ -44,3 +65,138 @@ def search_corners_by_embedding(
     result = db.execute(SQL, {"embedding": str(embedding), "user_id": user_id, "threshold": threshold, "limit": limit})
 
     return result.fetchall()
+
+
+# 候補生成に使うインデックスごとの並び順（migrationsで作成したインデックスの式と一致させる）
+# reduced: 先頭256次元の縮約ベクトル / halfvec: float16 / binary: 符号ビットのハミング距離
+_CANDIDATE_ORDER_BY = {
+    "reduced": (
+        "c.embedded_description_reduced <=> "
+        f"l2_normalize(subvector(CAST(:embedding AS vector(1024)), 1, {REDUCED_EMBEDDING_DIMENSION}))"
+    ),
+    "halfvec": "c.embedded_description::halfvec(1024) <=> CAST(:embedding AS halfvec(1024))",
+    "binary": "binary_quantize(c.embedded_description)::bit(1024) <~> binary_quantize(CAST(:embedding AS vector(1024)))",
+}
+
+
+def search_corners_with_rerank(
+    db: Session,
+    user_id: int,
+    embedding: List[float],
+    index: str,
+    threshold: float,
+    candidate_limit: int,
+    limit: int,
+) -> list:
+    """
+    近似インデックスで候補を生成し、全次元のfloat32ベクトルで再ランキングして取得
+
+    候補生成はindex（reduced / halfvec / binary）に対応するHNSWインデックスを使用する。
+    user_idでの絞り込みで候補が不足しないよう、反復スキャンを有効にする（pgvector 0.8以降）。
+    返却するsimilarityは全次元のベクトルによる類似度。
+    """
+    db.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+    SQL = text(f"""
+    WITH candidates AS (
+        SELECT c.id
+        FROM corners c
+        JOIN programs p ON c.program_id = p.id
+        WHERE p.user_id = :user_id
+        ORDER BY {_CANDIDATE_ORDER_BY[index]}
+        LIMIT :candidate_limit
+    )
+    SELECT id, program_id, title, description_for_llm, description_snippet, program_title, similarity
+    FROM (
+        SELECT c.id, c.program_id, c.title, c.description_for_llm, c.description_snippet, p.title AS program_title,
+               (1 - (c.embedded_description <=> :embedding)) AS similarity
+        FROM candidates
+        JOIN corners c ON c.id = candidates.id
+        JOIN programs p ON c.program_id = p.id
+    ) sub
+    WHERE similarity > :threshold
+    ORDER BY similarity DESC
+    LIMIT :limit
+    """)
+    result = db.execute(
+        SQL,
+        {
+            "embedding": str(embedding),
+            "user_id": user_id,
+            "threshold": threshold,
+            "candidate_limit": candidate_limit,
+            "limit": limit,
+        },
+    )
+
+    return result.fetchall()
+
+
+def search_corners_hybrid(
+    db: Session,
+    user_id: int,
+    embedding: List[float],
+    query_text: str,
+    vector_threshold: float,
+    lexical_threshold: float,
+    rrf_k: int,
+    candidate_pool: int,
+    limit: int,
+) -> list:
+    """
+    語彙一致（pg_trgm）とベクトル検索の結果をReciprocal Rank Fusionで統合して取得
+
+    両方のランキングと融合を1回のクエリで実行する。
+    rrf_score = Σ 1 / (rrf_k + rank) で、片方にしか現れない候補はその項のみで評価される。
+    similarityは融合順位に関わらず常にベクトル類似度を返す。
+    """
+    SQL = text("""
+    WITH user_corners AS (
+        SELECT c.id, c.program_id, c.title, c.description_for_llm, c.description_snippet,
+               p.title AS program_title,
+               (1 - (c.embedded_description <=> :embedding)) AS similarity,
+               GREATEST(
+                   word_similarity(c.title, :query_text),
+                   similarity(c.description_for_llm, :query_text)
+               ) AS lexical_score
+        FROM corners c
+        JOIN programs p ON c.program_id = p.id
+        WHERE p.user_id = :user_id
+    ),
+    vector_ranked AS (
+        SELECT id, ROW_NUMBER() OVER (ORDER BY similarity DESC) AS rank
+        FROM user_corners
+        WHERE similarity > :vector_threshold
+        ORDER BY similarity DESC
+        LIMIT :candidate_pool
+    ),
+    lexical_ranked AS (
+        SELECT id, ROW_NUMBER() OVER (ORDER BY lexical_score DESC) AS rank
+        FROM user_corners
+        WHERE lexical_score > :lexical_threshold
+        ORDER BY lexical_score DESC
+        LIMIT :candidate_pool
+    )
+    SELECT uc.id, uc.program_id, uc.title, uc.description_for_llm, uc.description_snippet, uc.program_title,
+           uc.similarity, uc.lexical_score,
+           COALESCE(1.0 / (:rrf_k + v.rank), 0) + COALESCE(1.0 / (:rrf_k + l.rank), 0) AS rrf_score
+    FROM vector_ranked v
+    FULL OUTER JOIN lexical_ranked l ON v.id = l.id
+    JOIN user_corners uc ON uc.id = COALESCE(v.id, l.id)
+    ORDER BY rrf_score DESC, uc.similarity DESC
+    LIMIT :limit
+    """)
+    result = db.execute(
+        SQL,
+        {
+            "embedding": str(embedding),
+            "query_text": query_text,
+            "user_id": user_id,
+            "vector_threshold": vector_threshold,
+            "lexical_threshold": lexical_threshold,
+            "rrf_k": rrf_k,
+            "candidate_pool": candidate_pool,
+            "limit": limit,
+        },
+    )
+
+    return result.fetchall()
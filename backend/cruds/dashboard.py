@@ -0,0 +1,124 @@
+"""
+ダッシュボードの集計
+最近のメモ・メール統計・最近のメール・番組の概要を、CTEを使った1つのSQL（1往復）で取得する
+"""
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from domain.value_objects.mail_status import MailStatus
+from models import Corner, Mail, Memo, Program
+
+
+def _json_array(cte, *order_by):
+    """CTEの行をJSON配列に集約するスカラーサブクエリ（行がなければ空配列）"""
+    return (
+        select(func.coalesce(
+            func.json_agg(aggregate_order_by(cte.table_valued(), *order_by)),
+            literal_column("'[]'::json"),
+        ))
+        .select_from(cte)
+        .scalar_subquery()
+    )
+
+
+def get_dashboard(db: Session, user_id: int, memo_limit: int, mail_limit: int) -> dict:
+    """
+    ダッシュボードのデータを取得
+
+    各部分はCTEで絞り込み・集計し、PostgreSQLでJSONに組み立てて1行で返す。
+
+    Args:
+        db: データベースセッション
+        user_id: ユーザーID
+        memo_limit: 最近のメモの件数
+        mail_limit: 最近のメールの件数
+
+    Returns:
+        recent_memos / stats / recent_mails / programs をキーとする辞書
+    """
+    recent_memos = (
+        select(Memo.content, Memo.id, Memo.user_id, Memo.created_at)
+        .where(Memo.user_id == user_id)
+        .order_by(Memo.created_at.desc(), Memo.id.desc())
+        .limit(memo_limit)
+        .cte("recent_memos")
+    )
+
+    mail_stats = (
+        select(
+            func.count().label("total"),
+            func.count().filter(Mail.status == MailStatus.DRAFT.value).label("draft"),
+            func.count().filter(Mail.status == MailStatus.SENT.value).label("sent"),
+            func.count().filter(Mail.status == MailStatus.ACCEPTED.value).label("accepted"),
+            func.count().filter(Mail.status == MailStatus.REJECTED.value).label("rejected"),
+        )
+        .where(Mail.user_id == user_id)
+        .cte("mail_stats")
+    )
+
+    recent_mails = (
+        select(
+            Mail.subject,
+            Mail.status,
+            Mail.id,
+            Mail.corner_id,
+            Corner.title.label("corner_title"),
+            Program.id.label("program_id"),
+            Program.title.label("program_title"),
+            Mail.sent_at,
+            Mail.created_at,
+        )
+        .join(Corner, Corner.id == Mail.corner_id)
+        .join(Program, Program.id == Corner.program_id)
+        .where(Mail.user_id == user_id)
+        .order_by(Mail.created_at.desc(), Mail.id.desc())
+        .limit(mail_limit)
+        .cte("recent_mails")
+    )
+
+    # コーナー数とメール数はそれぞれ番組ごとに集計してから結合する（結合後に数えると掛け算になるため）
+    corner_counts = (
+        select(Corner.program_id, func.count().label("corner_count"))
+        .join(Program, Program.id == Corner.program_id)
+        .where(Program.user_id == user_id)
+        .group_by(Corner.program_id)
+        .cte("corner_counts")
+    )
+    mail_counts = (
+        select(Corner.program_id, func.count().label("mail_count"))
+        .join(Mail, Mail.corner_id == Corner.id)
+        .where(Mail.user_id == user_id)
+        .group_by(Corner.program_id)
+        .cte("mail_counts")
+    )
+    program_summaries = (
+        select(
+            Program.title,
+            Program.broadcast_schedule,
+            Program.id,
+            func.coalesce(corner_counts.c.corner_count, 0).label("corner_count"),
+            func.coalesce(mail_counts.c.mail_count, 0).label("mail_count"),
+        )
+        .outerjoin(corner_counts, corner_counts.c.program_id == Program.id)
+        .outerjoin(mail_counts, mail_counts.c.program_id == Program.id)
+        .where(Program.user_id == user_id)
+        .cte("program_summaries")
+    )
+
+    row = db.execute(
+        select(
+            _json_array(
+                recent_memos, recent_memos.c.created_at.desc(), recent_memos.c.id.desc()
+            ).label("recent_memos"),
+            select(func.row_to_json(mail_stats.table_valued()))
+            .select_from(mail_stats)
+            .scalar_subquery()
+            .label("stats"),
+            _json_array(
+                recent_mails, recent_mails.c.created_at.desc(), recent_mails.c.id.desc()
+            ).label("recent_mails"),
+            _json_array(program_summaries, program_summaries.c.id).label("programs"),
+        )
+    ).one()
+    return row._asdict()
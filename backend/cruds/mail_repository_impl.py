@@ -2,7 +2,8 @@
 メールリポジトリ実装
 Repository Interfaceの具体的な実装
 """
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from models import Mail
@@ -125,6 +126,24 @@ class MailRepositoryImpl(MailRepositoryInterface):
         
         return query.offset(skip).limit(limit).all()
     
+    def get_rows_by_user_id(
+        self,
+        user_id: int,
+        status_filter: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        *,
+        fields: Sequence[str]
+    ) -> List[dict]:
+        """ユーザーIDでメール一覧を取得（指定された列のみの辞書。ORMオブジェクトを生成しない）"""
+        query = select(*(getattr(Mail, name) for name in fields)).where(Mail.user_id == user_id)
+        
+        if status_filter:
+            query = query.where(Mail.status == status_filter)
+        
+        rows = self._db.execute(query.offset(skip).limit(limit))
+        return [dict(zip(fields, row)) for row in rows]
+    
     def get_statistics(self, user_id: int) -> dict:
         """メール統計を取得（後方互換性のため）"""
         mails = self._db.query(Mail).filter(Mail.user_id == user_id).all()
@@ -2,7 +2,8 @@
 メモリポジトリ実装
 Repository Interfaceの具体的な実装
 """
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from models import Memo
@@ -110,6 +111,23 @@ class MemoRepositoryImpl(MemoRepositoryInterface):
             .all()
         )
     
+    def get_rows_by_user_id(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        *,
+        fields: Sequence[str]
+    ) -> List[dict]:
+        """ユーザーIDでメモ一覧を取得（指定された列のみの辞書。ORMオブジェクトを生成しない）"""
+        rows = self._db.execute(
+            select(*(getattr(Memo, name) for name in fields))
+            .where(Memo.user_id == user_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return [dict(zip(fields, row)) for row in rows]
+    
     @staticmethod
     def _to_entity(db_memo: Memo) -> MemoEntity:
         """DBモデルをエンティティに変換"""
@@ -2,6 +2,7 @@
 パーソナリティのCRUD操作
 """
 from typing import List, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from models import Personality
@@ -12,6 +13,15 @@ def get_personalities(db: Session, user_id: int) -> List[Personality]:
     return db.query(Personality).filter(Personality.user_id == user_id).all()
 
 
+def get_personality_rows(db: Session, user_id: int) -> List[dict]:
+    """パーソナリティ一覧を取得（PersonalityResponseと同じキーの辞書。ORMオブジェクトを生成しない）"""
+    rows = db.execute(
+        select(Personality.name, Personality.nickname, Personality.id, Personality.user_id)
+        .where(Personality.user_id == user_id)
+    )
+    return [row._asdict() for row in rows]
+
+
 def get_personality(db: Session, personality_id: int) -> Optional[Personality]:
     """パーソナリティを取得"""
     return db.query(Personality).filter(Personality.id == personality_id).first()
@@ -2,10 +2,11 @@
 番組リポジトリ実装
 Repository Interfaceの具体的な実装
 """
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from models import Program, Personality, program_personalities
+from models import Corner, Program, Personality, program_personalities
 from domain.repositories.program_repository import ProgramRepositoryInterface
 from domain.entities.program_entity import ProgramEntity
 from domain.value_objects.email_address import EmailAddress
@@ -158,6 +159,73 @@ class ProgramRepositoryImpl(ProgramRepositoryInterface):
         
         return query.all()
     
+    def get_rows_by_user_id(
+        self,
+        user_id: int,
+        personality_id: Optional[int],
+        search: Optional[str],
+        fields: Sequence[str],
+        includes: Dict[str, Sequence[str]]
+    ) -> List[dict]:
+        """
+        ユーザーIDで番組一覧を取得（指定された列のみの辞書。ORMオブジェクトを生成しない）
+        
+        コーナーとパーソナリティは番組ごとの遅延読み込みではなく、それぞれ1回の問い合わせでまとめて取得する。
+        includesに含まれない関連は問い合わせ自体を行わない
+        
+        Args:
+            user_id: ユーザーID
+            personality_id: パーソナリティでの絞り込み
+            search: 番組名での絞り込み
+            fields: 番組の列名（辞書のキー順）
+            includes: 関連名（corners / personalities） → 関連先の列名
+        """
+        # 関連の紐付けに番組IDが必要なため、指定されていなくても取得する
+        query = select(Program.id, *(getattr(Program, name) for name in fields)).where(Program.user_id == user_id)
+        
+        if personality_id:
+            query = query.join(
+                program_personalities,
+                Program.id == program_personalities.c.program_id
+            ).where(program_personalities.c.personality_id == personality_id)
+        
+        if search:
+            query = query.where(Program.title.contains(search))
+        
+        programs = {}
+        for program_id, *values in self._db.execute(query):
+            programs[program_id] = dict(zip(fields, values))
+            for relation in includes:
+                programs[program_id][relation] = []
+        if not programs or not includes:
+            return list(programs.values())
+        
+        if "corners" in includes:
+            corner_fields = includes["corners"]
+            corners = self._db.execute(
+                select(Corner.program_id, *(getattr(Corner, name) for name in corner_fields))
+                .where(Corner.program_id.in_(programs))
+                .order_by(Corner.id)
+            )
+            for program_id, *values in corners:
+                programs[program_id]["corners"].append(dict(zip(corner_fields, values)))
+        
+        if "personalities" in includes:
+            personality_fields = includes["personalities"]
+            personalities = self._db.execute(
+                select(
+                    program_personalities.c.program_id,
+                    *(getattr(Personality, name) for name in personality_fields)
+                )
+                .join(Personality, Personality.id == program_personalities.c.personality_id)
+                .where(program_personalities.c.program_id.in_(programs))
+                .order_by(Personality.id)
+            )
+            for program_id, *values in personalities:
+                programs[program_id]["personalities"].append(dict(zip(personality_fields, values)))
+        
+        return list(programs.values())
+    
     @staticmethod
     def _to_entity(db_program: Program) -> ProgramEntity:
         """DBモデルをエンティティに変換"""
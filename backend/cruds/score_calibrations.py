@@ -0,0 +1,71 @@
+"""
+類似度スコア較正のCRUD操作
+"""
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from domain.value_objects.mail_status import MailStatus
+from models import Corner, Mail, Memo, ScoreCalibration
+
+
+def get_calibration(db: Session, user_id: int) -> Optional[ScoreCalibration]:
+    """ユーザーの較正器を取得"""
+    return db.get(ScoreCalibration, user_id)
+
+
+def delete_calibration(db: Session, user_id: int) -> None:
+    """ユーザーの較正器を削除（存在しなければ何もしない）"""
+    db.query(ScoreCalibration).filter(ScoreCalibration.user_id == user_id).delete()
+    db.commit()
+
+
+def iter_labeled_mails(db: Session, batch_size: int = 1000) -> Iterator:
+    """
+    採否が確定したメールをメモ内容とコーナーの埋め込みベクトル付きでユーザー順に取得
+
+    サーバーサイドカーソルでbatch_size件ずつ読み込み、全件をメモリに載せない。
+    """
+    query = (
+        db.query(
+            Mail.user_id,
+            Mail.memo_id,
+            Mail.status,
+            Memo.content.label("memo_content"),
+            Corner.embedded_description,
+        )
+        .join(Memo, Mail.memo_id == Memo.id)
+        .join(Corner, Mail.corner_id == Corner.id)
+        .filter(Mail.status.in_([MailStatus.ACCEPTED.value, MailStatus.REJECTED.value]))
+        .order_by(Mail.user_id, Mail.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    yield from query
+
+
+def upsert_calibration(
+    db: Session,
+    user_id: int,
+    slope: float,
+    intercept: float,
+    sample_count: int,
+    accepted_count: int,
+) -> None:
+    """ユーザーの較正器を保存（既存があれば置き換え）"""
+    values = {
+        "user_id": user_id,
+        "slope": slope,
+        "intercept": intercept,
+        "sample_count": sample_count,
+        "accepted_count": accepted_count,
+        "trained_at": datetime.now(),
+    }
+    statement = insert(ScoreCalibration).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ScoreCalibration.user_id],
+        set_={key: value for key, value in values.items() if key != "user_id"},
+    )
+    db.execute(statement)
+    db.commit()
@@ -0,0 +1,30 @@
+"""
+ユーザーのデータバージョンの操作
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Connection, Row
+from sqlalchemy.orm import Session
+
+from models import User
+
+
+def get_data_version(db: Session, user_id: int) -> Optional[Row]:
+    """ユーザーのデータバージョンと最終更新日時を取得（主キーでの1行の読み込み）"""
+    return db.execute(
+        select(User.data_version, User.data_updated_at).where(User.id == user_id)
+    ).first()
+
+
+def bump_data_versions(connection: Connection, user_ids: Iterable[int]) -> None:
+    """ユーザーのデータバージョンを進める（書き込みと同じトランザクション内で呼ぶ）"""
+    connection.execute(
+        update(User)
+        .where(User.id.in_(list(user_ids)))
+        # now()はトランザクション開始時刻のため、長いトランザクションで時刻が戻らないよう実時刻の大きい方を使う
+        .values(
+            data_version=User.data_version + 1,
+            data_updated_at=func.greatest(User.data_updated_at, func.clock_timestamp()),
+        )
+    )
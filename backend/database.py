@@ -1,22 +1,251 @@
 """
 データベース接続設定
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import random
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from sqlalchemy import Delete, Insert, Update, create_engine, event, exc, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 
 from config import settings
 
+
+class _InstrumentedQueuePool(QueuePool):
+    """チェックアウトの待ち時間と使用率をメトリクスに記録するコネクションプール"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            _metrics().increment(f"{_metrics_prefix(self)}.timeouts")
+            raise
+        finally:
+            # 空き接続がない場合の待ち時間と、新規接続の確立時間を含む
+            _metrics().observe(f"{_metrics_prefix(self)}.checkout_wait_seconds", time.perf_counter() - started)
+            self._record_usage()
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._record_usage()
+
+    def _record_usage(self) -> None:
+        metrics = _metrics()
+        prefix = _metrics_prefix(self)
+        checked_out = self.checkedout()
+        capacity = self.size() + max(self._max_overflow, 0)
+        metrics.set_gauge(f"{prefix}.checked_out", checked_out)
+        metrics.set_gauge(f"{prefix}.utilization", checked_out / capacity if capacity else 0.0)
+
+
+def _metrics_prefix(pool) -> str:
+    # レプリカのプールはpool_logging_name（replica1など）で区別する
+    return f"db.{pool.logging_name}.pool" if pool.logging_name else "db.pool"
+
+
+def _metrics():
+    # servicesパッケージはmodels経由でこのモジュールを読み込むため、循環importを避けて呼び出し時に読み込む
+    from services import metrics
+    return metrics
+
+
+def _pool_limits() -> tuple:
+    """
+    ワーカー1プロセスあたりのプールサイズと追加接続数を取得
+
+    db_connection_budgetが設定されている場合は、全ワーカーの合計が予算内に収まるよう
+    (予算 / ワーカー数) を上限にプールサイズ・追加接続数を切り詰める
+    """
+    pool_size = settings.db_pool_size
+    max_overflow = settings.db_max_overflow
+    if settings.db_connection_budget > 0:
+        # 予算がワーカー数以上であることは設定の読み込み時に検証済み
+        per_worker = settings.db_connection_budget // settings.web_concurrency
+        pool_size = min(pool_size, per_worker)
+        max_overflow = min(max_overflow, per_worker - pool_size)
+    return pool_size, max_overflow
+
+
+def _create_engine(url: str, name: Optional[str] = None):
+    """
+    設定に応じたSQLAlchemyエンジンを作成
+
+    Args:
+        url: 接続先のURL
+        name: メトリクスでプールを区別する名前（プライマリはNone）
+    """
+    if settings.db_pgbouncer_mode:
+        # PgBouncer（トランザクションプーリング）側でプールするため、アプリ側ではプールしない。
+        # サーバーサイドのプリペアドステートメントは別のサーバー接続で実行されると失敗するので無効化する。
+        # psycopg2は既定でプリペアドステートメントを使わないため、psycopg（v3）の場合のみ設定が必要
+        connect_args = {}
+        if make_url(url).get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+        return create_engine(
+            url,
+            echo=settings.debug,
+            poolclass=NullPool,
+            connect_args=connect_args,
+        )
+
+    pool_size, max_overflow = _pool_limits()
+    return create_engine(
+        url,
+        echo=settings.debug,
+        poolclass=_InstrumentedQueuePool,
+        pool_logging_name=name,
+        pool_size=pool_size,  # コネクションプールサイズ
+        max_overflow=max_overflow,  # 最大追加接続数
+        pool_timeout=settings.db_pool_timeout_seconds,  # 空き接続を待つ上限
+        pool_recycle=settings.db_pool_recycle_seconds,  # 古い接続の再接続
+        pool_pre_ping=settings.db_pool_pre_ping,  # チェックアウトごとの接続の健全性チェック
+    )
+
+
 # SQLAlchemyエンジン作成
-engine = create_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,  # 接続の健全性チェック
-    pool_size=5,  # コネクションプールサイズ
-    max_overflow=10,  # 最大追加接続数
-)
+engine = _create_engine(settings.database_url)
+
+# 読み取りレプリカのエンジン（未設定なら空）
+replica_engines = [
+    _create_engine(url, name=f"replica{i}") for i, url in enumerate(settings.database_replica_urls, start=1)
+]
+
+# 書き込み後に読み取りをプライマリに固定するユーザーと期限
+_sticky_until: Dict[int, float] = {}
+_sticky_lock = threading.Lock()
+
+
+def _mark_user_written(user_ids: Set[int]) -> None:
+    deadline = time.monotonic() + settings.replica_sticky_seconds
+    with _sticky_lock:
+        now = time.monotonic()
+        for user_id in [u for u, until in _sticky_until.items() if until <= now]:
+            del _sticky_until[user_id]
+        for user_id in user_ids:
+            _sticky_until[user_id] = deadline
+
+
+def _is_sticky(user_id: int) -> bool:
+    with _sticky_lock:
+        return _sticky_until.get(user_id, 0.0) > time.monotonic()
+
+
+class RoutingSession(Session):
+    """
+    読み取り専用として扱うセッションの問い合わせをレプリカに振り分けるセッション
+
+    route_reads() を呼んだセッションのみ対象で、それ以外はすべてプライマリを使う。
+    書き込みを行ったユーザーは replica_sticky_seconds の間プライマリから読む（read-your-writes）。
+    書き込みの記録はプロセス内でのみ共有されるため、複数ワーカー構成では
+    他のワーカーが書き込んだ直後の読み取りがレプリカの遅延の分だけ古い値を返すことがある。
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not replica_engines or not self.info.get("read_only"):
+            return engine
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            return engine
+        if "read_bind" not in self.info:
+            # 1つのセッション内では同じ接続先を使い続ける
+            user_id = self.info.get("user_id")
+            if user_id is None or _is_sticky(user_id):
+                self.info["read_bind"] = engine
+                _metrics().increment("db.routing.primary_reads")
+            else:
+                self.info["read_bind"] = random.choice(replica_engines)
+                _metrics().increment("db.routing.replica_reads")
+        return self.info["read_bind"]
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_written_users(session: Session, flush_context) -> None:
+    """
+    書き込みがあったユーザーのデータバージョンを進め、ユーザーを記録する
+
+    データバージョンは同じトランザクション内で更新する（一覧APIのETag）。
+    記録したユーザーはコミット時にプライマリへの固定を開始する。
+    """
+    # modelsはこのモジュールのBaseを使うため呼び出し時に読み込む
+    from models import Corner, Program, User
+
+    user_ids = set()
+    program_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, Corner):
+            program_ids.add(obj.program_id)
+        elif getattr(obj, "user_id", None) is not None:
+            user_ids.add(obj.user_id)
+    if program_ids:
+        rows = session.connection().execute(select(Program.user_id).where(Program.id.in_(program_ids)))
+        user_ids.update(row.user_id for row in rows)
+    _record_written_users(session, user_ids)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _collect_bulk_written_users(orm_execute_state):
+    """
+    一括UPDATE・DELETE（query(...).delete() など）の対象ユーザーのデータバージョンを進める
+
+    一括操作はflushを通らずafter_flushで検出できないため、同じ条件で対象ユーザーを先に読み込んでおく。
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return None
+
+    from models import Corner, Program, User
+
+    entity = mapper.class_
+    if entity is User:
+        query = select(User.id)
+    elif entity is Corner:
+        query = select(Program.user_id).join(Corner, Corner.program_id == Program.id)
+    elif hasattr(entity, "user_id"):
+        query = select(entity.user_id)
+    else:
+        return None
+    where = orm_execute_state.statement.whereclause
+    if where is not None:
+        query = query.where(where)
+
+    session = orm_execute_state.session
+    user_ids = set(session.connection().execute(query.distinct()).scalars())
+    result = orm_execute_state.invoke_statement()
+    _record_written_users(session, user_ids)
+    return result
+
+
+def _record_written_users(session: Session, user_ids: Set[int]) -> None:
+    """データバージョンを進め、コミット時にプライマリへ固定するユーザーとして記録する"""
+    # modelsはこのモジュールのBaseを使うため呼び出し時に読み込む
+    from cruds.users import bump_data_versions
+
+    if user_ids:
+        bump_data_versions(session.connection(), user_ids)
+        session.info.setdefault("written_user_ids", set()).update(user_ids)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _stick_written_users(session: Session) -> None:
+    user_ids = session.info.pop("written_user_ids", None)
+    if user_ids and replica_engines:
+        _mark_user_written(user_ids)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_written_users(session: Session) -> None:
+    session.info.pop("written_user_ids", None)
+
 
 # セッションファクトリ
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 # Baseクラス
 Base = declarative_base()
@@ -31,6 +260,28 @@ def get_db():
         db.close()
 
 
+def route_reads(db: Session, user_id: Optional[int]) -> None:
+    """
+    セッションの読み取りをレプリカに振り分ける
+
+    Args:
+        db: データベースセッション（最初の問い合わせより前に呼ぶ）
+        user_id: 読み取り対象のユーザーID（直近に書き込みがあればプライマリを使う。Noneならプライマリ）
+    """
+    db.info["read_only"] = True
+    db.info["user_id"] = user_id
+
+
+def get_read_db(user_id: Optional[int] = None):
+    """一覧・検索・統計などの読み取り専用のデータベースセッションを取得"""
+    db = SessionLocal()
+    route_reads(db, user_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def init_db():
     """データベースを初期化"""
     Base.metadata.create_all(bind=engine)
@@ -5,9 +5,11 @@
 from .mail_creation_service import MailCreationService
 from .corner_recommendation_service import CornerRecommendationService
 from .mail_statistics_service import MailStatisticsService
+from .score_calibration_service import ScoreCalibrationService
 
 __all__ = [
     "MailCreationService",
     "CornerRecommendationService",
     "MailStatisticsService",
+    "ScoreCalibrationService",
 ]
@@ -3,9 +3,26 @@
 LLM解析結果の評価とランキング
 ベクトル検索とLLM推論を組み合わせた推薦
 """
-from typing import List, Dict
+import heapq
+from typing import List, Dict, NamedTuple
+
+import numpy as np
+
 from domain.value_objects.recommendation_score import RecommendationScore
 
+# 信頼度ラベルの閾値（evaluate_recommendation_qualityと同じ基準）
+HIGH_CONFIDENCE_THRESHOLD = 0.8
+LOW_CONFIDENCE_THRESHOLD = 0.3
+# LLM評価がない場合のスコア
+DEFAULT_LLM_SCORE = 0.5
+
+
+class ScoreMatrixResult(NamedTuple):
+    """複数メモの一括スコアリング結果（各配列の形状は M × k）"""
+    corner_indices: np.ndarray  # 入力のコーナー列インデックス（スコア降順）
+    scores: np.ndarray  # 統合スコア
+    confidence: np.ndarray  # 信頼度ラベル
+
 
 class CornerRecommendationService:
     """コーナー推奨に関するドメインサービス"""
@@ -25,14 +42,12 @@ class CornerRecommendationService:
         Returns:
             スコア順にソートされた推奨結果
         """
-        # スコアでソート（降順）
-        sorted_recs = sorted(
+        # 上位max_results件のみ取り出す（全件ソートしない）
+        return heapq.nlargest(
+            max_results,
             recommendations,
-            key=lambda r: r.get("score", 0.0),
-            reverse=True
+            key=lambda r: r.get("score", 0.0)
         )
-        
-        return sorted_recs[:max_results]
     
     @staticmethod
     def combine_scores(
@@ -63,6 +78,139 @@ class CornerRecommendationService:
         
         return max(0.0, min(1.0, combined))
     
+    @staticmethod
+    def combine_score_matrix(
+        similarities: np.ndarray,
+        llm_scores: np.ndarray,
+        similarity_weight: float = 0.4,
+        llm_weight: float = 0.6
+    ) -> np.ndarray:
+        """
+        ベクトル類似度とLLMスコアを行列単位で組み合わせる（combine_scoresの一括版）
+        
+        Args:
+            similarities: ベクトル類似度 (M × N)。NaNは0.0として扱う
+            llm_scores: LLMスコア (M × N)。NaN（未評価）はDEFAULT_LLM_SCOREとして扱う
+            similarity_weight: 類似度の重み
+            llm_weight: LLMスコアの重み
+            
+        Returns:
+            統合スコア (M × N, 0.0-1.0)
+        """
+        similarities = np.nan_to_num(np.asarray(similarities, dtype=np.float64), nan=0.0)
+        llm_scores = np.asarray(llm_scores, dtype=np.float64)
+        llm_scores = np.where(np.isnan(llm_scores), DEFAULT_LLM_SCORE, llm_scores)
+        
+        total_weight = similarity_weight + llm_weight
+        combined = (
+            similarities * (similarity_weight / total_weight)
+            + llm_scores * (llm_weight / total_weight)
+        )
+        return np.clip(combined, 0.0, 1.0)
+    
+    @staticmethod
+    def confidence_labels(scores: np.ndarray) -> np.ndarray:
+        """
+        スコアの配列を信頼度ラベルに変換（evaluate_recommendation_qualityの一括版）
+        
+        Args:
+            scores: スコアの配列 (0.0-1.0)
+        
+        Returns:
+            同じ形状のラベル配列（高信頼度/中信頼度/低信頼度）
+        """
+        scores = np.asarray(scores)
+        return np.select(
+            [scores >= HIGH_CONFIDENCE_THRESHOLD, scores <= LOW_CONFIDENCE_THRESHOLD],
+            ["高信頼度", "低信頼度"],
+            default="中信頼度"
+        )
+    
+    @staticmethod
+    def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        各行のスコア上位k件の列インデックスをスコア降順で取得
+        
+        Args:
+            scores: スコア行列 (M × N)
+            k: 取得件数（Nを超える場合はN）
+        
+        Returns:
+            列インデックス (M × min(k, N))
+        """
+        scores = np.asarray(scores)
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return np.empty((scores.shape[0], 0), dtype=np.intp)
+        if k < scores.shape[1]:
+            # 上位k件を部分選択してから、その中だけをソートする
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+        return np.take_along_axis(candidates, order, axis=1)
+    
+    @staticmethod
+    def score_memo_batch(
+        similarities: np.ndarray,
+        llm_scores: np.ndarray,
+        max_results: int = 3,
+        similarity_weight: float = 0.4,
+        llm_weight: float = 0.6
+    ) -> ScoreMatrixResult:
+        """
+        M件のメモ × N件のコーナーを一括でスコアリングし、メモごとの上位を取得
+        
+        enrich_recommendations_with_combined_scores → rank_recommendations を
+        メモ単位で繰り返す処理と同じ結果を、辞書を作らずに行列演算で求める。
+        
+        Args:
+            similarities: ベクトル類似度 (M × N)
+            llm_scores: LLMスコア (M × N)
+            max_results: メモごとの最大件数
+            similarity_weight: 類似度の重み
+            llm_weight: LLMスコアの重み
+        
+        Returns:
+            メモごとの上位コーナーのインデックス・統合スコア・信頼度ラベル
+        """
+        combined = CornerRecommendationService.combine_score_matrix(
+            similarities, llm_scores, similarity_weight, llm_weight
+        )
+        indices = CornerRecommendationService.top_k_indices(combined, max_results)
+        scores = np.take_along_axis(combined, indices, axis=1)
+        return ScoreMatrixResult(
+            corner_indices=indices,
+            scores=scores,
+            confidence=CornerRecommendationService.confidence_labels(scores)
+        )
+    
+    @staticmethod
+    def is_vector_result_decisive(
+        similarities: List[float],
+        min_similarity: float = 0.6,
+        min_margin: float = 0.15
+    ) -> bool:
+        """
+        ベクトル類似度だけで推奨先を決められるか判定
+        
+        Args:
+            similarities: 候補コーナーのベクトル類似度
+            min_similarity: 1位に求める類似度の下限
+            min_margin: 1位と2位の類似度差の下限
+        
+        Returns:
+            LLM推論を省略してよいかどうか
+        """
+        if not similarities:
+            return False
+        
+        ranked = sorted(similarities, reverse=True)
+        top = ranked[0]
+        runner_up = ranked[1] if len(ranked) > 1 else 0.0
+        
+        return top >= min_similarity and (top - runner_up) >= min_margin
+    
     @staticmethod
     def filter_by_confidence(
         recommendations: List[Dict],
@@ -96,9 +244,9 @@ class CornerRecommendationService:
         """
         score = RecommendationScore(score_value)
         
-        if score.is_high_confidence(0.8):
+        if score.is_high_confidence(HIGH_CONFIDENCE_THRESHOLD):
             return "高信頼度"
-        elif score.is_low_confidence(0.3):
+        elif score.is_low_confidence(LOW_CONFIDENCE_THRESHOLD):
             return "低信頼度"
         else:
             return "中信頼度"
@@ -134,7 +282,7 @@ class CornerRecommendationService:
         """
         # LLMスコアをIDでマッピング
         llm_scores_map = {
-            item["id"]: item.get("llm_score", 0.5)
+            item["id"]: item.get("llm_score", DEFAULT_LLM_SCORE)
             for item in llm_evaluations
         }
         
@@ -142,7 +290,7 @@ class CornerRecommendationService:
         for result in vector_results:
             corner_id = result["id"]
             similarity = result.get("similarity", 0.0)
-            llm_score = llm_scores_map.get(corner_id, 0.5)
+            llm_score = llm_scores_map.get(corner_id, DEFAULT_LLM_SCORE)
             
             # 統合スコアを計算
             combined_score = CornerRecommendationService.combine_scores(
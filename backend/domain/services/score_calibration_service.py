@@ -0,0 +1,75 @@
+"""
+ドメインサービス: 類似度スコアの較正
+過去のメール採否からベクトル類似度を採用確率に変換する較正器（Plattスケーリング）を学習する
+"""
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class Calibration(NamedTuple):
+    """採用確率 = sigmoid(slope * similarity + intercept)"""
+    slope: float
+    intercept: float
+
+
+class ScoreCalibrationService:
+    """類似度スコアの較正に関するドメインサービス"""
+
+    @staticmethod
+    def fit(
+        similarities: np.ndarray,
+        accepted: np.ndarray,
+        min_samples: int = 20,
+        l2_penalty: float = 1.0,
+        max_iterations: int = 50
+    ) -> Optional[Calibration]:
+        """
+        類似度と採否からロジスティック回帰で較正器を学習（ニュートン法）
+
+        Args:
+            similarities: 投稿メールのメモとコーナーのベクトル類似度
+            accepted: 採用なら1、不採用なら0
+            min_samples: 学習に必要な最小件数
+            l2_penalty: 傾きへのL2正則化（件数が少ないユーザーでの過学習を抑える）
+            max_iterations: 反復回数の上限
+
+        Returns:
+            較正器（件数不足や採否の片方しかない場合、類似度が高いほど採用されやすい関係が学習できなかった場合はNone）
+        """
+        x = np.asarray(similarities, dtype=np.float64)
+        y = np.asarray(accepted, dtype=np.float64)
+        if len(x) < min_samples or y.min() == y.max():
+            return None
+
+        features = np.column_stack([x, np.ones_like(x)])
+        penalty = np.diag([l2_penalty, 0.0])  # 切片は正則化しない
+        weights = np.zeros(2)
+        for _ in range(max_iterations):
+            p = 1.0 / (1.0 + np.exp(-(features @ weights)))
+            gradient = features.T @ (p - y) + penalty @ weights
+            hessian = (features * (p * (1 - p))[:, None]).T @ features + penalty
+            step = np.linalg.solve(hessian + 1e-9 * np.eye(2), gradient)
+            weights -= step
+            if np.abs(step).max() < 1e-6:
+                break
+
+        # 傾きが0以下だと類似度の順位が反転・消失するため、較正器として使わない
+        if weights[0] <= 0:
+            return None
+        return Calibration(slope=float(weights[0]), intercept=float(weights[1]))
+
+    @staticmethod
+    def apply(calibration: Calibration, similarities: np.ndarray) -> np.ndarray:
+        """
+        類似度を採用確率に変換
+
+        Args:
+            calibration: 較正器
+            similarities: ベクトル類似度の配列
+
+        Returns:
+            同じ形状の採用確率 (0.0-1.0)
+        """
+        z = calibration.slope * np.asarray(similarities, dtype=np.float64) + calibration.intercept
+        return 1.0 / (1.0 + np.exp(-z))
@@ -4,6 +4,32 @@
 echo "Running Database Migrations..."
 alembic upgrade head
 
+#初期データの投入（開発モードのみ。データが空の場合だけ投入する）
+if [ "${SERVER_MODE:-development}" != "production" ]; then
+    echo "Seeding Database..."
+    python seed_data.py
+fi
+
 #アプリケーションの起動
+# SERVER_MODE=production でマルチワーカー構成（--reloadなし）で起動する
+if [ "${SERVER_MODE:-development}" = "production" ]; then
+    # ワーカー数の既定値はCPUコア数
+    WORKERS="${WEB_CONCURRENCY:-$(nproc)}"
+    # 接続数の予算（DB_CONNECTION_BUDGET）をワーカー数で割るため、各ワーカーに渡す
+    export WEB_CONCURRENCY="${WORKERS}"
+    echo "Starting FastAPI Application (production, ${WORKERS} workers)..."
+    exec uvicorn main:app --host 0.0.0.0 --port 8000 \
+        --workers "${WORKERS}" \
+        --loop uvloop \
+        --http httptools \
+        --timeout-keep-alive "${KEEP_ALIVE_SECONDS:-75}" \
+        --limit-max-requests "${MAX_REQUESTS:-10000}" \
+        --limit-max-requests-jitter "${MAX_REQUESTS_JITTER:-1000}" \
+        --timeout-graceful-shutdown "${GRACEFUL_SHUTDOWN_SECONDS:-30}" \
+        --backlog "${BACKLOG:-2048}" \
+        --proxy-headers \
+        --no-access-log
+fi
+
 echo "Starting FastAPI Application..."
-exec uvicorn main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+exec uvicorn main:app --host 0.0.0.0 --port 8000 --reload
@@ -1,19 +1,52 @@
 """
 FastAPI メインアプリケーション
 """
-from fastapi import FastAPI
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 
+from compression import CompressionMiddleware
 from config import settings
-from database import init_db, SessionLocal
-from routers import memos, personalities, programs, corners, mails, analyze
-from models import User
+from responses import FastJSONResponse
+from services import readiness
+from services.llm_client import close_genai_client
+from services.rate_limiter import RateLimitExceededError
+from routers import memos, personalities, programs, corners, mails, analyze, dashboard, metrics
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    起動・終了時の処理
+
+    起動時は接続プール等の準備をバックグラウンドで開始するだけで、すぐにリクエストを受け付ける。
+    準備の完了は /ready で確認できる。シードデータの投入は `python seed_data.py` で行う。
+    終了時は準備の完了を warmup_shutdown_timeout_seconds までしか待たない。
+    """
+    # デーモンスレッドで実行し、準備が終わらなくてもプロセスの終了を妨げないようにする
+    warmup = threading.Thread(target=readiness.warm_up, name="warmup", daemon=True)
+    warmup.start()
+    yield
+    readiness.stop_warm_up()
+    await asyncio.to_thread(warmup.join, settings.warmup_shutdown_timeout_seconds)
+    if warmup.is_alive():
+        logger.warning("Warmup did not finish before shutdown; abandoning it")
+    # 共有Geminiクライアントの接続プールを閉じる
+    await close_genai_client()
+
 
 # FastAPIアプリケーション
 app = FastAPI(
     title=settings.app_name,
     description="ラジオ投稿管理API - メモからコーナーへの自動振り分け",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS設定
@@ -25,6 +58,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# レスポンスの圧縮（小さい本文・圧縮済みの形式・SSEは対象外）
+if settings.response_compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.response_compression_min_size,
+        gzip_level=settings.response_gzip_level,
+        brotli_quality=settings.response_brotli_quality,
+    )
+
+@app.exception_handler(RateLimitExceededError)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceededError):
+    """外部プロバイダーのレート制限で処理できない場合は503を返す"""
+    return FastJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
 # ルーター登録
 app.include_router(memos.router, prefix="/api")
 app.include_router(personalities.router, prefix="/api")
@@ -32,20 +84,8 @@ app.include_router(programs.router, prefix="/api")
 app.include_router(corners.router, prefix="/api")
 app.include_router(mails.router, prefix="/api")
 app.include_router(analyze.router, prefix="/api")
-
-
-@app.on_event("startup")
-async def startup_event():    
-    # 開発環境: データが存在しない場合はシードデータを投入
-    db = SessionLocal()
-    try:
-        user_count = db.query(User).count()
-        if user_count == 0:
-            print("📊 データベースが空です。シードデータを投入します...")
-            from seed_data import seed_data
-            seed_data()
-    finally:
-        db.close()
+app.include_router(dashboard.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 
 @app.get("/")
@@ -60,5 +100,15 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    """ヘルスチェック"""
+    """ヘルスチェック（プロセスが応答できるか）"""
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def readiness_check():
+    """レディネスチェック（接続プール・外部APIクライアントの準備が完了したか）"""
+    ready, components = readiness.status()
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "starting", "components": components},
+    )
@@ -0,0 +1,38 @@
+"""add score_calibrations table
+
+Revision ID: 0c5e7b3a9d18
+Revises: f2c8a4d91b06
+Create Date: 2026-10-19 17:05:52.417306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c5e7b3a9d18'
+down_revision: Union[str, Sequence[str], None] = 'f2c8a4d91b06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'score_calibrations',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('slope', sa.Float(), nullable=False),
+        sa.Column('intercept', sa.Float(), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False),
+        sa.Column('accepted_count', sa.Integer(), nullable=False),
+        sa.Column('trained_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('score_calibrations')
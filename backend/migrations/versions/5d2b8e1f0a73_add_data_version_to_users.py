@@ -0,0 +1,33 @@
+"""add data_version to users
+
+Revision ID: 5d2b8e1f0a73
+Revises: 0c5e7b3a9d18
+Create Date: 2026-10-19 19:12:08.563104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b8e1f0a73'
+down_revision: Union[str, Sequence[str], None] = '0c5e7b3a9d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('data_version', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column(
+        'users',
+        sa.Column('data_updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'data_updated_at')
+    op.drop_column('users', 'data_version')
@@ -0,0 +1,28 @@
+"""enable pg_trgm extension for hybrid corner retrieval
+
+Revision ID: c41d7e9a2b53
+Revises: a5f58455c9d1
+Create Date: 2026-10-19 10:12:31.482150
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e9a2b53'
+down_revision: Union[str, Sequence[str], None] = 'a5f58455c9d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ハイブリッド検索の語彙一致スコア（similarity / word_similarity）に使用
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP EXTENSION IF EXISTS pg_trgm")
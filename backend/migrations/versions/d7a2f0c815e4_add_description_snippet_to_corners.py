@@ -0,0 +1,29 @@
+"""add description_snippet to corners
+
+Revision ID: d7a2f0c815e4
+Revises: c41d7e9a2b53
+Create Date: 2026-10-19 11:03:47.915204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2f0c815e4'
+down_revision: Union[str, Sequence[str], None] = 'c41d7e9a2b53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 既存行はNULLのまま（プロンプト構築時にdescription_for_llmから生成される）
+    op.add_column('corners', sa.Column('description_snippet', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('corners', 'description_snippet')
@@ -0,0 +1,39 @@
+"""add reduced embedding with hnsw index to corners
+
+Revision ID: e93b6c1f4a27
+Revises: d7a2f0c815e4
+Create Date: 2026-10-19 14:22:08.631742
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e93b6c1f4a27'
+down_revision: Union[str, Sequence[str], None] = 'd7a2f0c815e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('corners', sa.Column('embedded_description_reduced', Vector(256), nullable=True))
+    # 既存行は全次元のベクトルの先頭256次元を再正規化して埋める（API呼び出し不要）
+    op.execute(
+        "UPDATE corners "
+        "SET embedded_description_reduced = l2_normalize(subvector(embedded_description, 1, 256))"
+    )
+    op.execute(
+        "CREATE INDEX ix_corners_embedded_description_reduced_hnsw "
+        "ON corners USING hnsw (embedded_description_reduced vector_cosine_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_corners_embedded_description_reduced_hnsw")
+    op.drop_column('corners', 'embedded_description_reduced')
@@ -0,0 +1,41 @@
+"""add halfvec / binary quantized embedding indexes to corners
+
+Revision ID: f2c8a4d91b06
+Revises: e93b6c1f4a27
+Create Date: 2026-10-19 15:40:31.208915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8a4d91b06'
+down_revision: Union[str, Sequence[str], None] = 'e93b6c1f4a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 式インデックスはcruds/analyze.pyの候補生成の並び順と同じ式で作成する
+_INDEXES = {
+    "halfvec": (
+        "ix_corners_embedded_description_halfvec_hnsw",
+        "(embedded_description::halfvec(1024)) halfvec_cosine_ops",
+    ),
+    "binary": (
+        "ix_corners_embedded_description_binary_hnsw",
+        "(binary_quantize(embedded_description)::bit(1024)) bit_hamming_ops",
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, expression in _INDEXES.values():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON corners USING hnsw ({expression})")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in _INDEXES.values():
+        op.execute(f"DROP INDEX IF EXISTS {name}")
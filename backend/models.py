@@ -4,12 +4,15 @@ SQLAlchemyモデル定義
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import ForeignKey, String, Text, DateTime, Table, Column, Integer
+from sqlalchemy import ForeignKey, String, Text, DateTime, Table, Column, Integer, Float, BigInteger, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from pgvector.sqlalchemy import Vector
 
 from database import Base
 
+# 縮約ベクトルの次元数（列の型で固定されるため設定では変えられない。変える場合はマイグレーションが必要）
+REDUCED_EMBEDDING_DIMENSION = 256
+
 
 # 多対多の中間テーブル
 program_personalities = Table(
@@ -27,6 +30,9 @@ class User(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     password_hash: Mapped[str] = mapped_column(String(255))
+    # ユーザーのデータ（番組・コーナー・パーソナリティ・メモ・メール）の書き込みごとに進める（一覧APIのETag）
+    data_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    data_updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
     # リレーション
     programs: Mapped[List["Program"]] = relationship(back_populates="user", cascade="all, delete-orphan")
@@ -78,6 +84,9 @@ class Corner(Base):
     title: Mapped[str] = mapped_column(String(255))  # コーナー名
     description_for_llm: Mapped[str] = mapped_column(Text)  # LLM用コーナー説明
     embedded_description: Mapped[list[float]] = mapped_column(Vector(1024))  # intfloat/multilingual-e5-largeは1024次元
+    description_snippet: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # プロンプト用に切り詰めた説明
+    # 二段階検索の候補生成用に先頭256次元へ切り詰めたベクトル（HNSWインデックス付き）
+    embedded_description_reduced: Mapped[Optional[list[float]]] = mapped_column(Vector(REDUCED_EMBEDDING_DIMENSION), nullable=True)
     
     # リレーション
     program: Mapped["Program"] = relationship(back_populates="corners")
@@ -117,3 +126,15 @@ class Mail(Base):
     user: Mapped["User"] = relationship(back_populates="mails")
     corner: Mapped["Corner"] = relationship(back_populates="mails")
     memo: Mapped[Optional["Memo"]] = relationship(back_populates="mails")
+
+
+class ScoreCalibration(Base):
+    """類似度スコア較正モデル（train_score_calibration.pyがメールの採否から学習）"""
+    __tablename__ = "score_calibrations"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    slope: Mapped[float] = mapped_column(Float)  # 採用確率 = sigmoid(slope * 類似度 + intercept)
+    intercept: Mapped[float] = mapped_column(Float)
+    sample_count: Mapped[int] = mapped_column(Integer)  # 学習に使った採用・不採用メール数
+    accepted_count: Mapped[int] = mapped_column(Integer)
+    trained_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
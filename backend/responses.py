@@ -0,0 +1,39 @@
+"""
+JSONレスポンス
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # langchainの依存としてインストールされるが、ない場合は標準ライブラリで代替
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """JSONのバイト列に変換（datetimeはISO 8601形式）"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjsonでシリアライズするJSONレスポンス
+
+    一覧APIではSQLの行から組み立てた辞書をこのレスポンスで直接返し、
+    ORMオブジェクト→Pydanticモデル→JSONの変換を省く。response_modelによる検証を通らないため、
+    辞書のキーと値の型はスキーマ（schemas.py）と一致させること。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -2,10 +2,13 @@
 LLM解析API
 Google Gemini APIを使用してメモの内容を解析し、最適なコーナーを推奨
 """
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_read_db, route_reads
 from schemas import AnalyzeRequest, AnalyzeResponse, CornerRecommendation
 from services import analyze_service
 
@@ -13,10 +16,12 @@ router = APIRouter(prefix="/analyze", tags=["analyze"])
 
 
 @router.post("", response_model=AnalyzeResponse)
-def analyze_memo(request: AnalyzeRequest, db: Session = Depends(get_db)):
+def analyze_memo(request: AnalyzeRequest, db: Session = Depends(get_read_db)):
     """
     メモを解析して最適なコーナーを推奨
     """
+    # ユーザーIDはリクエストボディにあるため、最初の問い合わせの前に振り分け先を決める
+    route_reads(db, request.user_id)
     # サービス層で解析処理を実行
     result = analyze_service.analyze_memo_for_corners(db, request.memo_id, request.user_id)
     
@@ -39,3 +44,25 @@ def analyze_memo(request: AnalyzeRequest, db: Session = Depends(get_db)):
         memo_id=result["memo_id"],
         recommendations=recommendations,
     )
+
+
+@router.get("/stream")
+def stream_analyze_memo(memo_id: int, user_id: int, db: Session = Depends(get_read_db)):
+    """
+    メモを解析して推奨コーナーをServer-Sent Eventsで逐次返す
+
+    candidates（ベクトル検索の候補）→ recommendation（推奨結果、複数回）→ done の順に送信する
+    """
+    events = analyze_service.stream_memo_analysis(db, memo_id, user_id)
+    if events is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Memo not found")
+
+    def event_stream():
+        for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
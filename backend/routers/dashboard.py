@@ -0,0 +1,25 @@
+"""
+ダッシュボードAPI
+"""
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+
+from database import get_read_db
+from schemas import DashboardResponse
+from services import dashboard_service, http_cache
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("", response_model=DashboardResponse)
+def get_dashboard(
+    request: Request,
+    user_id: int,
+    memo_limit: int = Query(3, ge=0, le=100),
+    mail_limit: int = Query(5, ge=0, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """最近のメモ・メール統計・最近のメール・番組の概要をまとめて取得（変更がなければ304）"""
+    return http_cache.cached_json(
+        request, db, user_id, lambda: dashboard_service.get_dashboard(db, user_id, memo_limit, mail_limit)
+    )
@@ -5,27 +5,33 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from database import get_db
-from schemas import MailCreate, MailUpdate, MailResponse, MailStatsResponse
+from database import get_db, get_read_db
+from schemas import MailCreate, MailUpdate, MailResponse, MailPartialResponse, MailStatsResponse
+from responses import FastJSONResponse
 from services import mail_service
 
 router = APIRouter(prefix="/mails", tags=["mails"])
 
 
-@router.get("", response_model=List[MailResponse])
+@router.get("", response_model=List[MailPartialResponse])
 def get_mails(
     user_id: int,
     status_filter: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """メール一覧を取得"""
-    return mail_service.get_mails(db, user_id, status_filter, skip, limit)
+    """メール一覧を取得（fieldsで取得する列を指定可能。省略時はMailResponseのすべての項目）"""
+    try:
+        projection = mail_service.parse_list_projection(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse(mail_service.get_mails(db, user_id, status_filter, skip, limit, projection))
 
 
 @router.get("/stats", response_model=MailStatsResponse)
-def get_mail_stats(user_id: int, db: Session = Depends(get_db)):
+def get_mail_stats(user_id: int, db: Session = Depends(get_read_db)):
     """メール統計を取得"""
     stats = mail_service.get_mail_stats(db, user_id)
     return MailStatsResponse(**stats)
@@ -1,26 +1,34 @@
 """
 メモ管理API
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from database import get_db
-from schemas import MemoCreate, MemoUpdate, MemoResponse
-from services import memo_service
+from database import get_db, get_read_db
+from schemas import MemoCreate, MemoUpdate, MemoResponse, MemoPartialResponse
+from services import http_cache, memo_service
 
 router = APIRouter(prefix="/memos", tags=["memos"])
 
 
-@router.get("", response_model=List[MemoResponse])
+@router.get("", response_model=List[MemoPartialResponse])
 def get_memos(
+    request: Request,
     user_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """メモ一覧を取得"""
-    return memo_service.get_memos(db, user_id, skip, limit)
+    """メモ一覧を取得（fieldsで取得する列を指定可能。省略時はMemoResponseのすべての項目。変更がなければ304）"""
+    try:
+        projection = memo_service.parse_list_projection(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return http_cache.cached_json(
+        request, db, user_id, lambda: memo_service.get_memos(db, user_id, skip, limit, projection)
+    )
 
 
 @router.get("/{memo_id}", response_model=MemoResponse)
@@ -0,0 +1,15 @@
+"""
+メトリクスAPI
+"""
+from fastapi import APIRouter
+
+from responses import FastJSONResponse
+from services import metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", response_class=FastJSONResponse)
+def get_metrics():
+    """プロセス内メトリクスを取得"""
+    return metrics.snapshot()
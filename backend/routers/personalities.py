@@ -2,20 +2,22 @@
 パーソナリティ管理API
 """
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_db, get_read_db
 from schemas import PersonalityCreate, PersonalityUpdate, PersonalityResponse
-from services import personality_service
+from services import http_cache, personality_service
 
 router = APIRouter(prefix="/personalities", tags=["personalities"])
 
 
 @router.get("", response_model=List[PersonalityResponse])
-def get_personalities(user_id: int, db: Session = Depends(get_db)):
-    """パーソナリティ一覧を取得"""
-    return personality_service.get_personalities(db, user_id)
+def get_personalities(request: Request, user_id: int, db: Session = Depends(get_read_db)):
+    """パーソナリティ一覧を取得（変更がなければ304）"""
+    return http_cache.cached_json(
+        request, db, user_id, lambda: personality_service.get_personalities(db, user_id)
+    )
 
 
 @router.get("/{personality_id}", response_model=PersonalityResponse)
@@ -2,25 +2,40 @@
 番組管理API
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from database import get_db
-from schemas import ProgramCreate, ProgramUpdate, ProgramResponse
-from services import program_service
+from database import get_db, get_read_db
+from schemas import ProgramCreate, ProgramUpdate, ProgramResponse, ProgramPartialResponse
+from services import http_cache, program_service
 
 router = APIRouter(prefix="/programs", tags=["programs"])
 
 
-@router.get("", response_model=List[ProgramResponse])
+@router.get("", response_model=List[ProgramPartialResponse])
 def get_programs(
+    request: Request,
     user_id: int,
     personality_id: Optional[int] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """番組一覧を取得（パーソナリティや番組名での絞り込み可能）"""
-    return program_service.get_programs(db, user_id, personality_id, search)
+    """
+    番組一覧を取得（パーソナリティや番組名での絞り込み可能。変更がなければ304）
+
+    fields（例: id,title,corners.id,corners.title）・include（例: corners）で取得する列・関連を指定できる。
+    省略時はProgramResponseのすべての項目を返す。fieldsに関連の列（corners.title等）しかない場合、番組の列はidのみ返す
+    """
+    try:
+        projection = program_service.parse_list_projection(fields, include)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return http_cache.cached_json(
+        request, db, user_id,
+        lambda: program_service.get_programs(db, user_id, personality_id, search, projection)
+    )
 
 
 @router.get("/{program_id}", response_model=ProgramResponse)
@@ -4,7 +4,7 @@ Pydanticスキーマ定義
 """
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, create_model
 
 
 # ========== User ==========
@@ -145,6 +145,30 @@ class MailResponse(MailBase):
         from_attributes = True
 
 
+# ========== Projection ==========
+def _partial_model(model: type, name: str, **overrides) -> type:
+    """すべての項目を省略可能にしたモデル（fields= で項目を指定した一覧の要素。OpenAPIの表示用）"""
+    fields = {key: (Optional[field.annotation], None) for key, field in model.model_fields.items()}
+    fields.update(overrides)
+    return create_model(
+        name,
+        __doc__=f"{model.__name__}のうちfields=で指定された項目（指定されなかった項目は含まれない）",
+        **fields,
+    )
+
+
+PersonalityPartialResponse = _partial_model(PersonalityResponse, "PersonalityPartialResponse")
+CornerPartialResponse = _partial_model(CornerResponse, "CornerPartialResponse")
+ProgramPartialResponse = _partial_model(
+    ProgramResponse,
+    "ProgramPartialResponse",
+    corners=(Optional[List[CornerPartialResponse]], None),
+    personalities=(Optional[List[PersonalityPartialResponse]], None),
+)
+MemoPartialResponse = _partial_model(MemoResponse, "MemoPartialResponse")
+MailPartialResponse = _partial_model(MailResponse, "MailPartialResponse")
+
+
 # ========== LLM Analysis ==========
 class AnalyzeRequest(BaseModel):
     """メモ解析リクエスト"""
@@ -180,6 +204,36 @@ class MailStatsResponse(BaseModel):
     accepted: int
     rejected: int
 
+# ========== Dashboard ==========
+class DashboardMail(BaseModel):
+    """ダッシュボードの最近のメール（投稿先のコーナー名・番組名付き）"""
+    subject: str
+    status: str
+    id: int
+    corner_id: int
+    corner_title: str
+    program_id: int
+    program_title: str
+    sent_at: Optional[datetime]
+    created_at: datetime
+
+
+class DashboardProgram(BaseModel):
+    """ダッシュボードの番組の概要"""
+    title: str
+    broadcast_schedule: Optional[str]
+    id: int
+    corner_count: int
+    mail_count: int
+
+
+class DashboardResponse(BaseModel):
+    """ダッシュボードレスポンス"""
+    recent_memos: List[MemoResponse]
+    stats: MailStatsResponse
+    recent_mails: List[DashboardMail]
+    programs: List[DashboardProgram]
+
 class CornerRecommendationResponse(BaseModel):
     """コーナー推薦レスポンス"""
     id: int
@@ -191,3 +245,29 @@ class CornerRecommendationResponse(BaseModel):
     score: float
     confidence: str
     reasoning: Optional[str] = None
+
+
+# ========== LLM Structured Output ==========
+class LLMCornerRecommendation(BaseModel):
+    """Gemini構造化出力: 推奨コーナー"""
+    corner_id: int
+    score: float = Field(..., ge=0.0, le=1.0, description="適合度スコア (0.0-1.0)")
+    reason: str = Field(..., description="推奨理由（100文字以内の日本語）")
+
+
+class LLMCornerChoice(BaseModel):
+    """Gemini構造化出力: 単一コーナーの選択"""
+    corner_id: int
+    score: float = Field(..., ge=0.0, le=1.0, description="適合度スコア (0.0-1.0)")
+    reasoning: str = Field(..., description="選択理由（2-3文）")
+
+
+class LLMCornerScore(BaseModel):
+    """Gemini構造化出力: コーナーごとの適合度"""
+    corner_id: int
+    score: float = Field(..., ge=0.0, le=1.0, description="適合度スコア (0.0-1.0)")
+
+
+class LLMCornerScoreList(BaseModel):
+    """Gemini構造化出力: 全コーナーの適合度"""
+    scores: List[LLMCornerScore]
@@ -16,7 +16,8 @@ from models import (
     Program,
     User,
 )
-from services.langchain_service import get_embedding_service
+from services.langchain_service import get_embedding_service, reduce_embedding
+from services.prompt_builder import render_corner_snippet
 
 
 def seed_data(clear_existing: bool = False):
@@ -155,6 +156,8 @@ def seed_data(clear_existing: bool = False):
                 title=corner_info[1],
                 description_for_llm=corner_info[2],
                 embedded_description=embedded_description,
+                embedded_description_reduced=reduce_embedding(embedded_description),
+                description_snippet=render_corner_snippet(corner_info[2]),
             )
             corners.append(corner)
             db.add(corner)
@@ -252,4 +255,12 @@ def seed_data(clear_existing: bool = False):
 
 
 if __name__ == "__main__":
-    seed_data()
+    # 1回限りのコマンドとして実行する（APIサーバーの起動処理では投入しない）
+    #   python seed_data.py          データが空の場合のみ投入
+    #   python seed_data.py --clear  既存データをクリアして投入
+    import argparse
+
+    parser = argparse.ArgumentParser(description="初期データを投入")
+    parser.add_argument("--clear", action="store_true", help="既存データをクリアしてから投入する")
+    args = parser.parse_args()
+    seed_data(clear_existing=args.clear)
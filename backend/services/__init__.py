@@ -8,6 +8,8 @@ from . import (
     corner_service,
     mail_service,
     personality_service,
+    dashboard_service,
+    metrics,
 )
 
 __all__ = [
@@ -17,4 +19,6 @@ __all__ = [
     "corner_service",
     "mail_service",
     "personality_service",
+    "dashboard_service",
+    "metrics",
 ]
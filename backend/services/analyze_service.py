@@ -5,18 +5,42 @@ Google Gemini APIを使用してメモの内容を解析し、最適なコーナ
 
 import json
 import logging
-from typing import List
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
 
-from google import genai
-from google.genai import errors as genai_errors
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
 
 from config import settings
 from cruds import analyze as analyze_crud
+from domain.services.corner_recommendation_service import CornerRecommendationService
+from schemas import LLMCornerRecommendation
+from services import metrics, prompt_builder
+from services.corner_matrix import get_corner_matrix_index
 from services.langchain_service import get_embedding_service
+from services.score_calibration import calibrate_similarities
+from services.llm_client import (
+    CircuitOpenError,
+    LLMProviderError,
+    LLMRateLimitedError,
+    LLMUnavailableError,
+    get_llm_client,
+)
+
+if TYPE_CHECKING:
+    from google.genai import types as genai_types
 
 logger = logging.getLogger(__name__)
 
+metrics.register_ratio("analyze.llm_skip.rate", "analyze.llm_skip.fired", "analyze.llm_skip.evaluated")
+for _mode in ("json_schema", "legacy"):
+    metrics.register_ratio(
+        f"analyze.llm_parse.failure_rate.{_mode}",
+        f"analyze.llm_parse.failures.{_mode}",
+        f"analyze.llm_parse.attempts.{_mode}",
+    )
+
+_RECOMMENDATIONS_ADAPTER = TypeAdapter(List[LLMCornerRecommendation])
+
 
 def _fallback_recommendation(corners_info: List[dict], reason: str) -> List[dict]:
     """エラー時のフォールバック推薦（ベクトル検索の先頭候補を返す）"""
@@ -25,6 +49,115 @@ def _fallback_recommendation(corners_info: List[dict], reason: str) -> List[dict
     return [{"corner_id": corners_info[0]["id"], "score": 0.0, "reason": reason}]
 
 
+def _decision_key(vector_search_results: List[dict]) -> str:
+    """LLM省略の判定と推奨先の選択に使う値（較正済みなら採用確率、未較正なら類似度）"""
+    if vector_search_results and "calibrated_score" in vector_search_results[0]:
+        return "calibrated_score"
+    return "similarity"
+
+
+def _vector_only_recommendation(vector_search_results: List[dict]) -> List[dict]:
+    """ベクトル類似度が決定的な場合の推薦（LLMを使用しない）"""
+    # should_skip_llmが判定に使った値で順位付けし、判定した1位をそのまま推奨する
+    key = _decision_key(vector_search_results)
+    ranked = sorted(vector_search_results, key=lambda r: r[key], reverse=True)
+    top = ranked[0]
+    runner_up = ranked[1][key] if len(ranked) > 1 else 0.0
+    if key == "calibrated_score":
+        reason = (
+            f"過去の採否から推定した「{top['title']}」の採用確率が{top[key]:.2f}で、"
+            f"他の候補（最大{runner_up:.2f}）より明確に高いため推奨します。"
+        )
+    else:
+        reason = (
+            f"メモ内容と「{top['title']}」の説明の類似度が{top[key]:.2f}で、"
+            f"他の候補（最大{runner_up:.2f}）より明確に高いため推奨します。"
+        )
+    score = top[key]
+    return [
+        {
+            "corner_id": top["id"],
+            "score": round(max(0.0, min(1.0, score)), 2),
+            "reason": reason,
+        }
+    ]
+
+
+def should_skip_llm(vector_search_results: List[dict]) -> bool:
+    """
+    ベクトル検索結果だけで推奨先を決定できるか判定し、判定結果をメトリクスに記録
+
+    Args:
+        vector_search_results: ベクトル検索結果（similarity含む。calibrated_scoreがあれば採用確率で判定）
+
+    Returns:
+        Gemini APIの呼び出しを省略するかどうか
+    """
+    if not settings.llm_skip_enabled:
+        return False
+
+    metrics.increment("analyze.llm_skip.evaluated")
+    if _decision_key(vector_search_results) == "calibrated_score":
+        # 較正済みの採用確率で判定する
+        decisive = CornerRecommendationService.is_vector_result_decisive(
+            [r["calibrated_score"] for r in vector_search_results],
+            min_similarity=settings.llm_skip_min_probability,
+            min_margin=settings.llm_skip_min_probability_margin,
+        )
+    else:
+        decisive = CornerRecommendationService.is_vector_result_decisive(
+            [r["similarity"] for r in vector_search_results],
+            min_similarity=settings.llm_skip_min_similarity,
+            min_margin=settings.llm_skip_min_margin,
+        )
+    if decisive:
+        metrics.increment("analyze.llm_skip.fired")
+    return decisive
+
+
+def _generation_config(structured_output: bool) -> Optional["genai_types.GenerateContentConfig"]:
+    """Gemini呼び出しの生成設定を作成"""
+    if not structured_output:
+        return None
+    from google.genai import types as genai_types
+
+    return genai_types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=list[LLMCornerRecommendation],
+    )
+
+
+def _parse_recommendations(response_text: str, structured_output: bool) -> Optional[List[dict]]:
+    """
+    Geminiのレスポンスを推奨コーナーのリストに変換
+
+    JSONモードではレスポンス文字列をPydanticで直接検証する（中間のdictを経由しない）。
+    パースの試行数と失敗数はモード別にメトリクスへ記録する。
+
+    Returns:
+        推奨コーナーのリスト（解析に失敗した場合はNone）
+    """
+    mode = "json_schema" if structured_output else "legacy"
+    metrics.increment(f"analyze.llm_parse.attempts.{mode}")
+
+    if not structured_output:
+        # ```json ... ``` を削除
+        response_text = response_text.strip()
+        if response_text.startswith("```json"):
+            response_text = response_text[7:]
+        if response_text.endswith("```"):
+            response_text = response_text[:-3]
+
+    try:
+        parsed = _RECOMMENDATIONS_ADAPTER.validate_json(response_text)
+    except ValidationError as e:
+        metrics.increment(f"analyze.llm_parse.failures.{mode}")
+        logger.error("Geminiレスポンスの解析に失敗しました (mode=%s): %s\nレスポンス: %s", mode, e, response_text)
+        return None
+
+    return [rec.model_dump() for rec in parsed]
+
+
 def analyze_memo_with_gemini(memo_content: str, corners_info: List[dict]) -> List[dict]:
     """
     Gemini APIを使用してメモを解析
@@ -40,47 +173,32 @@ def analyze_memo_with_gemini(memo_content: str, corners_info: List[dict]) -> Lis
         logger.warning("Gemini APIキーが設定されていません。フォールバックを返します。")
         return _fallback_recommendation(corners_info, "APIキーが未設定のため、ベクトル検索の結果を使用しています。")
 
-    client = genai.Client()
+    # google-genaiはGeminiを呼び出す時点で読み込む（CRUDのみのワーカーでは読み込まない）
+    from google.genai import errors as genai_errors
 
-    corners_text = "\n\n".join(
-        [
-            f"ID: {c['id']}\n番組: {c['program_title']}\nコーナー: {c['corner_title']}\n説明: {c['description']}"
-            for c in corners_info
-        ]
+    structured_output = settings.gemini_structured_output
+    prompt, estimated_tokens = prompt_builder.build_recommendation_prompt(
+        memo_content, corners_info, structured_output
     )
-
-    prompt = f"""
-以下のメモ内容を分析し、最適な投稿先コーナーを推奨してください。
-
-【メモ内容】
-{memo_content}
-
-【投稿可能なコーナー一覧】
-{corners_text}
-
-【出力形式】
-以下のJSON形式で、適合度の高い順に最大3つのコーナーを推奨してください：
-```json
-[
-  {{
-    "corner_id": コーナーID（数値）,
-    "score": 適合度スコア（0.0-1.0の小数）,
-    "reason": "推奨理由（100文字以内の日本語）"
-  }}
-]
-```
-
-注意点：
-- scoreは0.0から1.0の範囲で、小数点第2位まで
-- reasonは具体的で簡潔に
-- 適合度の高い順にソート
-- JSONのみを返し、他のテキストは含めない
-"""
+    metrics.observe("analyze.prompt_tokens.estimated", estimated_tokens)
+    logger.debug("Geminiプロンプトの推定トークン数: %d", estimated_tokens)
 
     try:
-        response = client.models.generate_content(
-            model=settings.gemini_model, contents=prompt
+        response = get_llm_client().generate_content(
+            model=settings.gemini_model,
+            contents=prompt,
+            config=_generation_config(structured_output),
         )
+    except CircuitOpenError:
+        return _fallback_recommendation(corners_info, "AIが一時的に利用できないため、ベクトル検索の結果を使用しています。")
+    except LLMRateLimitedError:
+        return _fallback_recommendation(corners_info, "AIが混み合っているため、ベクトル検索の結果を使用しています。")
+    except LLMProviderError as e:
+        logger.error("Gemini APIの障害が続いています: %s", e)
+        return _fallback_recommendation(corners_info, "AIに接続できないため、ベクトル検索の結果を使用しています。")
+    except LLMUnavailableError as e:
+        logger.error("Gemini APIが応答しませんでした: %s", e)
+        return _fallback_recommendation(corners_info, "AIの応答がタイムアウトしました。手動で選択してください。")
     except genai_errors.ClientError as e:
         logger.error("Gemini APIクライアントエラー (status=%s): %s", e.status_code, e)
         return _fallback_recommendation(corners_info, "APIエラーが発生しました。手動で選択してください。")
@@ -88,30 +206,25 @@ def analyze_memo_with_gemini(memo_content: str, corners_info: List[dict]) -> Lis
         logger.error("Gemini APIサーバーエラー (status=%s): %s", e.status_code, e)
         return _fallback_recommendation(corners_info, "APIサーバーエラーが発生しました。手動で選択してください。")
 
+    usage = response.usage_metadata
+    if usage and usage.prompt_token_count is not None:
+        metrics.observe("analyze.prompt_tokens.actual", usage.prompt_token_count)
+
     if not response.text:
         logger.warning("Gemini APIのレスポンスが空です（安全フィルターによりブロックされた可能性があります）")
         return _fallback_recommendation(corners_info, "レスポンスが取得できませんでした。手動で選択してください。")
 
-    # レスポンスをパース
-    response_text = response.text.strip()
-    # ```json ... ``` を削除
-    if response_text.startswith("```json"):
-        response_text = response_text[7:]
-    if response_text.endswith("```"):
-        response_text = response_text[:-3]
-
-    try:
-        return json.loads(response_text.strip())
-    except json.JSONDecodeError as e:
-        logger.error("GeminiレスポンスのJSONパースに失敗しました: %s\nレスポンス: %s", e, response_text)
+    recommendations = _parse_recommendations(response.text, structured_output)
+    if recommendations is None:
         return _fallback_recommendation(corners_info, "レスポンスの解析に失敗しました。手動で選択してください。")
+    return recommendations
 
 
 def analyze_memo_with_vector_search(
     db: Session, user_id: int, memo_content: str, max_candidates: int = 10
 ) -> List[dict]:
     """
-    ベクトル検索を使用してメモを解析
+    ベクトル検索（設定によりハイブリッド検索）を使用してメモを解析
 
     Args:
         db: データベースセッション
@@ -124,23 +237,90 @@ def analyze_memo_with_vector_search(
     embedding_service = get_embedding_service()
     embedded_memo = embedding_service.embed_text(memo_content)
 
-    similarity_threshold = 0.08
-    rows = analyze_crud.search_corners_by_embedding(
-        db, user_id, embedded_memo, similarity_threshold, max_candidates
-    )
+    if settings.retrieval_mode == "hybrid":
+        rows = analyze_crud.search_corners_hybrid(
+            db,
+            user_id,
+            embedded_memo,
+            memo_content,
+            vector_threshold=settings.vector_similarity_threshold,
+            lexical_threshold=settings.lexical_similarity_threshold,
+            rrf_k=settings.hybrid_rrf_k,
+            candidate_pool=settings.hybrid_candidate_pool,
+            limit=max_candidates,
+        )
+    elif settings.vector_search_index != "exact":
+        rows = analyze_crud.search_corners_with_rerank(
+            db,
+            user_id,
+            embedded_memo,
+            settings.vector_search_index,
+            settings.vector_similarity_threshold,
+            candidate_limit=max(settings.vector_rerank_candidates, max_candidates),
+            limit=max_candidates,
+        )
+    elif settings.vector_search_engine == "memory":
+        rows = get_corner_matrix_index().search(
+            db, user_id, embedded_memo, settings.vector_similarity_threshold, max_candidates
+        )
+    else:
+        rows = analyze_crud.search_corners_by_embedding(
+            db, user_id, embedded_memo, settings.vector_similarity_threshold, max_candidates
+        )
 
-    return [
+    results = [
         {
             "id": row.id,
             "program_id": row.program_id,
             "title": row.title,
             "description_for_llm": row.description_for_llm,
+            "description_snippet": row.description_snippet,
             "program_title": row.program_title,
             "similarity": row.similarity,
         }
         for row in rows
     ]
 
+    # 較正器があるユーザーは類似度を採用確率に変換して付与する
+    calibrated = calibrate_similarities(db, user_id, [r["similarity"] for r in results])
+    if calibrated is not None:
+        for result, probability in zip(results, calibrated):
+            result["calibrated_score"] = probability
+
+    return results
+
+
+def _build_corners_info(vector_search_results: List[dict]) -> List[dict]:
+    """ベクトル検索結果をGemini用のコーナー情報に整形"""
+    return [
+        {
+            "id": result["id"],
+            "program_id": result["program_id"],
+            "program_title": result["program_title"],
+            "corner_title": result["title"],
+            "description": result["description_for_llm"],
+            "snippet": result["description_snippet"],
+        }
+        for result in vector_search_results
+    ]
+
+
+def _to_recommendation(rec: dict, corners_info: List[dict]) -> Optional[dict]:
+    """LLMの推奨結果をレスポンス形式に変換（候補外のコーナーはNone）"""
+    corner_info = next(
+        (c for c in corners_info if c["id"] == rec["corner_id"]), None
+    )
+    if not corner_info:
+        return None
+    return {
+        "corner_id": rec["corner_id"],
+        "corner_title": corner_info["corner_title"],
+        "program_id": corner_info["program_id"],
+        "program_title": corner_info["program_title"],
+        "score": rec["score"],
+        "reason": rec["reason"],
+    }
+
 
 def analyze_memo_for_corners(db: Session, memo_id: int, user_id: int) -> dict:
     """
@@ -160,45 +340,174 @@ def analyze_memo_for_corners(db: Session, memo_id: int, user_id: int) -> dict:
         return None
 
     # ベクトル検索で類似コーナーを取得
-    vector_search_results = analyze_memo_with_vector_search(db, user_id, memo.content, 10)
+    vector_search_results = analyze_memo_with_vector_search(
+        db, user_id, memo.content, settings.llm_max_candidates
+    )
 
     if not vector_search_results:
         return {"memo_id": memo_id, "recommendations": [], "error": "No matching corners found"}
 
     # Gemini用のコーナー情報を整形
-    corners_info = [
-        {
-            "id": result["id"],
-            "program_id": result["program_id"],
-            "program_title": result["program_title"],
-            "corner_title": result["title"],
-            "description": result["description_for_llm"],
-        }
-        for result in vector_search_results
-    ]
+    corners_info = _build_corners_info(vector_search_results)
 
-    # Gemini APIで解析
-    llm_recommendations = analyze_memo_with_gemini(memo.content, corners_info)
+    # ベクトル類似度が決定的ならGemini APIを呼ばない
+    if should_skip_llm(vector_search_results):
+        llm_recommendations = _vector_only_recommendation(vector_search_results)
+    else:
+        llm_recommendations = analyze_memo_with_gemini(memo.content, corners_info)
 
     # レスポンス形式に変換
     recommendations = []
     for rec in llm_recommendations:
-        corner_info = next(
-            (c for c in corners_info if c["id"] == rec["corner_id"]), None
-        )
-        if corner_info:
-            recommendations.append(
-                {
-                    "corner_id": rec["corner_id"],
-                    "corner_title": corner_info["corner_title"],
-                    "program_id": corner_info["program_id"],
-                    "program_title": corner_info["program_title"],
-                    "score": rec["score"],
-                    "reason": rec["reason"],
-                }
-            )
+        recommendation = _to_recommendation(rec, corners_info)
+        if recommendation:
+            recommendations.append(recommendation)
 
     return {
         "memo_id": memo.id,
         "recommendations": recommendations,
     }
+
+
+def _iter_streamed_recommendations(text_chunks: Iterable[str]) -> Iterator[dict]:
+    """
+    ストリーミングされるJSON配列から、要素のオブジェクトが閉じた時点で順に取り出す
+
+    配列の外側にある `[` `,` `]` や空白、コードフェンスは読み飛ばす。
+
+    Args:
+        text_chunks: Geminiから受信したテキスト断片
+
+    Yields:
+        検証済みの推奨結果（corner_id, score, reason）
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    for chunk in text_chunks:
+        buffer += chunk
+        while True:
+            start = buffer.find("{", position)
+            if start == -1:
+                position = len(buffer)
+                break
+            try:
+                obj, end = decoder.raw_decode(buffer, start)
+            except json.JSONDecodeError:
+                # オブジェクトが未完成なので次の断片を待つ
+                position = start
+                break
+            position = end
+            try:
+                yield LLMCornerRecommendation.model_validate(obj).model_dump()
+            except ValidationError as e:
+                logger.warning("ストリーミング中の推奨結果を検証できませんでした: %s", e)
+
+
+def stream_memo_analysis(db: Session, memo_id: int, user_id: int) -> Optional[Iterator[Tuple[str, dict]]]:
+    """
+    メモ解析の途中経過をイベントとして順に返す
+
+    最初にベクトル検索の候補（candidates）を返し、続いてGeminiが生成した推奨結果を
+    1件ずつ（recommendation）返し、最後に完了（done）を返す。
+
+    Args:
+        db: データベースセッション
+        memo_id: メモID
+        user_id: ユーザーID
+
+    Returns:
+        (イベント名, データ) を返すイテレータ（メモが存在しない場合はNone）
+    """
+    memo = analyze_crud.get_memo_by_id(db, memo_id)
+    if not memo:
+        return None
+
+    # DBアクセスはレスポンス送信前に済ませる（ストリーム中はセッションを使用しない）
+    vector_search_results = analyze_memo_with_vector_search(
+        db, user_id, memo.content, settings.llm_max_candidates
+    )
+    corners_info = _build_corners_info(vector_search_results)
+
+    def events() -> Iterator[Tuple[str, dict]]:
+        yield "candidates", {
+            "memo_id": memo.id,
+            "candidates": [
+                {
+                    "corner_id": result["id"],
+                    "corner_title": result["title"],
+                    "program_id": result["program_id"],
+                    "program_title": result["program_title"],
+                    "similarity": result["similarity"],
+                }
+                for result in vector_search_results
+            ],
+        }
+
+        if not vector_search_results:
+            yield "done", {"memo_id": memo.id, "count": 0, "source": "none"}
+            return
+
+        if should_skip_llm(vector_search_results):
+            source = "vector"
+            llm_recommendations = iter(_vector_only_recommendation(vector_search_results))
+        elif not settings.gemini_api_key:
+            source = "fallback"
+            llm_recommendations = iter(analyze_memo_with_gemini(memo.content, corners_info))
+        else:
+            source = "llm"
+            llm_recommendations = _stream_gemini_recommendations(memo.content, corners_info)
+
+        count = 0
+        for rec in llm_recommendations:
+            recommendation = _to_recommendation(rec, corners_info)
+            if recommendation:
+                count += 1
+                yield "recommendation", recommendation
+
+        yield "done", {"memo_id": memo.id, "count": count, "source": source}
+
+    return events()
+
+
+def _stream_gemini_recommendations(memo_content: str, corners_info: List[dict]) -> Iterator[dict]:
+    """
+    generate_content_streamでGeminiの推奨結果を生成された順に返す
+
+    エラー時や1件も解析できなかった場合はフォールバック推薦を返す。
+    """
+    structured_output = settings.gemini_structured_output
+    prompt, estimated_tokens = prompt_builder.build_recommendation_prompt(
+        memo_content, corners_info, structured_output
+    )
+    metrics.observe("analyze.prompt_tokens.estimated", estimated_tokens)
+
+    mode = "json_schema" if structured_output else "legacy"
+    metrics.increment(f"analyze.llm_parse.attempts.{mode}")
+
+    def text_chunks() -> Iterator[str]:
+        stream = get_llm_client().generate_content_stream(
+            model=settings.gemini_model,
+            contents=prompt,
+            config=_generation_config(structured_output),
+        )
+        for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+    from google.genai import errors as genai_errors
+
+    count = 0
+    try:
+        for rec in _iter_streamed_recommendations(text_chunks()):
+            count += 1
+            yield rec
+    except (genai_errors.APIError, LLMUnavailableError) as e:
+        logger.error("Gemini APIのストリーミングでエラーが発生しました: %s", e)
+        if count == 0:
+            yield from _fallback_recommendation(corners_info, "APIエラーが発生しました。手動で選択してください。")
+        return
+
+    if count == 0:
+        metrics.increment(f"analyze.llm_parse.failures.{mode}")
+        yield from _fallback_recommendation(corners_info, "レスポンスの解析に失敗しました。手動で選択してください。")
@@ -0,0 +1,142 @@
+"""
+ユーザーごとのコーナー埋め込み行列によるプロセス内ベクトル検索
+コーナー数は1ユーザーあたり数十〜数百件のため、DBに問い合わせず行列とベクトルの積1回で厳密検索する
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from config import settings
+from cruds import analyze as analyze_crud
+from services import metrics
+
+
+class CornerSearchRow(NamedTuple):
+    """検索結果の1行（cruds.analyze.search_corners_by_embeddingの行と同じ属性）"""
+
+    id: int
+    program_id: int
+    title: str
+    description_for_llm: str
+    description_snippet: Optional[str]
+    program_title: str
+    similarity: float
+
+
+class _UserCorners:
+    """1ユーザー分のコーナー（正規化済みfloat32行列とメタデータ）"""
+
+    def __init__(self, rows: list, program_ids: FrozenSet[int]):
+        self.program_ids = program_ids
+        self.loaded_at = time.monotonic()
+        self.ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.rows = [
+            (row.program_id, row.title, row.description_for_llm, row.description_snippet, row.program_title)
+            for row in rows
+        ]
+        matrix = np.array([row.embedded_description for row in rows], dtype=np.float32).reshape(len(rows), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = np.ascontiguousarray(matrix / np.clip(norms, 1e-12, None))
+
+
+class CornerMatrixIndex:
+    """
+    ユーザーごとのコーナー埋め込み行列のキャッシュ
+
+    コーナー・番組の書き込み時に該当ユーザーのエントリを破棄する。
+    破棄は書き込みを処理したプロセス内でのみ行われるため、
+    複数ワーカー構成では corner_matrix_ttl_seconds で他プロセスの更新を反映する。
+    """
+
+    def __init__(self, max_users: int, ttl_seconds: float):
+        self._max_users = max_users
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, _UserCorners]" = OrderedDict()
+        self._generation = 0  # 破棄のたびに進め、読み込み中に破棄された結果を保存しない
+        self._lock = threading.Lock()
+
+    def search(
+        self, db: Session, user_id: int, embedding: List[float], threshold: float, limit: int
+    ) -> List[CornerSearchRow]:
+        """
+        コサイン類似度が閾値を超えるコーナーを類似度の高い順に取得
+
+        Args:
+            db: データベースセッション（キャッシュがない場合の読み込みに使用）
+            user_id: ユーザーID
+            embedding: 検索クエリの埋め込みベクトル
+            threshold: 類似度の閾値
+            limit: 最大件数
+
+        Returns:
+            類似度順のコーナーのリスト
+        """
+        entry = self._get_or_load(db, user_id)
+        if not entry.rows or limit <= 0:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        similarities = entry.matrix @ query
+
+        candidates = np.flatnonzero(similarities > threshold)
+        if len(candidates) > limit:
+            top = np.argpartition(-similarities[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        ordered = candidates[np.argsort(-similarities[candidates], kind="stable")]
+
+        return [CornerSearchRow(int(entry.ids[i]), *entry.rows[i], float(similarities[i])) for i in ordered]
+
+    def invalidate_user(self, user_id: int) -> None:
+        """ユーザーのエントリを破棄"""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def invalidate_program(self, program_id: int) -> None:
+        """番組を含むユーザーのエントリを破棄"""
+        with self._lock:
+            self._generation += 1
+            for user_id in [u for u, e in self._entries.items() if program_id in e.program_ids]:
+                del self._entries[user_id]
+
+    def _get_or_load(self, db: Session, user_id: int) -> _UserCorners:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry.loaded_at < self._ttl_seconds:
+                self._entries.move_to_end(user_id)
+                metrics.increment("corner_matrix.hits")
+                return entry
+            generation = self._generation
+
+        metrics.increment("corner_matrix.misses")
+        rows, program_ids = analyze_crud.get_user_corner_vectors(db, user_id)
+        entry = _UserCorners(rows, frozenset(program_ids))
+        with self._lock:
+            if generation != self._generation:
+                return entry
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self._max_users:
+                self._entries.popitem(last=False)
+            metrics.set_gauge("corner_matrix.users", len(self._entries))
+        return entry
+
+
+_corner_matrix_index: Optional[CornerMatrixIndex] = None
+
+
+def get_corner_matrix_index() -> CornerMatrixIndex:
+    """コーナー行列キャッシュのシングルトンインスタンスを取得"""
+    global _corner_matrix_index
+    if _corner_matrix_index is None:
+        _corner_matrix_index = CornerMatrixIndex(
+            max_users=settings.corner_matrix_max_users,
+            ttl_seconds=settings.corner_matrix_ttl_seconds,
+        )
+    return _corner_matrix_index
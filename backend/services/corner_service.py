@@ -9,7 +9,9 @@ from sqlalchemy.orm import Session
 from cruds.corner_repository_impl import CornerRepositoryImpl
 from domain.repositories.corner_repository import CornerRepositoryInterface
 from schemas import CornerCreate, CornerUpdate, CornerResponse
-from services.langchain_service import EmbeddingService
+from services.corner_matrix import get_corner_matrix_index
+from services.langchain_service import get_embedding_service, reduce_embedding
+from services.prompt_builder import render_corner_snippet
 
 
 def _get_repository(db: Session) -> CornerRepositoryInterface:
@@ -35,11 +37,15 @@ def create_corner(db: Session, corner: CornerCreate) -> CornerResponse:
     corner_data = corner.model_dump()
     
     # 埋め込みベクトルを生成
-    embedding_service = EmbeddingService()
-    embedded_description = embedding_service.embed_text(corner_data["description_for_llm"])
+    embedding_service = get_embedding_service()
+    embedded_description = embedding_service.embed_texts([corner_data["description_for_llm"]])[0]
     corner_data["embedded_description"] = embedded_description
+    corner_data["embedded_description_reduced"] = reduce_embedding(embedded_description)
+    corner_data["description_snippet"] = render_corner_snippet(corner_data["description_for_llm"])
     
-    return repo.create_from_dict(corner_data)
+    created = repo.create_from_dict(corner_data)
+    get_corner_matrix_index().invalidate_program(created.program_id)
+    return created
 
 
 def update_corner(
@@ -53,14 +59,25 @@ def update_corner(
     
     # description_for_llmが更新される場合は埋め込みベクトルも更新
     if "description_for_llm" in corner_data:
-        embedding_service = EmbeddingService()
-        embedded_description = embedding_service.embed_text(corner_data["description_for_llm"])
+        embedding_service = get_embedding_service()
+        embedded_description = embedding_service.embed_texts([corner_data["description_for_llm"]])[0]
         corner_data["embedded_description"] = embedded_description
+        corner_data["embedded_description_reduced"] = reduce_embedding(embedded_description)
+        corner_data["description_snippet"] = render_corner_snippet(corner_data["description_for_llm"])
     
-    return repo.update_from_dict(corner_id, corner_data)
+    updated = repo.update_from_dict(corner_id, corner_data)
+    if updated:
+        get_corner_matrix_index().invalidate_program(updated.program_id)
+    return updated
 
 
 def delete_corner(db: Session, corner_id: int) -> bool:
     """コーナーを削除"""
     repo = _get_repository(db)
-    return repo.delete(corner_id)
+    corner = repo.get_by_id(corner_id)
+    if not corner:
+        return False
+    program_id = corner.program_id
+    deleted = repo.delete(corner_id)
+    get_corner_matrix_index().invalidate_program(program_id)
+    return deleted
@@ -0,0 +1,12 @@
+"""
+ダッシュボードサービス
+ビジネスロジックを集約
+"""
+from sqlalchemy.orm import Session
+
+from cruds import dashboard as dashboard_crud
+
+
+def get_dashboard(db: Session, user_id: int, memo_limit: int = 3, mail_limit: int = 5) -> dict:
+    """ダッシュボードのデータを取得（DashboardResponseと同じキーの辞書。1回のクエリで取得）"""
+    return dashboard_crud.get_dashboard(db, user_id, memo_limit, mail_limit)
@@ -0,0 +1,103 @@
+"""
+埋め込みリクエストのマイクロバッチ集約
+短い時間窓に届いた単一テキストの埋め込み要求をまとめて1回のAPI呼び出しで処理する
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from services import metrics
+
+_Request = Tuple[str, Future]
+
+
+class EmbeddingBatcher:
+    """
+    埋め込み要求のマイクロバッチ集約器
+
+    最初の要求が届いてから max_wait 秒、または max_batch_size 件に達するまで要求を集め、
+    embed_batch を1回呼び出して結果を各呼び出し元に返す。
+    集約はワーカースレッドで行い、API呼び出しは別スレッドで実行するため、
+    前のバッチの応答待ちの間も次のバッチを集め続ける。
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 64,
+        max_wait: float = 0.005,
+        max_in_flight_batches: int = 4,
+        timeout: Optional[float] = 30.0,
+    ):
+        self._embed_batch = embed_batch
+        self._timeout = timeout
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight_batches, thread_name_prefix="embedding-batch"
+        )
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def embed(self, text: str) -> List[float]:
+        """
+        テキストを埋め込みベクトルに変換（同時に届いた要求とまとめて処理）
+
+        Args:
+            text: 埋め込み対象のテキスト
+
+        Returns:
+            埋め込みベクトル
+
+        Raises:
+            concurrent.futures.TimeoutError: timeout秒以内に結果が得られなかった
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result(timeout=self._timeout)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._collect_batches, name="embedding-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _collect_batches(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[_Request]) -> None:
+        metrics.observe("openai_embedding.batch_size", len(batch))
+        try:
+            vectors = self._embed_batch([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        if len(vectors) != len(batch):
+            # 件数が合わない結果は対応がわからないため、すべての呼び出し元を失敗させる
+            error = RuntimeError(f"埋め込みの件数が一致しません（要求{len(batch)}件、結果{len(vectors)}件）")
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(vector)
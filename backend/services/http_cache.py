@@ -0,0 +1,68 @@
+"""
+一覧APIの条件付きGET（ETag）
+ユーザーのデータバージョン（users.data_version）から検証子を作り、変更がなければ一覧を読み込まずに304を返す
+
+Last-Modifiedは秒単位のため、同じ秒に続けて更新されると変更を区別できない。
+参考情報として返すが、If-Modified-Sinceでは304を返さず、検証はETagのみで行う。
+"""
+
+from datetime import timezone
+from email.utils import format_datetime
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy.orm import Session
+
+from cruds import users as user_crud
+from responses import FastJSONResponse
+from services import metrics
+
+metrics.register_ratio("http_cache.not_modified.rate", "http_cache.not_modified", "http_cache.requests")
+
+
+def _validators(db: Session, user_id: int) -> Optional[Dict[str, str]]:
+    """ETag・Last-Modifiedのヘッダーを取得（ユーザーが存在しない場合はNone）"""
+    version = user_crud.get_data_version(db, user_id)
+    if version is None:
+        return None
+    return {
+        # 圧縮の有無で本文が変わっても同じ値を使うため弱いETagにする
+        "ETag": f'W/"{user_id}-{version.data_version}"',
+        "Last-Modified": format_datetime(version.data_updated_at.astimezone(timezone.utc), usegmt=True),
+        # キャッシュは保持してよいが、使う前に毎回再検証させる
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def _is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    etag = headers["ETag"].removeprefix("W/")
+    return any(
+        tag.strip() == "*" or tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
+
+
+def cached_json(request: Request, db: Session, user_id: int, load: Callable[[], Any]) -> Response:
+    """
+    条件付きGETに対応したJSONレスポンスを返す
+
+    Args:
+        request: リクエスト（If-None-Matchを参照）
+        db: データベースセッション
+        user_id: 一覧の対象ユーザーID
+        load: 一覧を読み込む関数（変更がない場合は呼ばない）
+
+    Returns:
+        変更がなければ304、あれば検証子付きのJSONレスポンス
+    """
+    metrics.increment("http_cache.requests")
+    headers = _validators(db, user_id)
+    if headers is None:
+        return FastJSONResponse(load())
+    if _is_not_modified(request, headers):
+        metrics.increment("http_cache.not_modified")
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FastJSONResponse(load(), headers=headers)
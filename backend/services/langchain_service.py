@@ -1,26 +1,66 @@
 """
 LangChainを使用した埋め込みとLLM推論サービス
-"""
 
-from typing import Dict, List, Optional
+LangChain・OpenAI・Geminiの各SDKは読み込みに時間がかかるため、
+サービスのインスタンスを最初に作成する時点で読み込む。
+"""
 
-from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import OpenAIEmbeddings
+import math
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
 
 from config import settings
+from models import REDUCED_EMBEDDING_DIMENSION
+from schemas import LLMCornerChoice, LLMCornerScoreList
+from services import metrics
+from services.embedding_batcher import EmbeddingBatcher
+from services.prompt_builder import estimate_tokens, render_corner_snippet
+from services.rate_limiter import get_provider_limiter
+
+# プロンプトテンプレート（LLMReasoningServiceの作成時に1回だけPromptTemplateにする）
+_RECOMMEND_CORNER_TEMPLATE = """あなたはラジオ番組のコーナー選択アシスタントです。
+以下のメモ内容に最も適したラジオコーナーを選択し、理由を説明してください。
+
+メモ内容:
+{memo_content}
+
+候補コーナー:
+{corners_info}
+
+タスク:
+1. メモ内容を分析し、適切なコーナーを1つ選択
+2. 選択理由を簡潔に説明（2-3文）
+3. 適合度を0.0-1.0のスコアで評価
+"""
+
+_SCORE_CORNERS_TEMPLATE = """あなたはラジオ番組のコーナー選択アシスタントです。
+以下のメモ内容が各コーナーにどの程度適しているか評価してください。
+
+メモ内容:
+{memo_content}
+
+コーナー一覧:
+{corners_list}
+
+各コーナーについて、0.0-1.0のスコアで適合度を評価してください。
+"""
 
 
 class EmbeddingService:
     """埋め込みベクトル生成サービス"""
 
     def __init__(self):
-        """OpenAI埋め込みモデルを初期化"""
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.openai_embedding_model,
-            api_key=settings.openai_api_key,
-            dimensions=settings.embedding_dimension,
-        )
+        """設定に応じて埋め込みモデルを初期化"""
+        self.embeddings = _create_embeddings()
+        # 同時に届いた単一テキストの要求をまとめて1回の呼び出しで処理
+        self._batcher: Optional[EmbeddingBatcher] = None
+        if settings.embedding_batch_enabled:
+            self._batcher = EmbeddingBatcher(
+                self.embed_queries,
+                max_batch_size=settings.embedding_batch_max_size,
+                max_wait=settings.embedding_batch_max_wait_ms / 1000,
+                timeout=settings.embedding_batch_timeout_seconds,
+            )
 
     def embed_text(self, text: str) -> List[float]:
         """
@@ -32,7 +72,10 @@ class EmbeddingService:
         Returns:
             埋め込みベクトル
         """
-        return self.embeddings.embed_query(text)
+        if self._batcher is not None:
+            return self._batcher.embed(text)
+        with self._limited([text]):
+            return self.embeddings.embed_query(text)
 
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """
@@ -44,7 +87,71 @@ class EmbeddingService:
         Returns:
             埋め込みベクトルのリスト
         """
-        return self.embeddings.embed_documents(texts)
+        with self._limited(texts):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """複数の検索クエリ（メモ）をまとめて埋め込みベクトルに変換"""
+        # OpenAIはクエリと文書を区別しないためembed_documentsで代用する
+        embed = getattr(self.embeddings, "embed_queries", self.embeddings.embed_documents)
+        with self._limited(texts):
+            return embed(texts)
+
+    @contextmanager
+    def _limited(self, texts: List[str]) -> Iterator[None]:
+        """OpenAIのレート制限内で埋め込みを実行（ローカルモデルは制限しない）"""
+        if settings.embedding_provider != "openai":
+            yield
+            return
+        from openai import RateLimitError
+
+        tokens = sum(estimate_tokens(text) for text in texts)
+        with get_provider_limiter("openai_embedding").slot(tokens=tokens) as result:
+            try:
+                yield
+            except RateLimitError:
+                result.throttled = True
+                raise
+
+
+def _create_embeddings():
+    """設定された埋め込みプロバイダーのモデルを作成"""
+    if settings.embedding_provider == "local":
+        from services.local_embeddings import LocalOnnxEmbeddings
+
+        return LocalOnnxEmbeddings(
+            settings.local_embedding_model_dir,
+            quantized=settings.local_embedding_quantized,
+            batch_size=settings.local_embedding_batch_size,
+            workers=settings.local_embedding_workers,
+            dimension=settings.embedding_dimension,
+        )
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model=settings.openai_embedding_model,
+        api_key=settings.openai_api_key,
+        dimensions=settings.embedding_dimension,
+    )
+
+
+def reduce_embedding(embedding: List[float], dimension: Optional[int] = None) -> List[float]:
+    """
+    埋め込みベクトルを先頭から指定次元に切り詰めて再正規化
+
+    text-embedding-3系はMatryoshka表現学習により先頭の次元ほど情報を多く持つため、
+    dimensionsを指定してAPIを呼び直した場合とほぼ同じベクトルが得られる。
+
+    Args:
+        embedding: 全次元の埋め込みベクトル
+        dimension: 切り詰め後の次元数（省略時はcorners.embedded_description_reducedの次元数）
+
+    Returns:
+        L2正規化した縮約ベクトル
+    """
+    reduced = embedding[: dimension or REDUCED_EMBEDDING_DIMENSION]
+    norm = math.sqrt(sum(value * value for value in reduced)) or 1.0
+    return [value / norm for value in reduced]
 
 
 class LLMReasoningService:
@@ -52,11 +159,27 @@ class LLMReasoningService:
 
     def __init__(self):
         """Gemini LLMを初期化"""
+        from langchain_core.prompts import PromptTemplate
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        self._recommend_prompt = PromptTemplate(
+            input_variables=["memo_content", "corners_info"], template=_RECOMMEND_CORNER_TEMPLATE
+        )
+        self._score_prompt = PromptTemplate(
+            input_variables=["memo_content", "corners_list"], template=_SCORE_CORNERS_TEMPLATE
+        )
         self.llm = ChatGoogleGenerativeAI(
             model=settings.gemini_model,
             google_api_key=settings.gemini_api_key,
             temperature=settings.gemini_temperature,
         )
+        # response_schemaによるJSONモードで出力し、Pydanticモデルとして受け取る
+        self._choice_llm = self.llm.with_structured_output(
+            LLMCornerChoice, method="json_schema", include_raw=True
+        )
+        self._scores_llm = self.llm.with_structured_output(
+            LLMCornerScoreList, method="json_schema", include_raw=True
+        )
 
     def recommend_corner(
         self, memo_content: str, candidate_corners: List[Dict], max_candidates: int = 5
@@ -75,37 +198,11 @@ class LLMReasoningService:
         # 候補を制限
         candidates = candidate_corners[:max_candidates]
 
-        # プロンプトテンプレートを作成
-        template = """あなたはラジオ番組のコーナー選択アシスタントです。
-以下のメモ内容に最も適したラジオコーナーを選択し、理由を説明してください。
-
-メモ内容:
-{memo_content}
-
-候補コーナー:
-{corners_info}
-
-タスク:
-1. メモ内容を分析し、適切なコーナーを1つ選択
-2. 選択理由を簡潔に説明（2-3文）
-3. 適合度を0.0-1.0のスコアで評価
-
-以下の形式で回答してください:
-推薦コーナーID: [corner_id]
-スコア: [0.0-1.0]
-理由: [選択理由]
-"""
-
         # コーナー情報をフォーマット
         corners_info = self._format_corners_info(candidates)
 
-        # プロンプトを作成
-        prompt = PromptTemplate(
-            input_variables=["memo_content", "corners_info"], template=template
-        )
-
         # LLM推論を実行（LCEL使用）
-        chain = prompt | self.llm
+        chain = self._recommend_prompt | self._choice_llm
         result = chain.invoke(
             {"memo_content": memo_content, "corners_info": corners_info}
         )
@@ -120,45 +217,30 @@ class LLMReasoningService:
             formatted.append(
                 f"{i}. ID: {corner['id']}\n"
                 f"   タイトル: {corner['title']}\n"
-                f"   説明: {corner['description_for_llm']}\n"
+                f"   説明: {render_corner_snippet(corner['description_for_llm'])}\n"
                 f"   類似度: {corner.get('similarity', 0.0):.3f}"
             )
         return "\n\n".join(formatted)
 
-    def _parse_llm_response(self, response: str, candidates: List[Dict]) -> Dict:
-        """LLMのレスポンスをパース"""
-        lines = response.strip().split("\n")
-
-        corner_id = None
-        score = 0.5  # デフォルトスコア
-        reasoning = ""
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith("推薦コーナーID:") or line.startswith("推奨コーナーID:"):
-                try:
-                    corner_id = int(line.split(":")[-1].strip())
-                except ValueError:
-                    pass
-            elif line.startswith("スコア:"):
-                try:
-                    score_str = line.split(":")[-1].strip()
-                    score = float(score_str)
-                    score = max(0.0, min(1.0, score))  # 0-1に制限
-                except ValueError:
-                    pass
-            elif line.startswith("理由:"):
-                reasoning = line.split(":", 1)[-1].strip()
-
-        # corner_idが取得できない場合は最初の候補を使用
-        if corner_id is None and candidates:
-            corner_id = candidates[0]["id"]
-
-        # 理由が取得できない場合はデフォルトメッセージ
-        if not reasoning:
-            reasoning = "ベクトル類似度に基づく推薦です。"
-
-        return {"corner_id": corner_id, "score": score, "reasoning": reasoning}
+    def _parse_llm_response(self, response: Dict, candidates: List[Dict]) -> Dict:
+        """構造化出力の結果を推薦結果に変換"""
+        choice: Optional[LLMCornerChoice] = _parsed_or_none(response, "recommend_corner")
+        candidate_ids = {c["id"] for c in candidates}
+
+        # 解析に失敗した場合や候補外のIDが返された場合は最初の候補を使用
+        if choice is None or choice.corner_id not in candidate_ids:
+            corner_id = candidates[0]["id"] if candidates else None
+            return {
+                "corner_id": corner_id,
+                "score": 0.5,
+                "reasoning": "ベクトル類似度に基づく推薦です。",
+            }
+
+        return {
+            "corner_id": choice.corner_id,
+            "score": choice.score,
+            "reasoning": choice.reasoning or "ベクトル類似度に基づく推薦です。",
+        }
 
     def analyze_memo_for_corners(
         self, memo_content: str, all_corners: List[Dict]
@@ -173,33 +255,15 @@ class LLMReasoningService:
         Returns:
             各コーナーの評価結果リスト
         """
-        template = """あなたはラジオ番組のコーナー選択アシスタントです。
-以下のメモ内容が各コーナーにどの程度適しているか評価してください。
-
-メモ内容:
-{memo_content}
-
-コーナー一覧:
-{corners_list}
-
-各コーナーについて、0.0-1.0のスコアで適合度を評価してください。
-以下の形式で回答:
-コーナーID [id]: スコア [score]
-"""
-
         corners_list = "\n".join(
             [
-                f"- ID: {c['id']}, タイトル: {c['title']}, 説明: {c['description_for_llm']}"
+                f"- ID: {c['id']}, タイトル: {c['title']}, 説明: {render_corner_snippet(c['description_for_llm'])}"
                 for c in all_corners
             ]
         )
 
-        prompt = PromptTemplate(
-            input_variables=["memo_content", "corners_list"], template=template
-        )
-
         # LLM推論を実行（LCEL使用）
-        chain = prompt | self.llm
+        chain = self._score_prompt | self._scores_llm
         result = chain.invoke(
             {"memo_content": memo_content, "corners_list": corners_list}
         )
@@ -207,26 +271,12 @@ class LLMReasoningService:
         # 結果をパースして各コーナーのスコアを抽出
         return self._parse_multiple_scores(result, all_corners)
 
-    def _parse_multiple_scores(self, response: str, corners: List[Dict]) -> List[Dict]:
-        """複数コーナーのスコアをパース"""
+    def _parse_multiple_scores(self, response: Dict, corners: List[Dict]) -> List[Dict]:
+        """構造化出力の結果から各コーナーのスコアを取得"""
+        score_list: Optional[LLMCornerScoreList] = _parsed_or_none(response, "analyze_memo_for_corners")
         scores = {}
-        lines = response.strip().split("\n")
-
-        for line in lines:
-            if ":" in line:
-                try:
-                    parts = line.split(":")
-                    if "コーナーID" in parts[0] or "ID" in parts[0]:
-                        # ID部分を抽出
-                        id_part = parts[0].split()[-1]
-                        corner_id = int(id_part)
-                        # スコア部分を抽出
-                        score_part = parts[-1].strip()
-                        score = float(score_part)
-                        score = max(0.0, min(1.0, score))
-                        scores[corner_id] = score
-                except (ValueError, IndexError):
-                    continue
+        if score_list is not None:
+            scores = {item.corner_id: item.score for item in score_list.scores}
 
         # 結果を構築
         results = []
@@ -236,6 +286,19 @@ class LLMReasoningService:
         return results
 
 
+def _parsed_or_none(response: Dict, operation: str):
+    """
+    with_structured_output(include_raw=True)の結果から検証済みモデルを取り出す
+
+    解析の試行数と失敗数は操作ごとにメトリクスへ記録する。
+    """
+    metrics.increment(f"reasoning.llm_parse.attempts.{operation}")
+    if response.get("parsing_error") is not None or response.get("parsed") is None:
+        metrics.increment(f"reasoning.llm_parse.failures.{operation}")
+        return None
+    return response["parsed"]
+
+
 # シングルトンインスタンス
 _embedding_service: Optional[EmbeddingService] = None
 _llm_service: Optional[LLMReasoningService] = None
@@ -0,0 +1,429 @@
+"""
+Gemini呼び出しクライアント
+期限・リトライ・ヘッジリクエスト・サーキットブレーカーを備えた共通ラッパー
+
+google-genaiは読み込みに時間がかかるため、最初に呼び出す時点で読み込む。
+"""
+
+import importlib.util
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Tuple
+
+import httpx
+
+from config import settings
+from services import metrics
+from services.prompt_builder import estimate_tokens
+from services.rate_limiter import RateLimitExceededError, get_provider_limiter
+
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types as genai_types
+
+logger = logging.getLogger(__name__)
+
+# ブレーカー状態のメトリクス値
+_BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class LLMUnavailableError(Exception):
+    """LLMプロバイダーが利用できない（フォールバックすべき）ことを示す例外"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """サーキットブレーカーが開いているため呼び出しを行わなかった"""
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """呼び出し期限を超過した"""
+
+
+class LLMRateLimitedError(LLMUnavailableError):
+    """レート制限により期限内に実行枠を確保できなかった"""
+
+
+class LLMProviderError(LLMUnavailableError):
+    """一時的な障害（429・5xx・通信エラー）が続き、リトライしても応答が得られなかった"""
+
+
+def _is_retryable(error: Exception) -> bool:
+    """リトライ対象のエラー（429・5xx・タイムアウト）か判定"""
+    from google.genai import errors as genai_errors
+
+    if isinstance(error, genai_errors.APIError):
+        return error.code == 429 or error.code >= 500
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError, LLMTimeoutError))
+
+
+class CircuitBreaker:
+    """
+    連続失敗回数に基づくサーキットブレーカー
+
+    closed: 通常どおり呼び出す
+    open: 一定時間すべての呼び出しを即座に拒否する
+    half_open: 1件だけ試行し、成功すればclosed、失敗すればopenに戻る
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._publish()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """呼び出しを許可するか判定"""
+        with self._lock:
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self._reset_timeout:
+                    return False
+                self._transition("half_open")
+            if self._state == "half_open":
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """成功を記録"""
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self._state != "closed":
+                self._transition("closed")
+
+    def record_failure(self) -> None:
+        """失敗を記録"""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == "half_open" or self._failures >= self._failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition("open")
+
+    def release(self) -> None:
+        """成功・失敗のどちらにも該当しない結果（リクエスト不正など）で試行枠を解放"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _transition(self, state: str) -> None:
+        if state != self._state:
+            logger.warning("サーキットブレーカー(%s)の状態が変化しました: %s -> %s", self._name, self._state, state)
+        self._state = state
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"{self._name}.circuit_breaker.state", _BREAKER_STATE_VALUES[self._state])
+
+
+class ResilientLLMClient:
+    """
+    Gemini APIの耐障害性ラッパー
+
+    - 呼び出し全体に期限を設け、各試行のHTTPタイムアウトを残り時間に合わせる
+    - 429・5xx・タイムアウトはジッター付き指数バックオフでリトライする
+    - ヘッジ有効時は、直近レイテンシのp95を過ぎても応答がなければ同じリクエストを追加で送り、先に返った方を使う
+    - 失敗が続くとサーキットブレーカーが開き、期限まで待たずにCircuitOpenErrorを送出する
+    """
+
+    def __init__(self, client_factory: Optional[Callable[[], "genai.Client"]] = None):
+        # 既定ではプロセス共通のgenai.Clientを使用（テストでは差し替え可能）
+        self._client_factory = client_factory or get_genai_client
+        self._breaker = CircuitBreaker(
+            "gemini",
+            failure_threshold=settings.gemini_breaker_failure_threshold,
+            reset_timeout=settings.gemini_breaker_reset_seconds,
+        )
+        self._limiter = get_provider_limiter("gemini")
+        self._latencies: deque = deque(maxlen=200)
+        self._latencies_lock = threading.Lock()
+        # 同時実行上限までの呼び出しが、それぞれヘッジで2本まで送られる
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.gemini_max_concurrency * 2, thread_name_prefix="gemini-hedge"
+        )
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    def generate_content(
+        self,
+        *,
+        model: str,
+        contents,
+        config: Optional["genai_types.GenerateContentConfig"] = None,
+        timeout: Optional[float] = None,
+    ) -> "genai_types.GenerateContentResponse":
+        """
+        期限・リトライ・ヘッジ付きでgenerate_contentを呼び出す
+
+        Raises:
+            CircuitOpenError: ブレーカーが開いている
+            LLMTimeoutError: 期限内に応答が得られなかった
+            LLMRateLimitedError: レート制限により実行枠を確保できなかった
+            LLMProviderError: 一時的な障害でリトライを使い切った
+            genai_errors.APIError: リトライ対象外のエラー
+        """
+        from google.genai import errors as genai_errors
+
+        if not self._breaker.allow_request():
+            metrics.increment("llm.gemini.short_circuited")
+            raise CircuitOpenError("Gemini APIのサーキットブレーカーが開いています")
+
+        deadline = time.monotonic() + (timeout or settings.gemini_timeout_seconds)
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._breaker.record_failure()
+                raise LLMTimeoutError("Gemini APIの呼び出し期限を超過しました")
+
+            def call() -> "genai_types.GenerateContentResponse":
+                with self._limiter.slot(tokens=_estimate_contents_tokens(contents), timeout=remaining) as result:
+                    try:
+                        return self._client_factory().models.generate_content(
+                            model=model, contents=contents, config=_with_timeout(config, remaining)
+                        )
+                    except genai_errors.APIError as e:
+                        result.throttled = e.code == 429
+                        raise
+
+            started = time.monotonic()
+            try:
+                if settings.gemini_hedge_enabled:
+                    response = self._call_with_hedge(call, remaining)
+                else:
+                    response = call()
+            except RateLimitExceededError as e:
+                # プロバイダー側の障害ではないためブレーカーには数えない
+                self._breaker.release()
+                raise LLMRateLimitedError(str(e)) from e
+            except Exception as e:
+                if not _is_retryable(e):
+                    self._breaker.release()
+                    raise
+                metrics.increment("llm.gemini.retryable_errors")
+                backoff = min(
+                    settings.gemini_retry_max_delay,
+                    settings.gemini_retry_base_delay * (2 ** attempt),
+                )
+                delay = random.uniform(0, backoff)
+                if attempt >= settings.gemini_max_retries or time.monotonic() + delay >= deadline:
+                    self._breaker.record_failure()
+                    if isinstance(e, (httpx.TimeoutException, LLMTimeoutError)):
+                        raise LLMTimeoutError("Gemini APIの呼び出しがタイムアウトしました") from e
+                    raise LLMProviderError(f"Gemini APIの呼び出しに失敗しました: {e}") from e
+                logger.warning("Gemini API呼び出しをリトライします (attempt=%d): %s", attempt + 1, e)
+                metrics.increment("llm.gemini.retries")
+                attempt += 1
+                time.sleep(delay)
+                continue
+
+            self._record_latency(time.monotonic() - started)
+            self._breaker.record_success()
+            return response
+
+    def generate_content_stream(
+        self,
+        *,
+        model: str,
+        contents,
+        config: Optional["genai_types.GenerateContentConfig"] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator["genai_types.GenerateContentResponse"]:
+        """
+        期限とサーキットブレーカー付きでgenerate_content_streamを呼び出す
+
+        出力の一部を返した後はやり直せないため、リトライとヘッジは行わない。
+
+        Raises:
+            CircuitOpenError: ブレーカーが開いている
+            LLMTimeoutError: ストリーミングがタイムアウトした
+            LLMRateLimitedError: レート制限により実行枠を確保できなかった
+            LLMProviderError: 一時的な障害（429・5xx・通信エラー）
+            genai_errors.APIError: リトライ対象外のエラー
+        """
+        from google.genai import errors as genai_errors
+
+        if not self._breaker.allow_request():
+            metrics.increment("llm.gemini.short_circuited")
+            raise CircuitOpenError("Gemini APIのサーキットブレーカーが開いています")
+
+        try:
+            with self._limiter.slot(tokens=_estimate_contents_tokens(contents)) as result:
+                try:
+                    stream = self._client_factory().models.generate_content_stream(
+                        model=model,
+                        contents=contents,
+                        config=_with_timeout(config, timeout or settings.gemini_timeout_seconds),
+                    )
+                    for chunk in stream:
+                        yield chunk
+                except genai_errors.APIError as e:
+                    result.throttled = e.code == 429
+                    raise
+        except RateLimitExceededError as e:
+            self._breaker.release()
+            raise LLMRateLimitedError(str(e)) from e
+        except Exception as e:
+            if _is_retryable(e):
+                self._breaker.record_failure()
+                if isinstance(e, httpx.TimeoutException):
+                    raise LLMTimeoutError("Gemini APIのストリーミングがタイムアウトしました") from e
+                raise LLMProviderError(f"Gemini APIのストリーミングに失敗しました: {e}") from e
+            self._breaker.release()
+            raise
+        except BaseException:
+            # 利用側が途中で読むのをやめた場合（GeneratorExit）など。半開状態の試行枠を残さないよう解放する
+            self._breaker.release()
+            raise
+        self._breaker.record_success()
+
+    def _call_with_hedge(self, call: Callable, remaining: float):
+        """p95レイテンシを過ぎても応答がなければ2本目を送り、先に成功した結果を返す"""
+        # ヘッジ待ちの時間も含めて、呼び出し全体を残り時間内に収める
+        deadline = time.monotonic() + remaining
+        futures = [self._executor.submit(call)]
+        done, _ = wait(futures, timeout=min(self._hedge_delay(), remaining))
+        if not done and time.monotonic() < deadline:
+            metrics.increment("llm.gemini.hedged")
+            futures.append(self._executor.submit(call))
+
+        pending = set(futures)
+        error: Optional[Exception] = None
+        while pending:
+            done, pending = wait(
+                pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                raise LLMTimeoutError("Gemini APIの呼び出し期限を超過しました")
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _hedge_delay(self) -> float:
+        """直近レイテンシのp95（観測数が少ない間は設定値）"""
+        with self._latencies_lock:
+            samples = sorted(self._latencies)
+        if len(samples) < 20:
+            return settings.gemini_hedge_min_delay
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        return max(settings.gemini_hedge_min_delay, p95)
+
+    def _record_latency(self, seconds: float) -> None:
+        with self._latencies_lock:
+            self._latencies.append(seconds)
+        metrics.observe("llm.gemini.latency_seconds", seconds)
+
+
+def _estimate_contents_tokens(contents) -> int:
+    """レート制限用に入力トークン数を推定（文字列以外は0）"""
+    return estimate_tokens(contents) if isinstance(contents, str) else 0
+
+
+def _with_timeout(
+    config: Optional["genai_types.GenerateContentConfig"], seconds: float
+) -> "genai_types.GenerateContentConfig":
+    """生成設定にHTTPタイムアウト（ミリ秒）を設定したコピーを返す"""
+    from google.genai import types as genai_types
+
+    http_options = genai_types.HttpOptions(timeout=max(1, int(seconds * 1000)))
+    if config is None:
+        return genai_types.GenerateContentConfig(http_options=http_options)
+    return config.model_copy(update={"http_options": http_options})
+
+
+def _http2_available() -> bool:
+    """HTTP/2に必要なh2パッケージがインストールされているか"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_genai_client() -> Tuple["genai.Client", httpx.Client, httpx.AsyncClient]:
+    """接続プールを共有するgenai.Clientを作成（同期・非同期の両方）"""
+    from google import genai
+    from google.genai import types as genai_types
+
+    http2 = settings.gemini_http2 and _http2_available()
+    limits = httpx.Limits(
+        max_connections=settings.gemini_max_connections,
+        max_keepalive_connections=settings.gemini_max_keepalive_connections,
+        keepalive_expiry=settings.gemini_keepalive_expiry_seconds,
+    )
+    timeout = httpx.Timeout(settings.gemini_timeout_seconds)
+    http_client = httpx.Client(http2=http2, limits=limits, timeout=timeout)
+    async_http_client = httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout)
+    client = genai.Client(
+        api_key=settings.gemini_api_key,
+        http_options=genai_types.HttpOptions(
+            httpx_client=http_client,
+            httpx_async_client=async_http_client,
+        ),
+    )
+    return client, http_client, async_http_client
+
+
+# シングルトンインスタンス
+_genai_client: Optional["genai.Client"] = None
+_http_clients: Optional[Tuple[httpx.Client, httpx.AsyncClient]] = None
+_genai_client_lock = threading.Lock()
+_llm_client: Optional[ResilientLLMClient] = None
+
+
+def get_genai_client() -> "genai.Client":
+    """
+    プロセス共通のgenai.Clientを取得
+
+    非同期版は `get_genai_client().aio` を使用する。
+    """
+    global _genai_client, _http_clients
+    if _genai_client is None:
+        with _genai_client_lock:
+            if _genai_client is None:
+                client, http_client, async_http_client = _build_genai_client()
+                _http_clients = (http_client, async_http_client)
+                _genai_client = client
+    return _genai_client
+
+
+def set_genai_client(client: Optional["genai.Client"]) -> None:
+    """プロセス共通のgenai.Clientを差し替える（テスト用のフェイク注入など）"""
+    global _genai_client
+    with _genai_client_lock:
+        _genai_client = client
+
+
+async def close_genai_client() -> None:
+    """プロセス共通のgenai.Clientの接続プールを閉じる（シャットダウン時）"""
+    global _genai_client, _http_clients
+    with _genai_client_lock:
+        http_clients, _http_clients = _http_clients, None
+        _genai_client = None
+    if http_clients is None:
+        return
+    http_client, async_http_client = http_clients
+    http_client.close()
+    await async_http_client.aclose()
+
+
+def get_llm_client() -> ResilientLLMClient:
+    """Gemini呼び出しクライアントのシングルトンインスタンスを取得"""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = ResilientLLMClient()
+    return _llm_client
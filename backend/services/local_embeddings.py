@@ -0,0 +1,112 @@
+"""
+ローカルCPU埋め込みプロバイダー
+ONNX形式に変換した多言語埋め込みモデル（intfloat/multilingual-e5-large等）をonnxruntimeで実行する
+
+モデルディレクトリには以下を配置する:
+    model.onnx            float32モデル
+    model_quantized.onnx  int8動的量子化モデル（任意）
+    tokenizer.json        トークナイザー
+
+作成例:
+    optimum-cli export onnx --model intfloat/multilingual-e5-large models/multilingual-e5-large
+    python -c "from onnxruntime.quantization import quantize_dynamic, QuantType; \\
+        quantize_dynamic('models/multilingual-e5-large/model.onnx', \\
+                         'models/multilingual-e5-large/model_quantized.onnx', weight_type=QuantType.QInt8)"
+
+onnxruntime・tokenizers は任意の依存関係のため、このプロバイダーを使う場合のみ読み込む。
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+# e5系モデルは検索クエリと検索対象で接頭辞を使い分ける
+_QUERY_PREFIX = "query: "
+_PASSAGE_PREFIX = "passage: "
+
+
+class LocalOnnxEmbeddings:
+    """
+    onnxruntimeによるローカル埋め込み（LangChainのEmbeddingsと同じインターフェース）
+
+    入力を長さ順に並べてバッチ化し（パディングを最小化）、
+    バッチをスレッドプールで並列に推論する。
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = False,
+        batch_size: int = 32,
+        workers: int = 2,
+        max_length: int = 512,
+        dimension: int = 1024,
+    ):
+        import numpy as np
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self._np = np
+        model_file = "model_quantized.onnx" if quantized else "model.onnx"
+        model_path = os.path.join(model_dir, model_file)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"ONNX model not found: {model_path}")
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()
+
+        # 推論スレッドをワーカー間で分け合い、コア数を超えて並列化しない
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // workers)
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self._batch_size = batch_size
+        self._dimension = dimension
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="local-embedding")
+
+    def embed_query(self, text: str) -> List[float]:
+        """検索クエリ（メモ）を埋め込みベクトルに変換"""
+        return self._embed([_QUERY_PREFIX + text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """複数の検索クエリをまとめて埋め込みベクトルに変換"""
+        return self._embed([_QUERY_PREFIX + text for text in texts])
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """検索対象（コーナー説明）を埋め込みベクトルに変換"""
+        return self._embed([_PASSAGE_PREFIX + text for text in texts])
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches = [order[i:i + self._batch_size] for i in range(0, len(order), self._batch_size)]
+        results: List[List[float]] = [[] for _ in texts]
+        for indices, vectors in zip(
+            batches, self._executor.map(lambda b: self._run([texts[i] for i in b]), batches)
+        ):
+            for index, vector in zip(indices, vectors):
+                results[index] = vector
+        return results
+
+    def _run(self, texts: List[str]) -> List[List[float]]:
+        np = self._np
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self._session.run(None, inputs)[0]
+        # 平均プーリング（パディングを除外）とL2正規化
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if pooled.shape[1] != self._dimension:
+            raise ValueError(
+                f"Model dimension {pooled.shape[1]} does not match embedding_dimension {self._dimension}"
+            )
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
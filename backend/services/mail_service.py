@@ -9,6 +9,10 @@ from sqlalchemy.orm import Session
 from cruds.mail_repository_impl import MailRepositoryImpl
 from domain.repositories.mail_repository import MailRepositoryInterface
 from schemas import MailCreate, MailUpdate, MailResponse
+from services.projection import Projection, parse_projection
+
+# fields= で指定できる列（レスポンスのキー順）
+MAIL_FIELDS = tuple(MailResponse.model_fields)
 
 
 def _get_repository(db: Session) -> MailRepositoryInterface:
@@ -21,11 +25,23 @@ def get_mails(
     user_id: int,
     status_filter: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100
-) -> List[MailResponse]:
-    """メール一覧を取得"""
+    limit: int = 100,
+    projection: Optional[Projection] = None
+) -> List[dict]:
+    """メール一覧を取得（MailResponseのキーのうち、projectionで指定された列の辞書。省略時はすべての列）"""
+    fields = projection.fields if projection else MAIL_FIELDS
     repo = _get_repository(db)
-    return repo.get_by_user_id(user_id, status_filter, skip, limit)
+    return repo.get_rows_by_user_id(user_id, status_filter, skip, limit, fields=fields)
+
+
+def parse_list_projection(fields: Optional[str]) -> Projection:
+    """
+    メール一覧の fields= パラメーターを解析
+
+    Raises:
+        ValueError: 指定できない列が含まれる場合
+    """
+    return parse_projection(fields, None, MAIL_FIELDS)
 
 
 def get_mail_stats(db: Session, user_id: int) -> dict:
@@ -9,6 +9,10 @@ from sqlalchemy.orm import Session
 from cruds.memo_repository_impl import MemoRepositoryImpl
 from domain.repositories.memo_repository import MemoRepositoryInterface
 from schemas import MemoCreate, MemoUpdate, MemoResponse
+from services.projection import Projection, parse_projection
+
+# fields= で指定できる列（レスポンスのキー順）
+MEMO_FIELDS = tuple(MemoResponse.model_fields)
 
 
 def _get_repository(db: Session) -> MemoRepositoryInterface:
@@ -20,12 +24,23 @@ def get_memos(
     db: Session,
     user_id: int,
     skip: int = 0,
-    limit: int = 100
-) -> List[MemoResponse]:
-    """メモ一覧を取得"""
+    limit: int = 100,
+    projection: Optional[Projection] = None
+) -> List[dict]:
+    """メモ一覧を取得（MemoResponseのキーのうち、projectionで指定された列の辞書。省略時はすべての列）"""
+    fields = projection.fields if projection else MEMO_FIELDS
     repo = _get_repository(db)
-    # 後方互換性のためORMモデルを返す
-    return repo.get_by_user_id(user_id, skip, limit)
+    return repo.get_rows_by_user_id(user_id, skip, limit, fields=fields)
+
+
+def parse_list_projection(fields: Optional[str]) -> Projection:
+    """
+    メモ一覧の fields= パラメーターを解析
+
+    Raises:
+        ValueError: 指定できない列が含まれる場合
+    """
+    return parse_projection(fields, None, MEMO_FIELDS)
 
 
 def get_memo(db: Session, memo_id: int) -> Optional[MemoResponse]:
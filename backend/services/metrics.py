@@ -0,0 +1,75 @@
+"""
+アプリケーションメトリクス
+プロセス内のカウンター・ゲージ・観測値を集計する
+
+ワーカーごとに独立して集計されるため、複数ワーカー構成では各プロセスの値を合算して扱う。
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_gauges: Dict[str, float] = {}
+_observations: Dict[str, Dict[str, float]] = {}
+_ratios: Dict[str, Tuple[str, str]] = {}
+
+
+def increment(name: str, value: float = 1.0) -> None:
+    """カウンターを加算"""
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name: str, value: float) -> None:
+    """ゲージの値を設定"""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name: str, value: float) -> None:
+    """観測値を記録（件数・合計・最小・最大を保持）"""
+    with _lock:
+        stats = _observations.get(name)
+        if stats is None:
+            _observations[name] = {"count": 1, "sum": value, "min": value, "max": value}
+            return
+        stats["count"] += 1
+        stats["sum"] += value
+        stats["min"] = min(stats["min"], value)
+        stats["max"] = max(stats["max"], value)
+
+
+def register_ratio(name: str, numerator: str, denominator: str) -> None:
+    """2つのカウンターの比率をスナップショットに含める"""
+    with _lock:
+        _ratios[name] = (numerator, denominator)
+
+
+def snapshot() -> dict:
+    """現在のメトリクスを取得"""
+    with _lock:
+        observations = {
+            name: {**stats, "avg": stats["sum"] / stats["count"]}
+            for name, stats in _observations.items()
+        }
+        ratios = {}
+        for name, (numerator, denominator) in _ratios.items():
+            total = _counters.get(denominator, 0.0)
+            ratios[name] = _counters.get(numerator, 0.0) / total if total else 0.0
+
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "observations": observations,
+            "ratios": ratios,
+        }
+
+
+def reset() -> None:
+    """全メトリクスをリセット"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _observations.clear()
@@ -9,9 +9,9 @@ from cruds import personalities as personality_crud
 from schemas import PersonalityCreate, PersonalityUpdate, PersonalityResponse
 
 
-def get_personalities(db: Session, user_id: int) -> List[PersonalityResponse]:
-    """パーソナリティ一覧を取得"""
-    return personality_crud.get_personalities(db, user_id)
+def get_personalities(db: Session, user_id: int) -> List[dict]:
+    """パーソナリティ一覧を取得（PersonalityResponseと同じキーの辞書）"""
+    return personality_crud.get_personality_rows(db, user_id)
 
 
 def get_personality(db: Session, personality_id: int) -> Optional[PersonalityResponse]:
@@ -8,7 +8,16 @@ from sqlalchemy.orm import Session
 
 from cruds.program_repository_impl import ProgramRepositoryImpl
 from domain.repositories.program_repository import ProgramRepositoryInterface
-from schemas import ProgramCreate, ProgramUpdate, ProgramResponse
+from schemas import ProgramCreate, ProgramUpdate, ProgramResponse, CornerResponse, PersonalityResponse
+from services.projection import Projection, parse_projection
+from services.corner_matrix import get_corner_matrix_index
+
+# fields= / include= で指定できる列と関連（レスポンスのキー順）
+PROGRAM_RELATIONS = {
+    "corners": tuple(CornerResponse.model_fields),
+    "personalities": tuple(PersonalityResponse.model_fields),
+}
+PROGRAM_FIELDS = tuple(name for name in ProgramResponse.model_fields if name not in PROGRAM_RELATIONS)
 
 
 def _get_repository(db: Session) -> ProgramRepositoryInterface:
@@ -20,11 +29,30 @@ def get_programs(
     db: Session,
     user_id: int,
     personality_id: Optional[int] = None,
-    search: Optional[str] = None
-) -> List[ProgramResponse]:
-    """番組一覧を取得（パーソナリティや番組名での絞り込み可能）"""
+    search: Optional[str] = None,
+    projection: Optional[Projection] = None
+) -> List[dict]:
+    """
+    番組一覧を取得（パーソナリティや番組名での絞り込み可能）
+
+    ProgramResponseのキーのうち、projectionで指定された列・関連の辞書を返す（省略時はすべて）。
+    含めない関連は問い合わせ自体を行わない。
+    """
+    projection = projection or parse_list_projection(None, None)
     repo = _get_repository(db)
-    return repo.get_by_user_id(user_id, personality_id, search)
+    return repo.get_rows_by_user_id(
+        user_id, personality_id, search, projection.fields, projection.includes
+    )
+
+
+def parse_list_projection(fields: Optional[str], include: Optional[str]) -> Projection:
+    """
+    番組一覧の fields= / include= パラメーターを解析
+
+    Raises:
+        ValueError: 指定できない列・関連が含まれる場合
+    """
+    return parse_projection(fields, include, PROGRAM_FIELDS, PROGRAM_RELATIONS)
 
 
 def get_program(db: Session, program_id: int) -> Optional[ProgramResponse]:
@@ -38,10 +66,13 @@ def create_program(db: Session, program: ProgramCreate) -> ProgramResponse:
     program_data = program.model_dump(exclude={"personality_ids", "corners"})
     
     repo = _get_repository(db)
-    return repo.create_from_dict(
+    created = repo.create_from_dict(
         program_data,
         program.personality_ids,
     )
+    # 新しい番組はキャッシュ済みの番組IDに含まれないため、ユーザー単位で破棄する
+    get_corner_matrix_index().invalidate_user(created.user_id)
+    return created
 
 
 def update_program(
@@ -52,14 +83,18 @@ def update_program(
     """番組を更新"""
     update_data = program.model_dump(exclude={"personality_ids"}, exclude_unset=True)
     repo = _get_repository(db)
-    return repo.update_from_dict(
+    updated = repo.update_from_dict(
         program_id,
         update_data,
         program.personality_ids
     )
+    get_corner_matrix_index().invalidate_program(program_id)
+    return updated
 
 
 def delete_program(db: Session, program_id: int) -> bool:
     """番組を削除"""
     repo = _get_repository(db)
-    return repo.delete(program_id)
+    deleted = repo.delete(program_id)
+    get_corner_matrix_index().invalidate_program(program_id)
+    return deleted
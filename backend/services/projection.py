@@ -0,0 +1,94 @@
+"""
+一覧APIの取得項目の指定（fields= / include=）
+指定された列・関連だけをSQLで取得するため、クエリパラメーターを検証して列名の組に変換する
+"""
+
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+
+class Projection(NamedTuple):
+    """取得する列と関連"""
+
+    fields: Tuple[str, ...]  # 一覧の対象テーブルの列（レスポンスのキー順）
+    includes: Dict[str, Tuple[str, ...]]  # 関連名 → 関連先の列
+
+
+def _split(value: str) -> list:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def parse_projection(
+    fields: Optional[str],
+    include: Optional[str],
+    columns: Sequence[str],
+    relations: Optional[Dict[str, Sequence[str]]] = None,
+) -> Projection:
+    """
+    fields / include パラメーターを解析
+
+    fieldsの「列名」は対象テーブルの列、「関連名.列名」は関連先の列を表す。
+    includeを省略した場合、fieldsも省略されていればすべての関連を含め、
+    fieldsがあれば「関連名.列名」で参照された関連のみを含める。
+    関連先の列の指定がない関連はすべての列を返す。
+    fieldsに「関連名.列名」しかない場合、対象テーブルの列はidのみを返す。
+
+    Args:
+        fields: カンマ区切りの列名（省略時はすべての列）
+        include: カンマ区切りの関連名（空文字なら関連を含めない）
+        columns: 対象テーブルで指定できる列（レスポンスのキー順）
+        relations: 関連名 → 関連先で指定できる列
+
+    Returns:
+        取得する列と関連
+
+    Raises:
+        ValueError: 指定できない列・関連が含まれる場合
+    """
+    relations = relations or {}
+    requested = _split(fields) if fields is not None else []
+    base_fields = [name for name in requested if "." not in name]
+    nested: Dict[str, list] = {}
+    for name in requested:
+        if "." in name:
+            relation, _, column = name.partition(".")
+            nested.setdefault(relation, []).append(column)
+
+    unknown = [name for name in base_fields if name not in columns]
+    for relation, relation_columns in nested.items():
+        if relation not in relations:
+            unknown.append(relation)
+            continue
+        unknown += [f"{relation}.{c}" for c in relation_columns if c not in relations[relation]]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    if include is not None:
+        included = _split(include)
+        unknown_relations = [name for name in included if name not in relations]
+        if unknown_relations:
+            raise ValueError(f"Unknown include: {', '.join(unknown_relations)}")
+        not_included = [name for name in nested if name not in included]
+        if not_included:
+            raise ValueError(f"Fields of relations not in include: {', '.join(not_included)}")
+    elif fields is not None:
+        included = list(nested)
+    else:
+        included = list(relations)
+
+    # 重複を除き、レスポンスのキー順は定義順にそろえる
+    if fields is None:
+        selected = set(columns)
+    elif base_fields:
+        selected = set(base_fields)
+    else:
+        selected = {"id"}
+    return Projection(
+        fields=tuple(c for c in columns if c in selected),
+        includes={
+            relation: tuple(
+                c for c in relations[relation] if not nested.get(relation) or c in nested[relation]
+            )
+            for relation in relations
+            if relation in included
+        },
+    )
@@ -0,0 +1,137 @@
+"""
+Gemini向けプロンプト構築
+推定トークン数に基づいてコーナー説明を切り詰め、予算内に収める
+"""
+
+import re
+from typing import List, Tuple
+
+from config import settings
+
+# 日本語（かな・漢字・全角記号）はおおよそ1文字1トークン、それ以外は4文字1トークンで見積もる
+_CJK_PATTERN = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_ELLIPSIS = "…"
+
+# 呼び出しごとに変わらない指示部分（先頭に固定してプロンプトキャッシュを効きやすくする）
+RECOMMENDATION_PROMPT_PREFIX = """あなたはラジオ投稿のアシスタントです。
+メモ内容を分析し、投稿可能なコーナー一覧から適合度の高い順に最大3つのコーナーを推奨してください。
+- scoreは0.0から1.0の範囲で、小数点第2位まで
+- reasonは100文字以内の日本語で具体的かつ簡潔に
+"""
+
+# response_schemaを使用しない場合のみ付与する出力形式の指示
+LEGACY_OUTPUT_FORMAT = """
+【出力形式】
+以下のJSON形式で回答してください：
+```json
+[
+  {
+    "corner_id": コーナーID（数値）,
+    "score": 適合度スコア（0.0-1.0の小数）,
+    "reason": "推奨理由"
+  }
+]
+```
+JSONのみを返し、他のテキストは含めないでください。
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    テキストのトークン数を推定
+
+    Args:
+        text: 対象テキスト
+
+    Returns:
+        推定トークン数
+    """
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return cjk_count + (other_count + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    推定トークン数が上限に収まるようにテキストを末尾から切り詰める
+
+    Args:
+        text: 対象テキスト
+        max_tokens: 推定トークン数の上限
+
+    Returns:
+        切り詰めたテキスト（切り詰めた場合は末尾に省略記号を付与）
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    tokens = 0.0
+    for i, char in enumerate(text):
+        tokens += 1.0 if _CJK_PATTERN.match(char) else 0.25
+        if tokens > max_tokens - 1:
+            return text[:i] + _ELLIPSIS
+    return text
+
+
+def render_corner_snippet(description_for_llm: str) -> str:
+    """
+    プロンプトに埋め込むコーナー説明を生成（コーナー保存時に事前計算する）
+
+    Args:
+        description_for_llm: LLM用コーナー説明
+
+    Returns:
+        空白を正規化し、トークン上限で切り詰めた説明
+    """
+    normalized = _WHITESPACE_PATTERN.sub(" ", description_for_llm).strip()
+    return truncate_to_tokens(normalized, settings.llm_corner_snippet_max_tokens)
+
+
+_PREFIX_TOKENS = estimate_tokens(RECOMMENDATION_PROMPT_PREFIX)
+_LEGACY_PREFIX = RECOMMENDATION_PROMPT_PREFIX + LEGACY_OUTPUT_FORMAT
+_LEGACY_PREFIX_TOKENS = estimate_tokens(_LEGACY_PREFIX)
+
+
+def build_recommendation_prompt(
+    memo_content: str, corners_info: List[dict], structured_output: bool = True
+) -> Tuple[str, int]:
+    """
+    トークン予算内でコーナー推奨プロンプトを構築
+
+    候補は渡された順（検索順位順）に追加し、予算を超える候補は含めない。
+    先頭の候補は予算に関わらず必ず含める。
+
+    Args:
+        memo_content: メモの内容
+        corners_info: コーナー情報のリスト（snippetがあれば説明の代わりに使用）
+        structured_output: response_schemaを使用するか（Falseなら出力形式の指示を含める）
+
+    Returns:
+        (プロンプト, 推定トークン数) のタプル
+    """
+    memo_text = truncate_to_tokens(memo_content.strip(), settings.llm_memo_max_tokens)
+    memo_section = f"\n【メモ内容】\n{memo_text}\n\n【投稿可能なコーナー一覧】\n"
+
+    prefix = RECOMMENDATION_PROMPT_PREFIX
+    prefix_tokens = _PREFIX_TOKENS
+    if not structured_output:
+        prefix = _LEGACY_PREFIX
+        prefix_tokens = _LEGACY_PREFIX_TOKENS
+
+    total_tokens = prefix_tokens + estimate_tokens(memo_section)
+    corner_blocks = []
+    for corner in corners_info:
+        snippet = corner.get("snippet") or render_corner_snippet(corner["description"])
+        block = (
+            f"ID: {corner['id']}\n番組: {corner['program_title']}\n"
+            f"コーナー: {corner['corner_title']}\n説明: {snippet}\n\n"
+        )
+        block_tokens = estimate_tokens(block)
+        if corner_blocks and total_tokens + block_tokens > settings.llm_prompt_token_budget:
+            break
+        corner_blocks.append(block)
+        total_tokens += block_tokens
+
+    prompt = prefix + memo_section + "".join(corner_blocks)
+    return prompt, total_tokens
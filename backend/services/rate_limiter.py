@@ -0,0 +1,229 @@
+"""
+外部プロバイダー呼び出しのレート制限
+リクエスト数・トークン数のトークンバケットとAIMDによる適応的な同時実行数制御
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from config import settings
+from services import metrics
+
+
+class RateLimitExceededError(Exception):
+    """期限内にプロバイダー呼び出しの実行枠を確保できなかった"""
+
+    def __init__(self, provider: str, message: str):
+        super().__init__(message)
+        self.provider = provider
+
+
+class TokenBucket:
+    """1分あたりの補充量を指定するトークンバケット"""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 10.0):
+        self._rate_per_second = rate_per_minute / 60.0
+        self._capacity = max(1.0, self._rate_per_second * burst_seconds)
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float, deadline: float) -> bool:
+        """
+        トークンを消費する（足りなければ期限まで待つ）
+
+        補充を待っても期限に間に合わないと分かった時点で待たずにFalseを返す。
+
+        Args:
+            amount: 消費量（容量を超える場合は容量に丸める）
+            deadline: time.monotonic()基準の期限
+
+        Returns:
+            消費できたかどうか
+        """
+        amount = min(amount, self._capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated_at) * self._rate_per_second
+                )
+                self._updated_at = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return True
+                wait = (amount - self._tokens) / self._rate_per_second
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def refund(self, amount: float) -> None:
+        """使われなかったトークンを戻す"""
+        amount = min(amount, self._capacity)
+        with self._lock:
+            self._tokens = min(self._capacity, self._tokens + amount)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD（加算増加・乗算減少）による同時実行数の上限制御
+
+    成功かつ目標レイテンシ以内なら上限を徐々に上げ、
+    429や目標超過のレイテンシを観測したら上限を半分にする。
+    上限を下げる前から実行中だった呼び出しの結果は同じ混雑を反映しているため、
+    上限を下げるのは前回下げた後に開始した呼び出しで再び観測した場合だけにする。
+    """
+
+    def __init__(self, name: str, initial_limit: int, max_limit: int, latency_target: float):
+        self._name = name
+        self._limit = float(initial_limit)
+        self._max_limit = max_limit
+        self._latency_target = latency_target
+        self._in_flight = 0
+        self._last_decrease_at = float("-inf")
+        self._condition = threading.Condition()
+        self._publish()
+
+    def acquire(self, deadline: float) -> bool:
+        """実行枠を確保する（空きがなければ期限まで待つ）"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self._in_flight += 1
+            self._publish()
+            return True
+
+    def release(self, latency: float, throttled: bool) -> None:
+        """実行枠を解放し、結果に応じて上限を調整"""
+        with self._condition:
+            now = time.monotonic()
+            self._in_flight -= 1
+            if throttled or latency > self._latency_target:
+                if now - latency >= self._last_decrease_at:
+                    self._limit = max(1.0, self._limit / 2)
+                    self._last_decrease_at = now
+            else:
+                self._limit = min(float(self._max_limit), self._limit + 1.0 / self._limit)
+            self._publish()
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        """呼び出しを行わずに実行枠を解放する（上限は調整しない）"""
+        with self._condition:
+            self._in_flight -= 1
+            self._publish()
+            self._condition.notify_all()
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"{self._name}.concurrency.limit", int(self._limit))
+        metrics.set_gauge(f"{self._name}.concurrency.in_flight", self._in_flight)
+
+
+class ProviderLimiter:
+    """プロバイダーごとのRPM・TPM・同時実行数の制限"""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        latency_target: float,
+    ):
+        self.name = name
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._concurrency = AdaptiveConcurrencyLimiter(
+            name,
+            initial_limit=max(1, max_concurrency // 2),
+            max_limit=max_concurrency,
+            latency_target=latency_target,
+        )
+
+    @contextmanager
+    def slot(self, tokens: int = 0, timeout: Optional[float] = None) -> Iterator["_SlotResult"]:
+        """
+        実行枠を確保して処理を実行する
+
+        with limiter.slot(tokens=estimated) as result:
+            try:
+                call()
+            except RateLimitError:
+                result.throttled = True
+                raise
+
+        Raises:
+            RateLimitExceededError: 期限内に実行枠を確保できなかった
+        """
+        started = time.monotonic()
+        deadline = started + (timeout if timeout is not None else settings.provider_queue_timeout_seconds)
+        # 実行枠を先に確保し、呼び出さずに終わった場合はRPM・TPMを消費しない
+        if not self._concurrency.acquire(deadline):
+            self._reject("同時実行数の上限に達しています")
+        if not self._requests.acquire(1, deadline):
+            self._concurrency.cancel()
+            self._reject("リクエスト数の上限に達しています")
+        if tokens and not self._tokens.acquire(tokens, deadline):
+            self._requests.refund(1)
+            self._concurrency.cancel()
+            self._reject("トークン数の上限に達しています")
+
+        acquired_at = time.monotonic()
+        metrics.observe(f"{self.name}.queue_wait_seconds", acquired_at - started)
+        result = _SlotResult()
+        try:
+            yield result
+        finally:
+            self._concurrency.release(time.monotonic() - acquired_at, result.throttled)
+
+    def _reject(self, reason: str) -> None:
+        metrics.increment(f"{self.name}.rejected")
+        raise RateLimitExceededError(self.name, f"{self.name}: {reason}")
+
+
+class _SlotResult:
+    """実行結果（プロバイダーからの429を呼び出し側が記録する）"""
+
+    def __init__(self):
+        self.throttled = False
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _create_limiter(provider: str) -> ProviderLimiter:
+    if provider == "openai_embedding":
+        return ProviderLimiter(
+            provider,
+            requests_per_minute=settings.openai_embedding_rpm,
+            tokens_per_minute=settings.openai_embedding_tpm,
+            max_concurrency=settings.openai_embedding_max_concurrency,
+            latency_target=settings.openai_embedding_latency_target_seconds,
+        )
+    if provider == "gemini":
+        return ProviderLimiter(
+            provider,
+            requests_per_minute=settings.gemini_rpm,
+            tokens_per_minute=settings.gemini_tpm,
+            max_concurrency=settings.gemini_max_concurrency,
+            latency_target=settings.gemini_latency_target_seconds,
+        )
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+def get_provider_limiter(provider: str) -> ProviderLimiter:
+    """プロバイダーごとのリミッターのシングルトンインスタンスを取得"""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                limiter = _create_limiter(provider)
+                _limiters[provider] = limiter
+    return limiter
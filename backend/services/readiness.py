@@ -0,0 +1,134 @@
+"""
+起動時のウォームアップとレディネス状態
+DB接続プール（プライマリ・読み取りレプリカ）と外部APIクライアントを起動後にバックグラウンドで準備し、完了状況を公開する
+"""
+
+import functools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import Engine, text
+
+from config import settings
+from database import engine, replica_engines
+
+logger = logging.getLogger(__name__)
+
+_components: Dict[str, str] = {}  # コンポーネント名 → pending / ready / failed
+_lock = threading.Lock()
+_stop = threading.Event()  # 終了時に残りのウォームアップを打ち切る
+
+
+def _connect(target: Engine) -> None:
+    # プールに接続を1本作っておき、最初のリクエストで接続確立を待たないようにする
+    with target.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def _warm_database() -> None:
+    _connect(engine)
+
+
+def _database_steps() -> List[Tuple[str, Callable[[], None]]]:
+    """プライマリと各読み取りレプリカの接続確認（レプリカはdatabase_replica1, 2, ...）"""
+    steps = [("database", _warm_database)]
+    for i, replica in enumerate(replica_engines, start=1):
+        steps.append((f"database_replica{i}", functools.partial(_connect, replica)))
+    return steps
+
+
+def _warm_llm_client() -> None:
+    from services.llm_client import get_llm_client
+
+    get_llm_client()
+
+
+def _warm_embedding_service() -> None:
+    from services.langchain_service import get_embedding_service
+
+    get_embedding_service()
+
+
+def _warmup_steps() -> List[Tuple[str, Callable[[], None]]]:
+    steps = _database_steps()
+    if settings.warmup_ai_clients:
+        if settings.gemini_api_key:
+            steps.append(("llm_client", _warm_llm_client))
+        if settings.embedding_provider == "local" or settings.openai_api_key:
+            steps.append(("embedding_service", _warm_embedding_service))
+    return steps
+
+
+def warm_up() -> None:
+    """
+    DB接続プールと外部APIクライアントを準備（lifespanからスレッドで実行する）
+
+    失敗したコンポーネントはfailedとして記録し、初回利用時に改めて初期化される。
+    stop_warm_up()が呼ばれた場合は、残りのコンポーネントを準備せずに終了する。
+    """
+    steps = _warmup_steps()
+    with _lock:
+        for name, _ in steps:
+            _components[name] = "pending"
+
+    for name, step in steps:
+        if _stop.is_set():
+            logger.info("Warmup stopped before %s", name)
+            return
+        started = time.monotonic()
+        try:
+            step()
+            state = "ready"
+        except Exception:
+            logger.exception("Warmup failed: %s", name)
+            state = "failed"
+        with _lock:
+            _components[name] = state
+        logger.info("Warmup %s: %s (%.2fs)", name, state, time.monotonic() - started)
+
+
+def stop_warm_up() -> None:
+    """実行中のウォームアップに、残りのコンポーネントを準備せずに終了するよう伝える（終了時に呼ぶ）"""
+    _stop.set()
+
+
+def _reprobe_databases() -> None:
+    """起動時に失敗したDB接続を確認し直し、接続できたものをreadyにする"""
+    for name, step in _database_steps():
+        with _lock:
+            failed = _components.get(name) == "failed"
+        if not failed:
+            continue
+        try:
+            step()
+        except Exception as e:
+            logger.debug("%s is still unavailable: %s", name, e)
+            continue
+        with _lock:
+            _components[name] = "ready"
+        logger.info("%s became ready after failed warmup", name)
+
+
+def status() -> Tuple[bool, Dict[str, str]]:
+    """
+    レディネス状態を取得
+
+    プライマリと全ての読み取りレプリカの準備が完了し、準備中のコンポーネントがなければready。
+    起動時に接続できなかったDBは、呼び出しのたびに接続を確認し直す。
+    外部APIクライアントの失敗は初回利用時に再初期化されるため、readyを妨げない。
+
+    Returns:
+        (トラフィックを受け付けられるか, コンポーネントごとの状態) のタプル
+    """
+    _reprobe_databases()
+
+    database_names = [name for name, _ in _database_steps()]
+    with _lock:
+        components = dict(_components)
+    ready = (
+        all(components.get(name) == "ready" for name in database_names)
+        and all(state != "pending" for state in components.values())
+    )
+    return ready, components
@@ -0,0 +1,57 @@
+"""
+類似度スコア較正器の読み込み
+train_score_calibration.py が学習した較正器をユーザーごとにキャッシュして適用する
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from cruds import score_calibrations as calibration_crud
+from domain.services.score_calibration_service import Calibration, ScoreCalibrationService
+
+_cache: Dict[int, Tuple[float, Optional[Calibration]]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_user_calibration(db: Session, user_id: int) -> Optional[Calibration]:
+    """
+    ユーザーの較正器を取得（未学習ならNone）
+
+    結果（未学習であることも含む）を score_calibration_cache_seconds の間キャッシュする。
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(user_id)
+    if cached is not None and now - cached[0] < settings.score_calibration_cache_seconds:
+        return cached[1]
+
+    row = calibration_crud.get_calibration(db, user_id)
+    # 傾きが0以下の較正器は順位を保てないため使わない
+    calibration = Calibration(slope=row.slope, intercept=row.intercept) if row and row.slope > 0 else None
+    with _cache_lock:
+        _cache[user_id] = (now, calibration)
+    return calibration
+
+
+def calibrate_similarities(db: Session, user_id: int, similarities: List[float]) -> Optional[List[float]]:
+    """
+    ベクトル類似度を採用確率に変換
+
+    Args:
+        db: データベースセッション
+        user_id: ユーザーID
+        similarities: ベクトル類似度のリスト
+
+    Returns:
+        採用確率のリスト（較正が無効、または較正器が未学習ならNone）
+    """
+    if not settings.score_calibration_enabled or not similarities:
+        return None
+    calibration = get_user_calibration(db, user_id)
+    if calibration is None:
+        return None
+    return ScoreCalibrationService.apply(calibration, similarities).tolist()
@@ -0,0 +1,19 @@
+"""
+EmbeddingBatcherのテスト
+"""
+import pytest
+
+from services.embedding_batcher import EmbeddingBatcher
+
+
+def test_embed_returns_vector_per_text():
+    batcher = EmbeddingBatcher(lambda texts: [[float(len(text))] for text in texts])
+
+    assert batcher.embed("メモ") == [2.0]
+
+
+def test_embed_fails_when_provider_returns_fewer_vectors():
+    batcher = EmbeddingBatcher(lambda texts: [], timeout=5.0)
+
+    with pytest.raises(RuntimeError, match="件数が一致しません"):
+        batcher.embed("メモ")
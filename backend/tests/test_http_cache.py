@@ -0,0 +1,23 @@
+"""
+一覧APIの条件付きGETのテスト
+"""
+from starlette.requests import Request
+
+from services.http_cache import _is_not_modified
+
+_HEADERS = {"ETag": 'W/"1-3"', "Last-Modified": "Mon, 19 Oct 2026 10:00:00 GMT"}
+
+
+def _request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def test_matching_etag_is_not_modified():
+    assert _is_not_modified(_request(if_none_match='W/"1-3"'), _HEADERS)
+    assert not _is_not_modified(_request(if_none_match='W/"1-2"'), _HEADERS)
+
+
+def test_if_modified_since_alone_does_not_validate():
+    # 同じ秒内の更新を区別できないため、Last-Modifiedでは304を返さない
+    assert not _is_not_modified(_request(if_modified_since=_HEADERS["Last-Modified"]), _HEADERS)
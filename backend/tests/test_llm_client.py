@@ -0,0 +1,74 @@
+"""
+ResilientLLMClientのテスト
+"""
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+pytest.importorskip("google.genai")
+
+from config import settings
+from services.llm_client import LLMProviderError, LLMTimeoutError, ResilientLLMClient
+
+
+class _FakeModels:
+    def __init__(self, error: Exception = None):
+        self._error = error
+
+    def generate_content(self, **kwargs):
+        raise self._error
+
+    def generate_content_stream(self, **kwargs):
+        for text in ("a", "b", "c"):
+            yield SimpleNamespace(text=text)
+
+
+class _SlowModels:
+    def generate_content(self, **kwargs):
+        time.sleep(1.0)
+        return SimpleNamespace(text="遅い応答")
+
+
+def _client(models: _FakeModels) -> ResilientLLMClient:
+    return ResilientLLMClient(client_factory=lambda: SimpleNamespace(models=models))
+
+
+def test_connection_error_after_retries_is_unavailable(monkeypatch):
+    monkeypatch.setattr(settings, "gemini_max_retries", 0)
+    monkeypatch.setattr(settings, "gemini_hedge_enabled", False)
+    client = _client(_FakeModels(httpx.ConnectError("connection refused")))
+
+    with pytest.raises(LLMProviderError) as excinfo:
+        client.generate_content(model="gemini", contents="メモ")
+    assert isinstance(excinfo.value.__cause__, httpx.ConnectError)
+
+
+def test_abandoned_stream_releases_half_open_trial(monkeypatch):
+    monkeypatch.setattr(settings, "gemini_breaker_reset_seconds", 0.0)
+    client = _client(_FakeModels())
+    for _ in range(settings.gemini_breaker_failure_threshold):
+        client.breaker.record_failure()
+    assert client.breaker.state == "open"
+
+    stream = client.generate_content_stream(model="gemini", contents="メモ")
+    assert next(stream).text == "a"
+    assert client.breaker.state == "half_open"
+    stream.close()
+
+    # 試行枠が解放され、次の呼び出しが試行できる
+    assert client.breaker.allow_request()
+
+
+def test_hedged_call_respects_deadline(monkeypatch):
+    monkeypatch.setattr(settings, "gemini_max_retries", 0)
+    monkeypatch.setattr(settings, "gemini_hedge_enabled", True)
+    monkeypatch.setattr(settings, "gemini_hedge_min_delay", 0.2)
+    client = _client(_SlowModels())
+
+    started = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        client.generate_content(model="gemini", contents="メモ", timeout=0.4)
+    # ヘッジを待った時間も期限に含まれる（期限 + ヘッジ待ちまで延びない）
+    assert time.monotonic() - started < 0.55
@@ -0,0 +1,36 @@
+"""
+一覧APIの取得項目の指定（fields= / include=）のテスト
+"""
+import pytest
+
+from services.projection import parse_projection
+
+_COLUMNS = ("title", "id", "user_id")
+_RELATIONS = {"corners": ("title", "id"), "personalities": ("name", "id")}
+
+
+def test_defaults_to_all_columns_and_relations():
+    projection = parse_projection(None, None, _COLUMNS, _RELATIONS)
+
+    assert projection.fields == _COLUMNS
+    assert projection.includes == _RELATIONS
+
+
+def test_fields_select_columns_and_referenced_relations_in_schema_order():
+    projection = parse_projection("id,corners.title,title", None, _COLUMNS, _RELATIONS)
+
+    assert projection.fields == ("title", "id")
+    assert projection.includes == {"corners": ("title",)}
+
+
+def test_relation_only_fields_return_only_id():
+    projection = parse_projection("corners.title", None, _COLUMNS, _RELATIONS)
+
+    assert projection.fields == ("id",)
+    assert projection.includes == {"corners": ("title",)}
+
+
+@pytest.mark.parametrize("fields, include", [("nope", None), ("corners.nope", None), (None, "nope"), ("corners.id", "")])
+def test_unknown_or_excluded_names_are_rejected(fields, include):
+    with pytest.raises(ValueError):
+        parse_projection(fields, include, _COLUMNS, _RELATIONS)
@@ -0,0 +1,38 @@
+"""
+プロバイダー呼び出しのレート制限のテスト
+"""
+import pytest
+
+from services.rate_limiter import AdaptiveConcurrencyLimiter, ProviderLimiter, RateLimitExceededError
+
+
+def test_rejected_slot_does_not_consume_request_tokens():
+    # 12RPMならバケットの容量は2リクエスト、同時実行数の初期上限は1
+    limiter = ProviderLimiter(
+        "test", requests_per_minute=12, tokens_per_minute=1000, max_concurrency=2, latency_target=10.0
+    )
+
+    with limiter.slot(timeout=0.05):
+        with pytest.raises(RateLimitExceededError):
+            with limiter.slot(timeout=0.05):
+                pass
+
+    # 同時実行数で拒否された呼び出しはリクエスト数を消費していない
+    with limiter.slot(timeout=0.05):
+        pass
+
+
+def test_concurrent_throttles_halve_limit_once():
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=8, max_limit=8, latency_target=10.0)
+    for _ in range(4):
+        assert limiter.acquire(deadline=float("inf"))
+
+    # 同じ混雑を観測した実行中の呼び出しがまとめて429を返しても、上限を下げるのは1回だけ
+    for _ in range(4):
+        limiter.release(latency=0.5, throttled=True)
+    assert limiter._limit == 4.0
+
+    # 上限を下げた後に開始した呼び出しで再び観測した場合は下げる
+    assert limiter.acquire(deadline=float("inf"))
+    limiter.release(latency=0.0, throttled=True)
+    assert limiter._limit == 2.0
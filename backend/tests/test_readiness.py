@@ -0,0 +1,59 @@
+"""
+レディネス状態のテスト
+"""
+import threading
+
+from services import readiness
+
+
+def test_failed_database_warmup_recovers_on_status(monkeypatch):
+    monkeypatch.setattr(readiness, "_components", {})
+    monkeypatch.setattr(readiness.settings, "warmup_ai_clients", False)
+
+    def unreachable() -> None:
+        raise ConnectionError("database is starting up")
+
+    monkeypatch.setattr(readiness, "_warm_database", unreachable)
+    readiness.warm_up()
+    assert readiness.status() == (False, {"database": "failed"})
+
+    monkeypatch.setattr(readiness, "_warm_database", lambda: None)
+    assert readiness.status() == (True, {"database": "ready"})
+
+
+def test_failed_replica_blocks_ready_until_reachable(monkeypatch):
+    monkeypatch.setattr(readiness, "_components", {})
+    monkeypatch.setattr(readiness.settings, "warmup_ai_clients", False)
+    monkeypatch.setattr(readiness, "_warm_database", lambda: None)
+    replica = object()
+    monkeypatch.setattr(readiness, "replica_engines", [replica])
+
+    reachable = set()
+
+    def connect(target) -> None:
+        if target not in reachable:
+            raise ConnectionError("replica is starting up")
+
+    monkeypatch.setattr(readiness, "_connect", connect)
+    readiness.warm_up()
+    assert readiness.status() == (False, {"database": "ready", "database_replica1": "failed"})
+
+    reachable.add(replica)
+    assert readiness.status() == (True, {"database": "ready", "database_replica1": "ready"})
+
+
+def test_stopped_warmup_skips_remaining_steps(monkeypatch):
+    monkeypatch.setattr(readiness, "_components", {})
+    monkeypatch.setattr(readiness, "_stop", threading.Event())
+    monkeypatch.setattr(readiness.settings, "warmup_ai_clients", False)
+
+    def connect_then_shut_down() -> None:
+        readiness.stop_warm_up()
+
+    monkeypatch.setattr(readiness, "_warm_database", connect_then_shut_down)
+    monkeypatch.setattr(readiness, "replica_engines", [object()])
+    monkeypatch.setattr(readiness, "_connect", lambda target: None)
+    readiness.warm_up()
+
+    # 終了が伝えられた後のレプリカは準備せず、pendingのまま残る
+    assert readiness._components == {"database": "ready", "database_replica1": "pending"}
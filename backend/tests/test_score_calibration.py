@@ -0,0 +1,34 @@
+"""
+類似度スコア較正とLLM省略時の推奨先選択のテスト
+"""
+import numpy as np
+
+from domain.services.score_calibration_service import ScoreCalibrationService
+from services.analyze_service import _vector_only_recommendation
+
+
+def test_fit_rejects_non_positive_slope():
+    # 類似度が高いほど不採用になっている履歴からは較正器を作らない
+    similarities = np.linspace(0.5, 0.9, 40)
+    accepted = (similarities < 0.7).astype(float)
+
+    assert ScoreCalibrationService.fit(similarities, accepted) is None
+
+
+def test_fit_learns_positive_slope():
+    similarities = np.linspace(0.5, 0.9, 40)
+    accepted = (similarities > 0.7).astype(float)
+
+    calibration = ScoreCalibrationService.fit(similarities, accepted)
+    assert calibration is not None and calibration.slope > 0
+
+
+def test_vector_only_recommendation_ranks_by_calibrated_score():
+    results = [
+        {"id": 1, "title": "A", "similarity": 0.80, "calibrated_score": 0.40},
+        {"id": 2, "title": "B", "similarity": 0.75, "calibrated_score": 0.90},
+    ]
+
+    recommendation = _vector_only_recommendation(results)[0]
+    assert recommendation["corner_id"] == 2
+    assert recommendation["score"] == 0.9
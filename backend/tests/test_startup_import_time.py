@@ -0,0 +1,11 @@
+"""
+APIサーバー起動時のimport時間の予算のテスト
+"""
+from benchmarks.startup_import_time import BUDGET_MS, deferred_imports, measure
+
+
+def test_import_main_within_budget_without_ai_sdks():
+    total_us, rows = measure(runs=3)
+
+    assert deferred_imports(rows) == []
+    assert total_us / 1000 <= BUDGET_MS
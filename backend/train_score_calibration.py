@@ -0,0 +1,99 @@
+"""
+類似度スコア較正器の学習スクリプト
+採用・不採用が確定したメールから、ユーザーごとにベクトル類似度→採用確率の較正器を学習して保存する
+
+定期実行（cron等）を想定したオフラインジョブ:
+    cd backend && python train_score_calibration.py
+"""
+
+from itertools import groupby
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from config import settings
+from cruds import score_calibrations as calibration_crud
+from database import SessionLocal
+from domain.services.score_calibration_service import Calibration, ScoreCalibrationService
+from domain.value_objects.mail_status import MailStatus
+from services.langchain_service import get_embedding_service
+
+# メモの埋め込みをまとめて取得する件数
+_EMBEDDING_BATCH_SIZE = 64
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+
+def _fit_user(rows: List) -> Optional[Calibration]:
+    """1ユーザー分のメールから較正器を学習（件数不足や採否の片方しかない場合、傾きが正にならない場合はNone）"""
+    # 学習しないユーザーのメモは埋め込まない（埋め込みAPIの呼び出しは有料のため）
+    labels = {row.status == MailStatus.ACCEPTED.value for row in rows}
+    if len(rows) < settings.score_calibration_min_samples or len(labels) < 2:
+        return None
+
+    # 同じメモから複数のメールを書くことがあるため、メモの埋め込みは1回だけ取得する
+    memo_ids = list(dict.fromkeys(row.memo_id for row in rows))
+    contents = {row.memo_id: row.memo_content for row in rows}
+    embedding_service = get_embedding_service()
+    memo_vectors = {}
+    for start in range(0, len(memo_ids), _EMBEDDING_BATCH_SIZE):
+        batch = memo_ids[start:start + _EMBEDDING_BATCH_SIZE]
+        for memo_id, vector in zip(batch, embedding_service.embed_queries([contents[i] for i in batch])):
+            memo_vectors[memo_id] = vector
+
+    memos = _normalize(np.array([memo_vectors[row.memo_id] for row in rows], dtype=np.float32))
+    corners = _normalize(np.array([row.embedded_description for row in rows], dtype=np.float32))
+    similarities = np.einsum("ij,ij->i", memos, corners)
+    accepted = np.array([row.status == MailStatus.ACCEPTED.value for row in rows], dtype=np.float64)
+
+    return ScoreCalibrationService.fit(
+        similarities, accepted, min_samples=settings.score_calibration_min_samples
+    )
+
+
+def train_score_calibration() -> None:
+    """全ユーザーの較正器を学習して保存"""
+    read_db: Session = SessionLocal()
+    write_db: Session = SessionLocal()
+    trained = skipped = 0
+    try:
+        # 読み込みはサーバーサイドカーソルのため、保存は別セッションで行う
+        for user_id, user_rows in groupby(calibration_crud.iter_labeled_mails(read_db), key=lambda r: r.user_id):
+            rows = list(user_rows)
+            calibration = _fit_user(rows)
+            if calibration is None:
+                # 以前に学習した較正器が残っていれば、古い採否に基づくため削除する
+                calibration_crud.delete_calibration(write_db, user_id)
+                skipped += 1
+                continue
+            accepted_count = sum(row.status == MailStatus.ACCEPTED.value for row in rows)
+            calibration_crud.upsert_calibration(
+                write_db,
+                user_id,
+                slope=calibration.slope,
+                intercept=calibration.intercept,
+                sample_count=len(rows),
+                accepted_count=accepted_count,
+            )
+            trained += 1
+            print(
+                f"✅ ユーザー{user_id}: {len(rows)}件（採用{accepted_count}件） "
+                f"slope={calibration.slope:.3f} intercept={calibration.intercept:.3f}"
+            )
+
+        print(f"\n✨ 較正器の学習が完了しました（学習: {trained}人、学習できずスキップ: {skipped}人）")
+
+    except Exception as e:
+        print(f"❌ エラーが発生しました: {e}")
+        write_db.rollback()
+        raise
+    finally:
+        read_db.close()
+        write_db.close()
+
+
+if __name__ == "__main__":
+    train_score_calibration()
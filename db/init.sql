@@ -1,5 +1,8 @@
 -- pgvector拡張を有効化
 CREATE EXTENSION IF NOT EXISTS vector;
 
+-- pg_trgm拡張を有効化（ハイブリッド検索の語彙一致に使用）
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- データベースの初期設定
 -- SQLAlchemyが自動的にテーブルを作成するため、ここでは拡張機能の有効化のみ行う
@@ -1,6 +1,7 @@
 import streamlit as st
 import sys
 from pathlib import Path
+from datetime import datetime
 
 sys.path.append(str(Path(__file__).parent))
 
@@ -43,16 +44,22 @@ with col2:
 
 st.divider()
 
+# ダッシュボードの表示内容（最近のメモ・メールの状況・最近のメール・番組）は1回のリクエストで取得する
+try:
+    dashboard = api_client.get_dashboard(memo_limit=3, mail_limit=3)
+except Exception as e:
+    dashboard = None
+    st.error(f"ダッシュボードの取得に失敗: {e}")
+
 # 最近のメモ
 st.subheader("最近のメモ")
-try:
-    memos = api_client.get_memos(limit=3)
+if dashboard is not None:
+    memos = dashboard["recent_memos"]
     
     if not memos:
         st.info("メモがありません。新しいメモを作成してください。")
     else:
         for memo in memos:
-            from datetime import datetime
             created_at = datetime.fromisoformat(memo['created_at'].replace('Z', '+00:00'))
             st.markdown(
                 f"""
@@ -67,8 +74,6 @@ try:
                 """,
                 unsafe_allow_html=True,
             )
-except Exception as e:
-    st.error(f"メモの取得に失敗: {e}")
 
 col1, col2 = st.columns(2)
 with col1:
@@ -76,4 +81,39 @@ with col1:
         st.switch_page("pages/1_memos.py")
 with col2:
     if st.button("番組管理", use_container_width=True):
-        st.switch_page("pages/2_programs.py")
\ No newline at end of file
+        st.switch_page("pages/2_programs.py")
+
+st.divider()
+
+# メールの状況
+st.subheader("メールの状況")
+if dashboard is not None:
+    stats = dashboard["stats"]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("下書き", stats["draft"])
+    col2.metric("送信済み", stats["sent"])
+    col3.metric("採用", stats["accepted"])
+    col4.metric("不採用", stats["rejected"])
+
+    # 最近のメール
+    for mail in dashboard["recent_mails"]:
+        st.markdown(
+            f"""
+            <div class="memo-card">
+                <p style="color: #1f2937; font-weight: 500; margin-bottom: 0.5rem;">
+                    {mail['subject']}
+                </p>
+                <p style="color: #9ca3af; font-size: 0.75rem; margin: 0;">
+                    {mail['status']} ・ 📻 {mail['program_title']} - {mail['corner_title']}
+                </p>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+
+    # 番組ごとのコーナー数・メール数
+    for program in dashboard["programs"]:
+        st.caption(f"📻 {program['title']}（コーナー{program['corner_count']}件・メール{program['mail_count']}通）")
+
+if st.button("メール一覧を見る", use_container_width=True):
+    st.switch_page("pages/6_mails.py")
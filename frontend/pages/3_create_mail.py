@@ -8,6 +8,9 @@ from utils.styles import get_custom_css
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+# 投稿先の選択に使う番組の項目（説明文やパーソナリティは取得しない）
+MAIL_TARGET_FIELDS = "id,title,email_address,corners.id,corners.title"
+
 st.set_page_config(
     page_title="メール作成",
     layout="centered",
@@ -49,17 +52,24 @@ if selected_memo:
     st.subheader("AI解析による推奨コーナー")
     
     try:
-        # LLM解析を実行
-        analysis_result = api_client.analyze_memo(selected_memo['id'])
-        recommendations = analysis_result.get('recommendations', [])
-        
-        if recommendations:
-            recommended_corner = recommendations[0]  # 最も推奨度の高いもの
-            
-            col1, col2 = st.columns([3, 1])
-            with col1:
+        # LLM解析を実行（ベクトル検索の候補を先に表示し、推奨結果は届いた時点で表示を更新する）
+        recommendations = []
+        progress_placeholder = st.empty()
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            recommended_placeholder = st.empty()
+            others_placeholder = st.empty()
+        for event, data in api_client.analyze_memo_stream(selected_memo['id']):
+            if event == "candidates" and data["candidates"]:
+                candidate_titles = "、".join(c["corner_title"] for c in data["candidates"])
+                progress_placeholder.caption(f"候補コーナー: {candidate_titles}（AIが解析中...）")
+            elif event == "recommendation":
+                recommendations.append(data)
+                # 最も推奨度の高いものを強調し、残りは一覧で表示する
+                recommendations.sort(key=lambda r: r['score'], reverse=True)
+                recommended_corner = recommendations[0]
                 score_percent = int(recommended_corner['score'] * 100)
-                st.markdown(
+                recommended_placeholder.markdown(
                     f"""
                     <div style="background: linear-gradient(135deg, rgba(43, 140, 238, 0.1) 0%, rgba(43, 140, 238, 0.2) 100%); 
                                 border: 2px solid #2b8cee; border-radius: 12px; padding: 1.5rem; margin-bottom: 1rem;">
@@ -79,6 +89,17 @@ if selected_memo:
                     """,
                     unsafe_allow_html=True,
                 )
+                if len(recommendations) > 1:
+                    others_placeholder.markdown("\n".join(
+                        f"- その他の候補: {r['corner_title']}（{r['program_title']}） 一致度: {int(r['score'] * 100)}%"
+                        for r in recommendations[1:]
+                    ))
+            elif event == "done":
+                progress_placeholder.empty()
+        
+        if recommendations:
+            recommended_corner = recommendations[0]  # 最も推奨度の高いもの
+            # ボタンはストリームの終了後に1回だけ作成する（更新のたびに作るとキーが重複するため）
             with col2:
                 st.write("")
                 st.write("")
@@ -97,7 +118,7 @@ st.divider()
 st.subheader("コーナーを手動で選択")
 
 try:
-    programs = api_client.get_programs()
+    programs = api_client.get_programs(fields=MAIL_TARGET_FIELDS)
     program_titles = ["番組を選択してください"] + [p['title'] for p in programs]
     selected_program_title = st.selectbox("番組", program_titles, key="select_program")
     
@@ -121,7 +142,7 @@ st.divider()
 # 現在の選択状態を表示
 if st.session_state.get("selected_program_id"):
     try:
-        programs = api_client.get_programs()
+        programs = api_client.get_programs(fields=MAIL_TARGET_FIELDS)
         current_program = next((p for p in programs if p['id'] == st.session_state["selected_program_id"]), None)
         if current_program:
             current_corner = next((c for c in current_program.get('corners', []) if c['id'] == st.session_state["selected_corner_id"]), None)
@@ -181,7 +202,7 @@ with col2:
     if st.button("メーラーで開く", type="primary", use_container_width=True, key="open_mailer"):
         if st.session_state.get("selected_program_id") and st.session_state.get("selected_corner_id") and mail_subject and mail_body:
             try:
-                programs = api_client.get_programs()
+                programs = api_client.get_programs(fields=MAIL_TARGET_FIELDS)
                 current_program = next((p for p in programs if p['id'] == st.session_state["selected_program_id"]), None)
                 
                 mail_data = {
@@ -8,6 +8,9 @@ from utils.styles import get_custom_css
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+# コーナー名の表示に使う番組の項目（説明文やパーソナリティは取得しない）
+CORNER_TITLE_FIELDS = "id,title,corners.id,corners.title"
+
 st.set_page_config(
     page_title="送信済みメール一覧",
     layout="centered",
@@ -49,7 +52,7 @@ try:
         st.info("メールがありません。")
     else:
         # 番組とコーナー情報を取得
-        programs = api_client.get_programs()
+        programs = api_client.get_programs(fields=CORNER_TITLE_FIELDS)
         
         for mail in mails:
             with st.container():
@@ -161,7 +164,7 @@ if st.session_state.get("show_mail_modal", False) and st.session_state.get("sele
                 program_title = ""
                 corner_title = ""
                 if selected_mail.get('corner_id'):
-                    programs = api_client.get_programs()
+                    programs = api_client.get_programs(fields=CORNER_TITLE_FIELDS)
                     for program in programs:
                         corners = program.get('corners', [])
                         corner = next((c for c in corners if c['id'] == selected_mail['corner_id']), None)
@@ -1,11 +1,18 @@
 """
 バックエンドAPI通信クライアント
 """
+import copy
+import json
 import os
 import requests
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 
+# 条件付きGETのキャッシュ（URL → (ETag, レスポンス)）
+# ページの再実行ごとにAPIClientが作り直されるため、モジュールで保持する
+_etag_cache: Dict[str, Tuple[str, Any]] = {}
+_ETAG_CACHE_MAX_ENTRIES = 256  # 検索条件ごとにURLが変わるため上限を超えたら破棄する
+
 
 class APIClient:
     """バックエンドAPIとの通信を管理するクライアント"""
@@ -23,14 +30,29 @@ class APIClient:
             raise Exception(f"API Error: {response.status_code} - {response.text}")
         return response.json()
     
+    def _get_cached(self, url: str, params: Dict[str, Any]) -> Any:
+        """ETagで条件付きGETを行い、変更がなければ（304）前回のレスポンスを返す"""
+        key = requests.Request("GET", url, params=params).prepare().url
+        cached = _etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = requests.get(url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return copy.deepcopy(cached[1])
+        data = self._handle_response(response)
+        etag = response.headers.get("ETag")
+        if etag:
+            if len(_etag_cache) >= _ETAG_CACHE_MAX_ENTRIES:
+                _etag_cache.clear()
+            _etag_cache[key] = (etag, copy.deepcopy(data))
+        return data
+    
     # ========== メモ ==========
     def get_memos(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """メモ一覧を取得"""
-        response = requests.get(
+        return self._get_cached(
             f"{self.api_base}/memos",
-            params={"user_id": self.user_id, "skip": skip, "limit": limit}
+            {"user_id": self.user_id, "skip": skip, "limit": limit}
         )
-        return self._handle_response(response)
     
     def get_memo(self, memo_id: int) -> Dict[str, Any]:
         """メモを取得"""
@@ -62,11 +84,7 @@ class APIClient:
     # ========== パーソナリティ ==========
     def get_personalities(self) -> List[Dict[str, Any]]:
         """パーソナリティ一覧を取得"""
-        response = requests.get(
-            f"{self.api_base}/personalities",
-            params={"user_id": self.user_id}
-        )
-        return self._handle_response(response)
+        return self._get_cached(f"{self.api_base}/personalities", {"user_id": self.user_id})
     
     def get_personality(self, personality_id: int) -> Dict[str, Any]:
         """パーソナリティを取得"""
@@ -95,17 +113,22 @@ class APIClient:
     def get_programs(
         self,
         personality_id: Optional[int] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        fields: Optional[str] = None,
+        include: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """番組一覧を取得"""
+        """番組一覧を取得（fields・includeで取得する列・関連を指定可能）"""
         params = {"user_id": self.user_id}
         if personality_id:
             params["personality_id"] = personality_id
         if search:
             params["search"] = search
+        if fields is not None:
+            params["fields"] = fields
+        if include is not None:
+            params["include"] = include
         
-        response = requests.get(f"{self.api_base}/programs", params=params)
-        return self._handle_response(response)
+        return self._get_cached(f"{self.api_base}/programs", params)
     
     def get_program(self, program_id: int) -> Dict[str, Any]:
         """番組を取得"""
@@ -185,6 +208,33 @@ class APIClient:
             json={"memo_id": memo_id, "user_id": self.user_id}
         )
         return self._handle_response(response)
+    
+    def analyze_memo_stream(self, memo_id: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """メモを解析し、推奨コーナーを(イベント名, データ)として逐次取得"""
+        with requests.get(
+            f"{self.api_base}/analyze/stream",
+            params={"memo_id": memo_id, "user_id": self.user_id},
+            stream=True,
+        ) as response:
+            if response.status_code >= 400:
+                raise Exception(f"API Error: {response.status_code} - {response.text}")
+            response.encoding = "utf-8"
+            
+            event = "message"
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    yield event, json.loads(line[len("data:"):].strip())
+                    event = "message"
+    
+    # ========== ダッシュボード ==========
+    def get_dashboard(self, memo_limit: int = 3, mail_limit: int = 5) -> Dict[str, Any]:
+        """最近のメモ・メール統計・最近のメール・番組の概要を1回のリクエストで取得"""
+        return self._get_cached(
+            f"{self.api_base}/dashboard",
+            {"user_id": self.user_id, "memo_limit": memo_limit, "mail_limit": mail_limit}
+        )
 
 
 # シングルトンインスタンス